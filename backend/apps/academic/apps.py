@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AcademicConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.academic"
+
+    def ready(self):
+        import apps.academic.signals  # noqa
@@ -0,0 +1,183 @@
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from apps.core.models import Watermark
+from apps.core.uploads import upsert_rows
+from .models import Attendance, AttendanceSummary, Section
+from .serializers import AttendanceRollCallRowSerializer
+
+User = get_user_model()
+
+ROLL_CALL_BATCH_SIZE = 500
+
+SUMMARY_WATERMARK = "academic.attendance_summary"
+SUMMARY_CHUNK_SIZE = 500
+# Rows are picked up by ``updated_at``, but a transaction still open during
+# a refresh can commit rows stamped before it afterwards. The watermark is
+# therefore left a short window behind each scan so the next run re-reads
+# those; recomputing a summary twice is harmless.
+SUMMARY_OVERLAP = timedelta(minutes=5)
+
+
+def record_roll_call(rows, sections=None, batch_size=ROLL_CALL_BATCH_SIZE):
+    """
+    Upsert a batch of attendance rows and report the outcome of every row.
+
+    ``sections`` limits which sections the roll may be posted for (defaults
+    to all). Students and sections are resolved with one query each, rows
+    are checked in memory and the accepted rows are written by
+    ``upsert_rows`` with ``ON CONFLICT (student, section, date) DO UPDATE``.
+    """
+    if sections is None:
+        sections = Section.objects.all()
+
+    def check(accepted):
+        known_students = set(
+            User.objects.filter(id__in={key[0] for key in accepted}, role=User.STUDENT)
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        known_sections = set(
+            sections.filter(id__in={key[1] for key in accepted})
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        errors = {}
+        for key, data in accepted.items():
+            row_errors = {}
+            if data["student_id"] not in known_students:
+                row_errors["student_id"] = ["Invalid student."]
+            if data["section_id"] not in known_sections:
+                row_errors["section_id"] = ["Invalid section."]
+            if row_errors:
+                errors[key] = row_errors
+        return errors
+
+    def existing(keys):
+        # Sections and dates bound the lookup to the rolls being posted; the
+        # student ids are matched in memory instead of in a huge IN list.
+        return set(
+            Attendance.objects.filter(
+                section_id__in={key[1] for key in keys},
+                date__in={key[2] for key in keys},
+            )
+            .order_by()
+            .values_list("student_id", "section_id", "date")
+        )
+
+    return upsert_rows(
+        rows,
+        model=Attendance,
+        row_serializer=AttendanceRollCallRowSerializer(),
+        key=lambda data: (data["student_id"], data["section_id"], data["date"]),
+        check=check,
+        existing=existing,
+        unique_fields=["student", "section", "date"],
+        update_fields=["is_present", "remarks", "updated_at"],
+        batch_size=batch_size,
+    )
+
+
+def _next_month(month):
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _summarise(keys):
+    """
+    Recompute the summaries identified by ``(student_id, section_id, month)``.
+
+    One grouped query counts the attendance of every key in the chunk, the
+    results are upserted in one statement and keys with no attendance left
+    have their summary removed.
+    """
+    months = {month for _, _, month in keys}
+    counts = (
+        Attendance.objects.filter(
+            student_id__in={student_id for student_id, _, _ in keys},
+            section_id__in={section_id for _, section_id, _ in keys},
+            date__gte=min(months),
+            date__lt=_next_month(max(months)),
+        )
+        .annotate(month=TruncMonth("date"))
+        .values("student_id", "section_id", "month")
+        .annotate(
+            days_total=Count("id"),
+            days_present=Count("id", filter=Q(is_present=True)),
+        )
+        .order_by()
+    )
+    summaries = {}
+    for row in counts:
+        key = (row["student_id"], row["section_id"], row["month"])
+        if key in keys:
+            summaries[key] = AttendanceSummary(
+                student_id=row["student_id"],
+                section_id=row["section_id"],
+                month=row["month"],
+                days_present=row["days_present"],
+                days_total=row["days_total"],
+                is_stale=False,
+            )
+    AttendanceSummary.objects.bulk_create(
+        summaries.values(),
+        update_conflicts=True,
+        unique_fields=["student", "section", "month"],
+        update_fields=["days_present", "days_total", "is_stale", "updated_at"],
+    )
+    emptied = keys - summaries.keys()
+    if emptied:
+        AttendanceSummary.objects.filter(
+            reduce(
+                or_,
+                (
+                    Q(student_id=student_id, section_id=section_id, month=month)
+                    for student_id, section_id, month in emptied
+                ),
+            )
+        ).delete()
+
+
+def refresh_attendance_summaries(chunk_size=SUMMARY_CHUNK_SIZE):
+    """
+    Bring ``AttendanceSummary`` up to date with ``Attendance``.
+
+    Only the student/section/month keys touched since the last run are
+    recomputed: rows whose ``updated_at`` is past the watermark, plus
+    summaries flagged stale because rows were deleted. The watermark row is
+    locked for the duration, so overlapping runs queue instead of racing.
+    Returns the number of keys refreshed.
+    """
+    with transaction.atomic():
+        watermark, _ = Watermark.objects.select_for_update().get_or_create(
+            name=SUMMARY_WATERMARK
+        )
+        scanned_at = timezone.now()
+        changed = Attendance.objects.order_by()
+        if watermark.value is not None:
+            changed = changed.filter(updated_at__gt=watermark.value)
+
+        keys = set(
+            changed.annotate(month=TruncMonth("date"))
+            .values_list("student_id", "section_id", "month")
+            .distinct()
+        )
+        keys.update(
+            AttendanceSummary.objects.filter(is_stale=True)
+            .order_by()
+            .values_list("student_id", "section_id", "month")
+        )
+
+        # Sorting by month keeps each chunk's date range narrow.
+        ordered = sorted(keys, key=lambda key: (key[2], key[1], key[0]))
+        for start in range(0, len(ordered), chunk_size):
+            _summarise(set(ordered[start : start + chunk_size]))
+
+        watermark.value = scanned_at - SUMMARY_OVERLAP
+        watermark.save(update_fields=["value", "updated_at"])
+    return len(keys)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from apps.core.uploads import upsert_rows
+from .models import Assessment, AssessmentResult
+from .serializers import MarksUploadRowSerializer
+
+User = get_user_model()
+
+MARKS_BATCH_SIZE = 500
+MARKS_EXCEED_TOTAL = "Marks obtained cannot be greater than total marks"
+
+
+def record_marks(rows, assessments=None, batch_size=MARKS_BATCH_SIZE):
+    """
+    Upsert a batch of assessment results and report the outcome of every row.
+
+    ``assessments`` limits which assessments the upload may touch (defaults
+    to all). The assessments and students named in the upload are loaded
+    with one query each, every row is checked against its assessment's
+    ``total_marks`` in memory and the accepted rows are written by
+    ``upsert_rows`` with ``ON CONFLICT (assessment, student) DO UPDATE``.
+    """
+    if assessments is None:
+        assessments = Assessment.objects.all()
+
+    def check(accepted):
+        total_marks = dict(
+            assessments.filter(id__in={key[0] for key in accepted})
+            .order_by()
+            .values_list("id", "total_marks")
+        )
+        known_students = set(
+            User.objects.filter(id__in={key[1] for key in accepted}, role=User.STUDENT)
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        errors = {}
+        for key, data in accepted.items():
+            row_errors = {}
+            if data["assessment_id"] not in total_marks:
+                row_errors["assessment_id"] = ["Invalid assessment."]
+            elif data["marks_obtained"] > total_marks[data["assessment_id"]]:
+                row_errors["marks_obtained"] = [MARKS_EXCEED_TOTAL]
+            if data["student_id"] not in known_students:
+                row_errors["student_id"] = ["Invalid student."]
+            if row_errors:
+                errors[key] = row_errors
+        return errors
+
+    def existing(keys):
+        return set(
+            AssessmentResult.objects.filter(
+                assessment_id__in={key[0] for key in keys},
+                student_id__in={key[1] for key in keys},
+            )
+            .order_by()
+            .values_list("assessment_id", "student_id")
+        )
+
+    return upsert_rows(
+        rows,
+        model=AssessmentResult,
+        row_serializer=MarksUploadRowSerializer(),
+        key=lambda data: (data["assessment_id"], data["student_id"]),
+        check=check,
+        existing=existing,
+        unique_fields=["assessment", "student"],
+        update_fields=["marks_obtained", "remarks", "updated_at"],
+        batch_size=batch_size,
+    )
@@ -0,0 +1,119 @@
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_tenants.utils import schema_context
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.academic.models import AcademicYear, Attendance, Class, Section
+from apps.academic.views import AttendanceViewSet
+
+User = get_user_model()
+
+PREFIX = "bench_roll"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the attendance roll-call endpoint by posting a full morning "
+        "roll (students x sections) into a tenant schema."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schema", required=True, help="Tenant schema to use")
+        parser.add_argument("--sections", type=int, default=200)
+        parser.add_argument(
+            "--students", type=int, default=60, help="Students per section"
+        )
+        parser.add_argument(
+            "--legacy",
+            action="store_true",
+            help="Also time the per-row serializer based bulk_create action",
+        )
+
+    def handle(self, *args, **options):
+        with schema_context(options["schema"]):
+            teacher, rows = self.seed(options["sections"], options["students"])
+            try:
+                self.stdout.write(
+                    f"Posting {len(rows)} rows "
+                    f"({options['sections']} sections x {options['students']} students)"
+                )
+                self.run(teacher, "roll_call", rows, "roll-call (insert)")
+                self.run(teacher, "roll_call", rows, "roll-call (update)")
+                if options["legacy"]:
+                    Attendance.objects.filter(
+                        student__username__startswith=PREFIX
+                    ).delete()
+                    self.run(teacher, "bulk_create", rows, "legacy bulk_create")
+            finally:
+                self.cleanup()
+
+    def seed(self, section_count, students_per_section):
+        self.cleanup()
+        today = date.today()
+        academic_year = AcademicYear.objects.create(
+            name=f"{PREFIX}-{today.year}",
+            start_date=date(today.year, 4, 1),
+            end_date=date(today.year + 1, 3, 31),
+        )
+        class_name = Class.objects.create(name=PREFIX)
+        teacher = User.objects.create(
+            username=f"{PREFIX}_teacher",
+            role=User.TEACHER,
+            password=make_password(None),
+        )
+        sections = Section.objects.bulk_create(
+            Section(
+                name=f"{PREFIX}-{index}",
+                class_name=class_name,
+                teacher=teacher,
+                academic_year=academic_year,
+            )
+            for index in range(section_count)
+        )
+        password = make_password(None)
+        students = User.objects.bulk_create(
+            User(
+                username=f"{PREFIX}_{index}",
+                role=User.STUDENT,
+                password=password,
+            )
+            for index in range(section_count * students_per_section)
+        )
+        rows = [
+            {
+                "student_id": student.id,
+                "section_id": sections[index // students_per_section].id,
+                "date": today.isoformat(),
+                "is_present": index % 10 != 0,
+                "remarks": "",
+            }
+            for index, student in enumerate(students)
+        ]
+        return teacher, rows
+
+    def run(self, teacher, action, rows, label):
+        factory = APIRequestFactory()
+        view = AttendanceViewSet.as_view({"post": action})
+        request = factory.post(
+            f"/api/academic/attendance/{action}/", rows, format="json"
+        )
+        force_authenticate(request, user=teacher)
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = view(request)
+            elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label:<22} status={response.status_code} "
+            f"queries={len(queries):<6} time={elapsed * 1000:.0f}ms"
+        )
+
+    def cleanup(self):
+        Class.objects.filter(name=PREFIX).delete()
+        AcademicYear.objects.filter(name__startswith=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
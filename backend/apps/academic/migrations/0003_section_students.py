@@ -0,0 +1,25 @@
+# Generated by Django 4.2.17 on 2026-10-18 01:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("academic", "0002_academicyear_month_range"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="section",
+            name="students",
+            field=models.ManyToManyField(
+                blank=True,
+                limit_choices_to={"role": "student"},
+                related_name="enrolled_sections",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("academic", "0004_attendance_summary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(fields=["-date", "-id"], name="attendance_date_id_idx"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("academic", "0005_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["section", "-date", "-id"], name="attendance_section_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["student", "-date", "-id"], name="attendance_student_date_idx"
+            ),
+        ),
+    ]
@@ -1,6 +1,17 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from apps.accounts.models import User
+from .querysets import (
+    SectionQuerySet,
+    SubjectQuerySet,
+    AttendanceQuerySet,
+    AttendanceSummaryQuerySet,
+    AssessmentQuerySet,
+    AssessmentResultQuerySet,
+    AssignmentQuerySet,
+    AssignmentSubmissionQuerySet,
+    TimetableQuerySet,
+)
 
 
 class AcademicYear(models.Model):
@@ -77,9 +88,17 @@ class Section(models.Model):
     academic_year = models.ForeignKey(
         AcademicYear, on_delete=models.CASCADE, related_name="sections"
     )
+    students = models.ManyToManyField(
+        User,
+        blank=True,
+        related_name="enrolled_sections",
+        limit_choices_to={"role": User.STUDENT},
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SectionQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.class_name} - {self.name}"
 
@@ -101,6 +120,8 @@ class Subject(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SubjectQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.code})"
 
@@ -118,9 +139,59 @@ class Attendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AttendanceQuerySet.as_manager()
+
     class Meta:
         unique_together = ["student", "section", "date"]
         ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["-date", "-id"], name="attendance_date_id_idx"),
+            # Teachers list their sections' rolls, students their own.
+            models.Index(
+                fields=["section", "-date", "-id"], name="attendance_section_date_idx"
+            ),
+            models.Index(
+                fields=["student", "-date", "-id"], name="attendance_student_date_idx"
+            ),
+        ]
+
+
+class AttendanceSummary(models.Model):
+    """
+    Monthly attendance rollup per student and section.
+
+    Maintained incrementally from ``Attendance`` by
+    ``apps.academic.attendance.refresh_attendance_summaries``; never edited
+    by hand.
+    """
+
+    student = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="attendance_summaries"
+    )
+    section = models.ForeignKey(
+        Section, on_delete=models.CASCADE, related_name="attendance_summaries"
+    )
+    month = models.DateField(help_text="First day of the month")
+    days_present = models.PositiveIntegerField(default=0)
+    days_total = models.PositiveIntegerField(default=0)
+    is_stale = models.BooleanField(
+        default=False,
+        help_text="Set when attendance rows were deleted since the last refresh",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AttendanceSummaryQuerySet.as_manager()
+
+    class Meta:
+        unique_together = ["student", "section", "month"]
+        ordering = ["-month"]
+        verbose_name_plural = "Attendance Summaries"
+
+    @property
+    def percentage(self):
+        if not self.days_total:
+            return None
+        return round(100 * self.days_present / self.days_total, 2)
 
 
 class Assessment(models.Model):
@@ -136,6 +207,8 @@ class Assessment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AssessmentQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} - {self.subject}"
 
@@ -152,6 +225,8 @@ class AssessmentResult(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AssessmentResultQuerySet.as_manager()
+
     class Meta:
         unique_together = ["assessment", "student"]
 
@@ -174,6 +249,8 @@ class Assignment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AssignmentQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
@@ -192,6 +269,8 @@ class AssignmentSubmission(models.Model):
         null=True, blank=True, validators=[MinValueValidator(0), MaxValueValidator(100)]
     )
 
+    objects = AssignmentSubmissionQuerySet.as_manager()
+
     class Meta:
         unique_together = ["assignment", "student"]
 
@@ -219,6 +298,8 @@ class Timetable(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TimetableQuerySet.as_manager()
+
     class Meta:
         unique_together = ["section", "weekday", "start_time"]
         ordering = ["weekday", "start_time"]
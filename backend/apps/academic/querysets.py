@@ -0,0 +1,83 @@
+from django.db import models
+from django.db.models import Count, Prefetch
+
+# Query plans for the academic list endpoints. Each ``for_listing()`` joins or
+# prefetches everything the matching list serializer renders, so a page costs
+# the same number of queries whether it holds one row or a hundred.
+
+SUBJECT_RELATIONS = ("subject__class_name", "subject__teacher")
+
+
+def _listed_sections():
+    from .models import Section
+
+    return Section.objects.for_listing()
+
+
+def _listed_assignments():
+    from .models import Assignment
+
+    return Assignment.objects.for_listing()
+
+
+class SectionQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related("class_name", "teacher", "academic_year").annotate(
+            student_count=Count("students", distinct=True)
+        )
+
+
+class SubjectQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related("class_name", "teacher")
+
+
+class AttendanceQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related("student").prefetch_related(
+            Prefetch("section", queryset=_listed_sections())
+        )
+
+
+class AttendanceSummaryQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related("student", "section__class_name")
+
+
+class AssessmentQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related(*SUBJECT_RELATIONS).prefetch_related(
+            Prefetch("section", queryset=_listed_sections())
+        )
+
+
+class AssessmentResultQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related(
+            "student",
+            "assessment__subject__class_name",
+            "assessment__subject__teacher",
+        ).prefetch_related(Prefetch("assessment__section", queryset=_listed_sections()))
+
+
+class AssignmentQuerySet(models.QuerySet):
+    def for_listing(self):
+        return (
+            self.select_related(*SUBJECT_RELATIONS)
+            .prefetch_related(Prefetch("section", queryset=_listed_sections()))
+            .annotate(submission_count=Count("submissions", distinct=True))
+        )
+
+
+class AssignmentSubmissionQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related("student").prefetch_related(
+            Prefetch("assignment", queryset=_listed_assignments())
+        )
+
+
+class TimetableQuerySet(models.QuerySet):
+    def for_listing(self):
+        return self.select_related(*SUBJECT_RELATIONS).prefetch_related(
+            Prefetch("section", queryset=_listed_sections())
+        )
@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q, Sum
+from django.template.loader import render_to_string
+from .models import Assessment, AssessmentResult
+
+User = get_user_model()
+
+
+def _percentage(obtained, possible):
+    if not possible:
+        return None
+    return round(100 * obtained / possible, 2)
+
+
+def build_report_cards(section):
+    """
+    Totals, percentages, ranks and subject averages for every student of a
+    section.
+
+    The section's assessments, the marks grouped per student and subject,
+    and the students themselves are fetched with one query each, so the cost
+    does not grow with the number of students. A missed assessment counts as
+    zero: every student is measured against the full marks of the section's
+    assessments in each subject. Ranks are competition ranks on total marks
+    (1, 2, 2, 4).
+    """
+    subjects = {}
+    for assessment in (
+        Assessment.objects.filter(section=section)
+        .order_by()
+        .values("subject_id", "subject__name", "total_marks")
+    ):
+        subject = subjects.setdefault(
+            assessment["subject_id"],
+            {
+                "id": assessment["subject_id"],
+                "name": assessment["subject__name"],
+                "total_marks": 0,
+            },
+        )
+        subject["total_marks"] += assessment["total_marks"]
+
+    marks = {}
+    for row in (
+        AssessmentResult.objects.filter(assessment__section=section)
+        .values("student_id", "assessment__subject_id")
+        .annotate(obtained=Sum("marks_obtained"))
+        .order_by()
+    ):
+        marks.setdefault(row["student_id"], {})[row["assessment__subject_id"]] = row[
+            "obtained"
+        ]
+
+    students = User.objects.filter(
+        Q(id__in=marks.keys()) | Q(enrolled_sections=section)
+    ).distinct()
+    ordered_subjects = sorted(subjects.values(), key=lambda subject: subject["name"])
+    possible = sum(subject["total_marks"] for subject in ordered_subjects)
+
+    cards = []
+    for student in students.order_by("first_name", "last_name", "username"):
+        student_marks = marks.get(student.id, {})
+        obtained = sum(student_marks.values())
+        cards.append(
+            {
+                "id": student.id,
+                "username": student.username,
+                "name": student.get_full_name() or student.username,
+                "subjects": [
+                    {
+                        "id": subject["id"],
+                        "name": subject["name"],
+                        "marks_obtained": student_marks.get(subject["id"], 0),
+                        "total_marks": subject["total_marks"],
+                        "percentage": _percentage(
+                            student_marks.get(subject["id"], 0),
+                            subject["total_marks"],
+                        ),
+                    }
+                    for subject in ordered_subjects
+                ],
+                "marks_obtained": obtained,
+                "total_marks": possible,
+                "percentage": _percentage(obtained, possible),
+            }
+        )
+
+    cards.sort(key=lambda card: -card["marks_obtained"])
+    for position, card in enumerate(cards):
+        if position and card["marks_obtained"] == cards[position - 1]["marks_obtained"]:
+            card["rank"] = cards[position - 1]["rank"]
+        else:
+            card["rank"] = position + 1
+
+    for position, subject in enumerate(ordered_subjects):
+        average = None
+        if cards:
+            average = round(
+                sum(card["subjects"][position]["marks_obtained"] for card in cards)
+                / len(cards),
+                2,
+            )
+        subject["average_marks"] = average
+        for card in cards:
+            card["subjects"][position]["section_average"] = average
+
+    return {
+        "section": {
+            "id": section.id,
+            "name": section.name,
+            "class_name": section.class_name.name,
+            "academic_year": section.academic_year.name,
+        },
+        "subjects": ordered_subjects,
+        "average_percentage": _percentage(
+            sum(card["marks_obtained"] for card in cards), possible * len(cards)
+        ),
+        "students": cards,
+    }
+
+
+def render_report_cards(report):
+    """Render the cards of ``build_report_cards`` as one printable HTML page."""
+    return render_to_string("academic/report_cards.html", {"report": report})
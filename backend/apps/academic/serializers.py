@@ -1,17 +1,20 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from .models import (
     AcademicYear,
     Class,
     Section,
     Subject,
     Attendance,
+    AttendanceSummary,
     Assessment,
     AssessmentResult,
     Assignment,
     AssignmentSubmission,
     Timetable,
 )
+from .timetable import TimetablePlanner
 from apps.accounts.serializers import UserSerializer
 
 User = get_user_model()
@@ -51,6 +54,9 @@ class SectionListSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at"]
 
     def get_student_count(self, obj):
+        # Annotated by Section.objects.for_listing(); fall back for bare instances.
+        if hasattr(obj, "student_count"):
+            return obj.student_count
         return obj.students.count()
 
 
@@ -112,6 +118,54 @@ class AttendanceSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at"]
 
 
+class AttendanceRollCallRowSerializer(serializers.Serializer):
+    """Shape-only validation for one roll-call row; relations are resolved in bulk."""
+
+    student_id = serializers.IntegerField(min_value=1)
+    section_id = serializers.IntegerField(min_value=1)
+    date = serializers.DateField()
+    is_present = serializers.BooleanField(default=True)
+    remarks = serializers.CharField(allow_blank=True, required=False, default="")
+
+
+class AttendanceSummarySerializer(serializers.ModelSerializer):
+    student = UserSerializer(read_only=True)
+    section_name = serializers.CharField(source="section.name", read_only=True)
+    class_name = serializers.CharField(source="section.class_name.name", read_only=True)
+    percentage = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = AttendanceSummary
+        fields = [
+            "id",
+            "student",
+            "section",
+            "section_name",
+            "class_name",
+            "month",
+            "days_present",
+            "days_total",
+            "percentage",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
+class SectionAttendanceTotalSerializer(serializers.Serializer):
+    section = serializers.IntegerField(source="section_id")
+    section_name = serializers.CharField(source="section__name")
+    class_name = serializers.CharField(source="section__class_name__name")
+    month = serializers.DateField()
+    days_present = serializers.IntegerField()
+    days_total = serializers.IntegerField()
+    percentage = serializers.SerializerMethodField()
+
+    def get_percentage(self, row):
+        if not row["days_total"]:
+            return None
+        return round(100 * row["days_present"] / row["days_total"], 2)
+
+
 class AssessmentSerializer(serializers.ModelSerializer):
     subject = SubjectSerializer(read_only=True)
     section = SectionListSerializer(read_only=True)
@@ -170,6 +224,15 @@ class AssessmentResultSerializer(serializers.ModelSerializer):
         return data
 
 
+class MarksUploadRowSerializer(serializers.Serializer):
+    """Shape-only validation for one row of a bulk marks upload."""
+
+    assessment_id = serializers.IntegerField(min_value=1)
+    student_id = serializers.IntegerField(min_value=1)
+    marks_obtained = serializers.IntegerField(min_value=0)
+    remarks = serializers.CharField(allow_blank=True, required=False, default="")
+
+
 class AssignmentSerializer(serializers.ModelSerializer):
     subject = SubjectSerializer(read_only=True)
     section = SectionListSerializer(read_only=True)
@@ -199,6 +262,8 @@ class AssignmentSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at"]
 
     def get_submission_count(self, obj):
+        if hasattr(obj, "submission_count"):
+            return obj.submission_count
         return obj.submissions.count()
 
 
@@ -254,31 +319,39 @@ class TimetableSerializer(serializers.ModelSerializer):
         read_only_fields = ["created_at"]
 
     def validate(self, data):
-        # Check for time slot conflicts
-        conflicts = Timetable.objects.filter(
-            section=data["section"], weekday=data["weekday"]
-        ).exclude(id=self.instance.id if self.instance else None)
-
-        for entry in conflicts:
-            if (
-                (
-                    data["start_time"] >= entry.start_time
-                    and data["start_time"] < entry.end_time
-                )
-                or (
-                    data["end_time"] > entry.start_time
-                    and data["end_time"] <= entry.end_time
-                )
-                or (
-                    data["start_time"] <= entry.start_time
-                    and data["end_time"] >= entry.end_time
-                )
-            ):
-                raise serializers.ValidationError(
-                    "This time slot conflicts with another entry"
-                )
-
         if data["start_time"] >= data["end_time"]:
             raise serializers.ValidationError("End time must be after start time")
 
+        section_id = data["section"].id
+        teacher_id = data["subject"].teacher_id
+        planner = TimetablePlanner(
+            [section_id],
+            [teacher_id] if teacher_id else [],
+            exclude=Q(id=self.instance.id) if self.instance else None,
+        )
+        conflicts = planner.conflicts(
+            section_id,
+            teacher_id,
+            data["weekday"],
+            data["start_time"],
+            data["end_time"],
+        )
+        if conflicts:
+            raise serializers.ValidationError(conflicts)
+
+        return data
+
+
+class TimetableImportRowSerializer(serializers.Serializer):
+    """Shape-only validation for one row of a bulk timetable upload."""
+
+    section_id = serializers.IntegerField(min_value=1)
+    subject_id = serializers.IntegerField(min_value=1)
+    weekday = serializers.ChoiceField(choices=Timetable.WEEKDAY_CHOICES)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+    def validate(self, data):
+        if data["start_time"] >= data["end_time"]:
+            raise serializers.ValidationError("End time must be after start time")
         return data
@@ -0,0 +1,60 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Attendance, AttendanceSummary, Section, Subject
+from .visibility import invalidate_visibility
+
+
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+def invalidate_visibility_on_assignment(sender, **kwargs):
+    """Teacher or class changes on a section/subject alter who may see it."""
+    invalidate_visibility()
+
+
+@receiver(m2m_changed, sender=Section.students.through)
+def invalidate_visibility_on_enrollment(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_visibility()
+
+
+def _mark_summary_stale(student_id, section_id, day):
+    # update() skips auto_now, so updated_at is set here.
+    AttendanceSummary.objects.filter(
+        student_id=student_id, section_id=section_id, month=day.replace(day=1)
+    ).update(is_stale=True, updated_at=timezone.now())
+
+
+@receiver(pre_save, sender=Attendance)
+def mark_moved_attendance_summary_stale(sender, instance, raw=False, **kwargs):
+    """
+    A row moved to another student, section or month is only picked up by
+    ``updated_at`` under its new key, so flag the summary it leaves.
+    """
+    if raw or instance.pk is None:
+        return
+    previous = (
+        Attendance.objects.filter(pk=instance.pk)
+        .values_list("student_id", "section_id", "date")
+        .first()
+    )
+    if previous is None:
+        return
+    student_id, section_id, day = previous
+    if (student_id, section_id, day.replace(day=1)) != (
+        instance.student_id,
+        instance.section_id,
+        instance.date.replace(day=1),
+    ):
+        _mark_summary_stale(student_id, section_id, day)
+
+
+@receiver(post_delete, sender=Attendance)
+def mark_attendance_summary_stale(sender, instance, **kwargs):
+    """
+    Deletions leave no ``updated_at`` behind, so flag the month's summary for
+    the next incremental refresh instead.
+    """
+    _mark_summary_stale(instance.student_id, instance.section_id, instance.date)
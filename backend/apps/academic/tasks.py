@@ -0,0 +1,42 @@
+from celery import shared_task
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.utils import timezone
+from django_tenants.utils import schema_context
+from apps.core.tenants import tenant_schema_names
+from .attendance import refresh_attendance_summaries
+from .models import Section
+from .report_cards import build_report_cards, render_report_cards
+
+
+@shared_task
+def refresh_all_attendance_summaries():
+    """Periodic entry point: queue one incremental refresh per school."""
+    for schema_name in tenant_schema_names():
+        refresh_school_attendance_summaries.delay(schema_name)
+
+
+@shared_task
+def refresh_school_attendance_summaries(schema_name):
+    with schema_context(schema_name):
+        return refresh_attendance_summaries()
+
+
+@shared_task
+def render_section_report_cards(schema_name, section_id):
+    """
+    Render a section's report cards to one HTML file in private storage and
+    return its path; the file is downloaded from
+    ``/api/core/tasks/<task_id>/file/`` by whoever queued the job.
+    """
+    with schema_context(schema_name):
+        section = Section.objects.select_related("class_name", "academic_year").get(
+            pk=section_id
+        )
+        html = render_report_cards(build_report_cards(section))
+    path = storages["private"].save(
+        f"report_cards/{schema_name}/section-{section_id}-"
+        f"{timezone.now():%Y%m%d%H%M%S}.html",
+        ContentFile(html.encode()),
+    )
+    return {"path": path}
@@ -0,0 +1,124 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import AcademicYear, Attendance, Class, Section
+from apps.academic.views import AttendanceViewSet
+from apps.academic.visibility import get_visibility
+from apps.accounts.models import User
+
+
+@pytest.fixture
+def teacher(tenant):
+    return User.objects.create_user(
+        username="teacher", password="testpass123", role="teacher"
+    )
+
+
+@pytest.fixture
+def section(teacher):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+    )
+    class_name = Class.objects.create(name="Grade 5")
+    return Section.objects.create(
+        name="A", class_name=class_name, teacher=teacher, academic_year=academic_year
+    )
+
+
+@pytest.fixture
+def students(tenant):
+    return [
+        User.objects.create_user(
+            username=f"student{index}", password="testpass123", role="student"
+        )
+        for index in range(3)
+    ]
+
+
+def post_roll_call(user, rows):
+    request = APIRequestFactory().post(
+        "/api/academic/attendance/roll-call/", rows, format="json"
+    )
+    force_authenticate(request, user=user)
+    return AttendanceViewSet.as_view({"post": "roll_call"})(request)
+
+
+def roll(section, students, is_present=True):
+    return [
+        {
+            "student_id": student.id,
+            "section_id": section.id,
+            "date": "2024-07-01",
+            "is_present": is_present,
+        }
+        for student in students
+    ]
+
+
+@pytest.mark.django_db
+class TestAttendanceRollCall:
+    def test_creates_whole_roll(self, teacher, section, students):
+        response = post_roll_call(teacher, roll(section, students))
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 3
+        assert response.data["updated"] == 0
+        assert Attendance.objects.filter(section=section).count() == 3
+
+    def test_resubmission_updates_existing_rows(self, teacher, section, students):
+        post_roll_call(teacher, roll(section, students))
+        response = post_roll_call(teacher, roll(section, students, is_present=False))
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["updated"] == 3
+        assert Attendance.objects.filter(section=section).count() == 3
+        assert not Attendance.objects.filter(is_present=True).exists()
+
+    def test_reports_invalid_rows_without_aborting(self, teacher, section, students):
+        rows = roll(section, students)
+        rows.append(
+            {"student_id": teacher.id, "section_id": section.id, "date": "2024-07-01"}
+        )
+        rows.append({"student_id": students[0].id, "section_id": 999999, "date": "bad"})
+        response = post_roll_call(teacher, rows)
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert response.data["created"] == 3
+        assert response.data["failed"] == 2
+        assert response.data["results"][3]["errors"] == {
+            "student_id": ["Invalid student."]
+        }
+        assert "date" in response.data["results"][4]["errors"]
+
+    def test_query_count_does_not_scale_with_roll_size(
+        self, teacher, section, students
+    ):
+        # Load the teacher's cached visibility outside both measurements.
+        get_visibility(teacher)
+        with CaptureQueriesContext(connection) as single_row:
+            post_roll_call(teacher, roll(section, students[:1]))
+        Attendance.objects.all().delete()
+        with CaptureQueriesContext(connection) as whole_roll:
+            post_roll_call(teacher, roll(section, students))
+        assert len(whole_roll) == len(single_row)
+
+    def test_teachers_only_post_their_own_sections(self, teacher, section, students):
+        other = User.objects.create_user(username="other", role="teacher")
+        other_section = Section.objects.create(
+            name="B",
+            class_name=section.class_name,
+            teacher=other,
+            academic_year=section.academic_year,
+        )
+        response = post_roll_call(teacher, roll(other_section, students[:1]))
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert response.data["results"][0]["errors"] == {
+            "section_id": ["Invalid section."]
+        }
+        assert not Attendance.objects.exists()
+        response = post_roll_call(other, roll(other_section, students[:1]))
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_rejects_non_list_payload(self, teacher):
+        response = post_roll_call(teacher, {"student_id": 1})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
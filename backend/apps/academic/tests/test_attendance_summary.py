@@ -0,0 +1,145 @@
+import pytest
+from datetime import date, timedelta
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.attendance import refresh_attendance_summaries
+from apps.academic.models import (
+    AcademicYear,
+    Attendance,
+    AttendanceSummary,
+    Class,
+    Section,
+)
+from apps.academic.tasks import refresh_school_attendance_summaries
+from apps.academic.views import AttendanceSummaryViewSet
+from apps.accounts.models import StudentProfile, User
+
+
+@pytest.fixture
+def school(tenant):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+    )
+    section = Section.objects.create(
+        name="A",
+        class_name=Class.objects.create(name="Grade 5"),
+        academic_year=academic_year,
+    )
+    parent = User.objects.create_user(username="parent", role="parent")
+    students = [
+        User.objects.create_user(username=f"student{i}", role="student")
+        for i in range(2)
+    ]
+    StudentProfile.objects.create(
+        user=students[0],
+        admission_number="ADM-1",
+        date_of_birth=date(2014, 1, 1),
+        parent=parent,
+    )
+    # Student 0 misses one of three days in April, student 1 misses none.
+    for day, present in [(1, True), (2, False), (3, True)]:
+        Attendance.objects.create(
+            student=students[0],
+            section=section,
+            date=date(2024, 4, day),
+            is_present=present,
+        )
+        Attendance.objects.create(
+            student=students[1], section=section, date=date(2024, 4, day)
+        )
+    Attendance.objects.create(
+        student=students[0], section=section, date=date(2024, 5, 2)
+    )
+    return {"section": section, "parent": parent, "students": students}
+
+
+def summary(student, month):
+    return AttendanceSummary.objects.get(student=student, month=month)
+
+
+def age_attendance():
+    """Move every row out of the refresh overlap window."""
+    Attendance.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+
+@pytest.mark.django_db
+class TestAttendanceSummaryRefresh:
+    def test_first_refresh_builds_every_month(self, school):
+        assert refresh_attendance_summaries() == 3
+        april = summary(school["students"][0], date(2024, 4, 1))
+        assert (april.days_present, april.days_total) == (2, 3)
+        assert april.percentage == 66.67
+        assert summary(school["students"][1], date(2024, 4, 1)).percentage == 100
+        assert summary(school["students"][0], date(2024, 5, 1)).days_total == 1
+
+    def test_only_changed_rows_are_reprocessed(self, school):
+        age_attendance()
+        refresh_attendance_summaries()
+        assert refresh_attendance_summaries() == 0
+
+        row = Attendance.objects.get(student=school["students"][1], date="2024-04-02")
+        row.is_present = False
+        row.save()
+        assert refresh_attendance_summaries() == 1
+        assert summary(school["students"][1], date(2024, 4, 1)).days_present == 2
+
+    def test_deleted_rows_are_picked_up(self, school):
+        age_attendance()
+        refresh_attendance_summaries()
+        student = school["students"][0]
+
+        Attendance.objects.filter(student=student, date="2024-04-02").delete()
+        Attendance.objects.filter(student=student, date="2024-05-02").delete()
+        assert refresh_attendance_summaries() == 2
+        april = summary(student, date(2024, 4, 1))
+        assert (april.days_present, april.days_total, april.is_stale) == (2, 2, False)
+        assert not AttendanceSummary.objects.filter(
+            student=student, month=date(2024, 5, 1)
+        ).exists()
+
+    def test_moved_rows_refresh_the_month_they_left(self, school):
+        age_attendance()
+        refresh_attendance_summaries()
+        student = school["students"][0]
+        stamped = summary(student, date(2024, 4, 1)).updated_at
+
+        row = Attendance.objects.get(student=student, date="2024-04-02")
+        row.date = date(2024, 5, 3)
+        row.save()
+        april = summary(student, date(2024, 4, 1))
+        assert april.is_stale and april.updated_at > stamped
+        assert refresh_attendance_summaries() == 2
+        april = summary(student, date(2024, 4, 1))
+        assert (april.days_present, april.days_total) == (2, 2)
+        may = summary(student, date(2024, 5, 1))
+        assert (may.days_present, may.days_total) == (1, 2)
+
+    def test_task_refreshes_the_given_school(self, school, tenant):
+        assert refresh_school_attendance_summaries(tenant.schema_name) == 3
+        assert AttendanceSummary.objects.count() == 3
+
+
+@pytest.mark.django_db
+class TestAttendanceSummaryAPI:
+    def get(self, user, action="list", **params):
+        request = APIRequestFactory().get("/", params)
+        force_authenticate(request, user=user)
+        return AttendanceSummaryViewSet.as_view({"get": action})(request)
+
+    def test_parent_sees_only_their_child(self, school):
+        refresh_attendance_summaries()
+        response = self.get(school["parent"])
+        assert {row["student"]["id"] for row in response.data["results"]} == {
+            school["students"][0].id
+        }
+        assert len(response.data["results"]) == 2
+
+    def test_section_totals(self, school):
+        refresh_attendance_summaries()
+        admin = User.objects.create_user(username="admin", role="super_admin")
+        response = self.get(admin, action="sections", month="2024-04-01")
+        assert len(response.data) == 1
+        totals = response.data[0]
+        assert totals["section"] == school["section"].id
+        assert (totals["days_present"], totals["days_total"]) == (5, 6)
+        assert totals["percentage"] == 83.33
@@ -0,0 +1,118 @@
+import csv
+import io
+import pytest
+from datetime import date, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import AcademicYear, Attendance, Class, Section
+from apps.academic.views import AttendanceViewSet, SectionViewSet
+from apps.accounts.models import User
+
+
+@pytest.fixture
+def school(tenant):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+    )
+    grade5 = Class.objects.create(name="Grade 5")
+    teacher = User.objects.create_user(username="teacher", role="teacher")
+    admin = User.objects.create_user(username="admin", role="super_admin")
+    section = Section.objects.create(
+        name="A", class_name=grade5, teacher=teacher, academic_year=academic_year
+    )
+    other = Section.objects.create(
+        name="B", class_name=grade5, academic_year=academic_year
+    )
+    students = [
+        User.objects.create_user(username=f"student{i}", role="student")
+        for i in range(3)
+    ]
+    section.students.add(*students)
+    return {
+        "teacher": teacher,
+        "admin": admin,
+        "section": section,
+        "other": other,
+        "students": students,
+    }
+
+
+def record_days(section, students, days):
+    Attendance.objects.bulk_create(
+        Attendance(
+            student=student,
+            section=section,
+            date=date(2024, 7, 1) + timedelta(days=day),
+            is_present=day % 2 == 0,
+        )
+        for student in students
+        for day in range(days)
+    )
+
+
+def export(viewset, user, **params):
+    request = APIRequestFactory().get("/", params)
+    force_authenticate(request, user=user)
+    return viewset.as_view({"get": "export"})(request)
+
+
+def read_csv(response):
+    return list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+
+@pytest.mark.django_db
+class TestExport:
+    def test_streams_scoped_attendance_as_csv(self, school):
+        record_days(school["section"], school["students"], 20)
+        record_days(school["other"], school["students"][:1], 5)
+        response = export(AttendanceViewSet, school["teacher"])
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv"
+        rows = read_csv(response)
+        assert rows[0] == [
+            "ID",
+            "Date",
+            "Student",
+            "Class",
+            "Section",
+            "Present",
+            "Remarks",
+        ]
+        # Past page one and limited to the teacher's homeroom section.
+        assert len(rows) == 61
+        assert {row[4] for row in rows[1:]} == {"A"}
+
+    def test_search_narrows_the_export(self, school):
+        record_days(school["section"], school["students"], 3)
+        response = export(AttendanceViewSet, school["admin"], search="student1")
+        assert {row[2] for row in read_csv(response)[1:]} == {"student1"}
+
+    def test_query_count_is_independent_of_size(self, school):
+        record_days(school["section"], school["students"][:1], 1)
+        with CaptureQueriesContext(connection) as small:
+            read_csv(export(AttendanceViewSet, school["admin"]))
+        record_days(school["section"], school["students"][1:], 40)
+        with CaptureQueriesContext(connection) as large:
+            read_csv(export(AttendanceViewSet, school["admin"]))
+        assert len(large) == len(small)
+
+    def test_section_export_includes_enrolment(self, school):
+        rows = read_csv(export(SectionViewSet, school["admin"]))
+        assert rows[0][-1] == "Students"
+        assert {row[2]: row[-1] for row in rows[1:]} == {"A": "3", "B": "0"}
+
+    def test_xlsx(self, school):
+        openpyxl = pytest.importorskip("openpyxl")
+        record_days(school["section"], school["students"], 2)
+        response = export(AttendanceViewSet, school["admin"], export_format="xlsx")
+        sheet = openpyxl.load_workbook(
+            io.BytesIO(b"".join(response.streaming_content))
+        ).active
+        rows = list(sheet.values)
+        assert rows[0][:3] == ("ID", "Date", "Student")
+        assert len(rows) == 7
+
+    def test_unknown_format_is_rejected(self, school):
+        response = export(AttendanceViewSet, school["admin"], export_format="pdf")
+        assert response.status_code == 400
@@ -0,0 +1,140 @@
+import pytest
+from datetime import date
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.grading import MARKS_EXCEED_TOTAL
+from apps.academic.models import (
+    AcademicYear,
+    Assessment,
+    AssessmentResult,
+    Class,
+    Section,
+    Subject,
+)
+from apps.academic.views import AssessmentResultViewSet
+from apps.accounts.models import User
+
+
+@pytest.fixture
+def school(tenant):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+    )
+    grade5 = Class.objects.create(name="Grade 5")
+    teacher = User.objects.create_user(username="teacher", role="teacher")
+    section = Section.objects.create(
+        name="A", class_name=grade5, academic_year=academic_year
+    )
+    maths = Subject.objects.create(
+        name="Maths", code="M5", class_name=grade5, teacher=teacher
+    )
+    art = Subject.objects.create(name="Art", code="A5", class_name=grade5)
+    return {
+        "teacher": teacher,
+        "maths_test": Assessment.objects.create(
+            name="Unit 1",
+            subject=maths,
+            section=section,
+            date=date(2024, 7, 1),
+            total_marks=50,
+        ),
+        "art_test": Assessment.objects.create(
+            name="Unit 1",
+            subject=art,
+            section=section,
+            date=date(2024, 7, 1),
+            total_marks=20,
+        ),
+        "students": [
+            User.objects.create_user(username=f"student{i}", role="student")
+            for i in range(4)
+        ],
+    }
+
+
+def upload(user, data, format="json"):
+    request = APIRequestFactory().post(
+        "/api/academic/assessment-results/upload/", data, format=format
+    )
+    force_authenticate(request, user=user)
+    return AssessmentResultViewSet.as_view({"post": "upload"})(request)
+
+
+def marks(assessment, students, marks_obtained=40):
+    return [
+        {
+            "assessment_id": assessment.id,
+            "student_id": student.id,
+            "marks_obtained": marks_obtained,
+        }
+        for student in students
+    ]
+
+
+@pytest.mark.django_db
+class TestMarksUpload:
+    def test_upserts_and_reports_row_errors(self, school):
+        maths_test, students = school["maths_test"], school["students"]
+        AssessmentResult.objects.create(
+            assessment=maths_test, student=students[0], marks_obtained=10
+        )
+        rows = marks(maths_test, students[:2]) + [
+            {
+                "assessment_id": maths_test.id,
+                "student_id": students[2].id,
+                "marks_obtained": 51,
+            },
+            {"assessment_id": maths_test.id, "student_id": students[3].id},
+            {
+                "assessment_id": maths_test.id,
+                "student_id": school["teacher"].id,
+                "marks_obtained": 5,
+            },
+        ]
+        response = upload(school["teacher"], rows)
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert (response.data["created"], response.data["updated"]) == (1, 1)
+        assert response.data["failed"] == 3
+        errors = [result.get("errors") for result in response.data["results"]]
+        assert errors[2] == {"marks_obtained": [MARKS_EXCEED_TOTAL]}
+        assert "marks_obtained" in errors[3]
+        assert errors[4] == {"student_id": ["Invalid student."]}
+        assert AssessmentResult.objects.get(student=students[0]).marks_obtained == 40
+
+    def test_teacher_cannot_grade_other_subjects(self, school):
+        response = upload(
+            school["teacher"], marks(school["art_test"], school["students"][:1])
+        )
+        assert response.data["results"][0]["errors"] == {
+            "assessment_id": ["Invalid assessment."]
+        }
+
+    def test_csv_upload(self, school):
+        maths_test, students = school["maths_test"], school["students"]
+        csv_file = SimpleUploadedFile(
+            "marks.csv",
+            (
+                "assessment_id,student_id,marks_obtained,remarks\n"
+                f"{maths_test.id},{students[0].id},45,Good\n"
+                f"{maths_test.id},{students[1].id},30,\n"
+            ).encode(),
+            content_type="text/csv",
+        )
+        response = upload(school["teacher"], {"file": csv_file}, format="multipart")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 2
+        assert AssessmentResult.objects.get(student=students[0]).remarks == "Good"
+
+    def test_query_count_is_independent_of_upload_size(self, school):
+        maths_test, students = school["maths_test"], school["students"]
+        # Warm the teacher's cached visibility first.
+        upload(school["teacher"], [])
+        with CaptureQueriesContext(connection) as single:
+            upload(school["teacher"], marks(maths_test, students[:1]))
+        AssessmentResult.objects.all().delete()
+        with CaptureQueriesContext(connection) as whole:
+            upload(school["teacher"], marks(maths_test, students))
+        assert len(whole) == len(single)
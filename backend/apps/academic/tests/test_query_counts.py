@@ -0,0 +1,121 @@
+import pytest
+from datetime import date, datetime, time
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic import views
+from apps.academic.models import (
+    AcademicYear,
+    Class,
+    Section,
+    Subject,
+    Attendance,
+    AttendanceSummary,
+    Assessment,
+    AssessmentResult,
+    Assignment,
+    AssignmentSubmission,
+    Timetable,
+)
+from apps.accounts.models import User
+
+LIST_VIEWSETS = [
+    views.AcademicYearViewSet,
+    views.ClassViewSet,
+    views.SectionViewSet,
+    views.SubjectViewSet,
+    views.AttendanceViewSet,
+    views.AttendanceSummaryViewSet,
+    views.AssessmentViewSet,
+    views.AssessmentResultViewSet,
+    views.AssignmentViewSet,
+    views.AssignmentSubmissionViewSet,
+    views.TimetableViewSet,
+]
+
+
+@pytest.fixture
+def admin(tenant):
+    return User.objects.create_user(
+        username="superadmin", password="testpass123", role="super_admin"
+    )
+
+
+def seed(index):
+    """Create one row for every academic list endpoint, with fresh relations."""
+    academic_year = AcademicYear.objects.create(
+        name=f"Year {index}",
+        start_date=date(2024, 4, 1),
+        end_date=date(2025, 3, 31),
+    )
+    class_name = Class.objects.create(name=f"Class {index}")
+    teacher = User.objects.create_user(username=f"teacher{index}", role="teacher")
+    student = User.objects.create_user(username=f"student{index}", role="student")
+    section = Section.objects.create(
+        name="A", class_name=class_name, teacher=teacher, academic_year=academic_year
+    )
+    section.students.add(student)
+    subject = Subject.objects.create(
+        name="Maths", code=f"MATH{index}", class_name=class_name, teacher=teacher
+    )
+    Attendance.objects.create(student=student, section=section, date=date(2024, 7, 1))
+    AttendanceSummary.objects.create(
+        student=student,
+        section=section,
+        month=date(2024, 7, 1),
+        days_present=1,
+        days_total=1,
+    )
+    assessment = Assessment.objects.create(
+        name="Unit test",
+        subject=subject,
+        section=section,
+        date=date(2024, 7, 1),
+        total_marks=50,
+    )
+    AssessmentResult.objects.create(
+        assessment=assessment, student=student, marks_obtained=40
+    )
+    assignment = Assignment.objects.create(
+        title="Worksheet",
+        description="Fractions",
+        subject=subject,
+        section=section,
+        due_date=timezone.make_aware(datetime(2024, 7, 8)),
+    )
+    AssignmentSubmission.objects.create(
+        assignment=assignment, student=student, file="assignment_submissions/a.pdf"
+    )
+    Timetable.objects.create(
+        section=section,
+        subject=subject,
+        weekday=0,
+        start_time=time(9, 0),
+        end_time=time(9, 45),
+    )
+
+
+def list_queries(viewset, user):
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user=user)
+    with CaptureQueriesContext(connection) as queries:
+        response = viewset.as_view({"get": "list"})(request)
+        response.render()
+    assert response.status_code == status.HTTP_200_OK
+    return len(queries), len(response.data["results"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("viewset", LIST_VIEWSETS, ids=lambda v: v.__name__)
+def test_list_query_count_is_constant(viewset, admin):
+    seed(0)
+    single_queries, single_count = list_queries(viewset, admin)
+
+    for index in range(1, 5):
+        seed(index)
+    many_queries, many_count = list_queries(viewset, admin)
+
+    assert many_count == single_count * 5
+    assert many_queries == single_queries
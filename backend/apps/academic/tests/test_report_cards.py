@@ -0,0 +1,127 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import (
+    AcademicYear,
+    Assessment,
+    AssessmentResult,
+    Class,
+    Section,
+    Subject,
+)
+from apps.academic.report_cards import build_report_cards
+from apps.academic.tasks import render_section_report_cards
+from apps.academic.views import SectionViewSet
+from apps.accounts.models import User
+
+
+@pytest.fixture
+def school(tenant):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+    )
+    grade5 = Class.objects.create(name="Grade 5")
+    teacher = User.objects.create_user(username="teacher", role="teacher")
+    section = Section.objects.create(
+        name="A", class_name=grade5, teacher=teacher, academic_year=academic_year
+    )
+    maths = Subject.objects.create(name="Maths", code="M5", class_name=grade5)
+    english = Subject.objects.create(name="English", code="E5", class_name=grade5)
+    assessments = [
+        Assessment.objects.create(
+            name=name,
+            subject=subject,
+            section=section,
+            date=date(2024, 7, 1),
+            total_marks=total,
+        )
+        for name, subject, total in [
+            ("Unit 1", maths, 50),
+            ("Unit 2", maths, 50),
+            ("Unit 1", english, 100),
+        ]
+    ]
+    return {
+        "teacher": teacher,
+        "section": section,
+        "assessments": assessments,
+    }
+
+
+def enrol(section, count, start=0):
+    students = [
+        User.objects.create_user(
+            username=f"student{i}", first_name=f"Student {i}", role="student"
+        )
+        for i in range(start, start + count)
+    ]
+    section.students.add(*students)
+    return students
+
+
+def grade(assessments, student, *marks):
+    for assessment, marks_obtained in zip(assessments, marks):
+        AssessmentResult.objects.create(
+            assessment=assessment, student=student, marks_obtained=marks_obtained
+        )
+
+
+@pytest.mark.django_db
+class TestReportCards:
+    def test_totals_ranks_and_averages(self, school):
+        assessments = school["assessments"]
+        top, tied, also_tied, absent = enrol(school["section"], 4)
+        grade(assessments, top, 50, 45, 90)
+        grade(assessments, tied, 40, 40, 70)
+        grade(assessments, also_tied, 30, 50, 70)
+
+        report = build_report_cards(school["section"])
+        cards = {card["id"]: card for card in report["students"]}
+        assert cards[top.id]["marks_obtained"] == 185
+        assert cards[top.id]["total_marks"] == 200
+        assert cards[top.id]["percentage"] == 92.5
+        assert [cards[s.id]["rank"] for s in (top, tied, also_tied, absent)] == [
+            1,
+            2,
+            2,
+            4,
+        ]
+        assert cards[absent.id]["percentage"] == 0
+        maths = next(s for s in report["subjects"] if s["name"] == "Maths")
+        assert maths["total_marks"] == 100
+        assert maths["average_marks"] == 63.75
+        assert report["average_percentage"] == pytest.approx(60.62, abs=0.01)
+
+    def test_query_count_is_independent_of_section_size(self, school):
+        section, assessments = school["section"], school["assessments"]
+        for student in enrol(section, 2):
+            grade(assessments, student, 10, 20, 30)
+        with CaptureQueriesContext(connection) as small:
+            build_report_cards(section)
+        for student in enrol(section, 10, start=2):
+            grade(assessments, student, 10, 20, 30)
+        with CaptureQueriesContext(connection) as large:
+            build_report_cards(section)
+        assert len(large) == len(small)
+
+    def test_teacher_reads_section_report(self, school):
+        student = enrol(school["section"], 1)[0]
+        grade(school["assessments"], student, 25, 25, 50)
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=school["teacher"])
+        response = SectionViewSet.as_view({"get": "report_cards"})(
+            request, pk=school["section"].id
+        )
+        assert response.status_code == 200
+        assert response.data["students"][0]["percentage"] == 50
+
+    def test_render_job_stores_printable_cards(self, school, tenant, private_storage):
+        student = enrol(school["section"], 1)[0]
+        grade(school["assessments"], student, 25, 25, 50)
+        outcome = render_section_report_cards(tenant.schema_name, school["section"].id)
+        with private_storage.open(outcome["path"]) as rendered:
+            html = rendered.read().decode()
+        assert "Student 0" in html
+        assert "Rank:</strong> 1 of 1" in html
@@ -0,0 +1,188 @@
+import pytest
+from datetime import date, time
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import AcademicYear, Class, Section, Subject, Timetable
+from apps.academic.serializers import TimetableSerializer
+from apps.academic.timetable import (
+    SECTION_CONFLICT,
+    TEACHER_CONFLICT,
+    IntervalIndex,
+    TimetablePlanner,
+    import_timetable,
+)
+from apps.academic.views import TimetableViewSet
+from apps.accounts.models import User
+
+
+@pytest.fixture
+def school(tenant):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+    )
+    grade5 = Class.objects.create(name="Grade 5")
+    teacher = User.objects.create_user(username="teacher", role="teacher")
+    admin = User.objects.create_user(username="admin", role="school_admin")
+    section_a = Section.objects.create(
+        name="A", class_name=grade5, teacher=teacher, academic_year=academic_year
+    )
+    section_b = Section.objects.create(
+        name="B", class_name=grade5, teacher=teacher, academic_year=academic_year
+    )
+    maths = Subject.objects.create(
+        name="Maths", code="M5", class_name=grade5, teacher=teacher
+    )
+    art = Subject.objects.create(name="Art", code="A5", class_name=grade5)
+    return {
+        "admin": admin,
+        "section_a": section_a,
+        "section_b": section_b,
+        "maths": maths,
+        "art": art,
+    }
+
+
+def row(section, subject, start, end, weekday=0):
+    return {
+        "section_id": section.id,
+        "subject_id": subject.id,
+        "weekday": weekday,
+        "start_time": start,
+        "end_time": end,
+    }
+
+
+@pytest.mark.django_db
+class TestIntervalIndex:
+    def test_half_open_intervals(self):
+        index = IntervalIndex()
+        index.add("a", time(9), time(10))
+        index.add("a", time(11), time(12))
+        assert not index.overlaps("a", time(10), time(11))
+        assert index.overlaps("a", time(9, 30), time(10, 30))
+        assert index.overlaps("a", time(8), time(13))
+        assert not index.overlaps("b", time(9), time(10))
+
+    def test_long_interval_before_short_one(self):
+        index = IntervalIndex()
+        index.add("a", time(9), time(12))
+        index.add("a", time(10), time(10, 30))
+        assert index.overlaps("a", time(11), time(11, 30))
+
+
+@pytest.mark.django_db
+class TestTimetableImport:
+    def test_accepts_week_and_rejects_conflicts(self, school):
+        a, b = school["section_a"], school["section_b"]
+        maths, art = school["maths"], school["art"]
+        outcome = import_timetable(
+            [
+                row(a, maths, "09:00", "09:45"),
+                row(a, art, "09:45", "10:30"),
+                # same teacher, different section, overlapping slot
+                row(b, maths, "09:30", "10:15"),
+                # section A is already busy with art
+                row(a, art, "10:00", "10:45"),
+                row(b, art, "09:00", "09:45", weekday=1),
+                row(b, maths, "09:00", "08:00"),
+            ]
+        )
+        assert outcome["created"] == 3
+        assert outcome["failed"] == 3
+        statuses = [result["status"] for result in outcome["results"]]
+        assert statuses == ["created", "created", "error", "error", "created", "error"]
+        assert outcome["results"][2]["errors"]["non_field_errors"] == [TEACHER_CONFLICT]
+        assert outcome["results"][3]["errors"]["non_field_errors"] == [SECTION_CONFLICT]
+        assert Timetable.objects.count() == 3
+
+    def test_replace_rebuilds_uploaded_sections(self, school):
+        a = school["section_a"]
+        Timetable.objects.create(
+            section=a,
+            subject=school["maths"],
+            weekday=0,
+            start_time=time(9),
+            end_time=time(10),
+        )
+        outcome = import_timetable(
+            [row(a, school["art"], "09:00", "10:00")], replace=True
+        )
+        assert outcome["created"] == 1
+        assert list(Timetable.objects.values_list("subject_id", flat=True)) == [
+            school["art"].id
+        ]
+
+    def test_replace_writes_nothing_if_a_row_fails(self, school):
+        a, b = school["section_a"], school["section_b"]
+        for section in (a, b):
+            Timetable.objects.create(
+                section=section,
+                subject=school["art"],
+                weekday=0,
+                start_time=time(9),
+                end_time=time(10),
+            )
+        outcome = import_timetable(
+            [
+                row(a, school["maths"], "09:00", "10:00"),
+                row(b, school["maths"], "10:00", "09:00"),
+            ],
+            replace=True,
+        )
+        assert outcome["created"] == 0
+        assert outcome["failed"] == 1
+        assert [result["status"] for result in outcome["results"]] == [
+            "skipped",
+            "error",
+        ]
+        assert Timetable.objects.filter(subject=school["art"]).count() == 2
+
+    def test_reports_a_slot_booked_meanwhile(self, school, monkeypatch):
+        a = school["section_a"]
+        Timetable.objects.create(
+            section=a,
+            subject=school["art"],
+            weekday=0,
+            start_time=time(9),
+            end_time=time(9, 30),
+        )
+        # As if the entry had been saved after the planner loaded the week.
+        monkeypatch.setattr(TimetablePlanner, "conflicts", lambda self, *slot: [])
+        with pytest.raises(ValidationError):
+            import_timetable([row(a, school["maths"], "09:00", "10:00")])
+        assert Timetable.objects.count() == 1
+
+    def test_csv_upload(self, school):
+        a = school["section_a"]
+        csv_file = SimpleUploadedFile(
+            "timetable.csv",
+            (
+                "section_id,subject_id,weekday,start_time,end_time\n"
+                f"{a.id},{school['maths'].id},0,09:00,09:45\n"
+                f"{a.id},{school['art'].id},0,09:45,10:30\n"
+            ).encode(),
+            content_type="text/csv",
+        )
+        request = APIRequestFactory().post(
+            "/api/academic/timetable/import/", {"file": csv_file}, format="multipart"
+        )
+        force_authenticate(request, user=school["admin"])
+        response = TimetableViewSet.as_view({"post": "bulk_import"})(request)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["created"] == 2
+
+    def test_serializer_rejects_teacher_double_booking(self, school):
+        Timetable.objects.create(
+            section=school["section_a"],
+            subject=school["maths"],
+            weekday=0,
+            start_time=time(9),
+            end_time=time(10),
+        )
+        serializer = TimetableSerializer(
+            data=row(school["section_b"], school["maths"], "09:30", "10:30")
+        )
+        assert not serializer.is_valid()
+        assert serializer.errors["non_field_errors"] == [TEACHER_CONFLICT]
@@ -0,0 +1,95 @@
+import pytest
+from datetime import date
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import AcademicYear, Class, Section, Subject
+from apps.academic.views import SectionViewSet
+from apps.academic.visibility import get_visibility
+from apps.accounts.models import User
+
+
+@pytest.fixture
+def school(tenant):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+    )
+    class_teacher = User.objects.create_user(username="class_teacher", role="teacher")
+    maths_teacher = User.objects.create_user(username="maths_teacher", role="teacher")
+    student = User.objects.create_user(username="student", role="student")
+    grade5 = Class.objects.create(name="Grade 5")
+    grade6 = Class.objects.create(name="Grade 6")
+    section_a = Section.objects.create(
+        name="A", class_name=grade5, teacher=class_teacher, academic_year=academic_year
+    )
+    section_b = Section.objects.create(
+        name="B", class_name=grade6, teacher=None, academic_year=academic_year
+    )
+    maths = Subject.objects.create(
+        name="Maths", code="M6", class_name=grade6, teacher=maths_teacher
+    )
+    section_a.students.add(student)
+    return {
+        "class_teacher": class_teacher,
+        "maths_teacher": maths_teacher,
+        "student": student,
+        "section_a": section_a,
+        "section_b": section_b,
+        "maths": maths,
+    }
+
+
+@pytest.mark.django_db
+class TestVisibility:
+    def test_teacher_sees_homeroom_and_taught_class_sections(self, school):
+        visibility = get_visibility(school["maths_teacher"])
+        assert visibility.section_ids == {school["section_b"].id}
+        assert visibility.subject_ids == {school["maths"].id}
+        assert visibility.homeroom_section_ids == frozenset()
+
+        visibility = get_visibility(school["class_teacher"])
+        assert visibility.homeroom_section_ids == {school["section_a"].id}
+
+    def test_student_sees_enrolled_sections(self, school):
+        visibility = get_visibility(school["student"])
+        assert visibility.section_ids == {school["section_a"].id}
+        assert visibility.homeroom_section_ids == frozenset()
+
+    def test_cached_visibility_skips_the_database(
+        self, school, django_assert_num_queries
+    ):
+        get_visibility(school["maths_teacher"])
+        with django_assert_num_queries(0):
+            get_visibility(school["maths_teacher"])
+
+    def test_enrollment_change_invalidates_cache(
+        self, school, django_capture_on_commit_callbacks
+    ):
+        assert get_visibility(school["student"]).section_ids == {school["section_a"].id}
+        with django_capture_on_commit_callbacks(execute=True):
+            school["section_b"].students.add(school["student"])
+        assert get_visibility(school["student"]).section_ids == {
+            school["section_a"].id,
+            school["section_b"].id,
+        }
+
+    def test_teacher_reassignment_invalidates_cache(
+        self, school, django_capture_on_commit_callbacks
+    ):
+        section_b = school["section_b"]
+        assert get_visibility(school["class_teacher"]).homeroom_section_ids == {
+            school["section_a"].id
+        }
+        with django_capture_on_commit_callbacks(execute=True):
+            section_b.teacher = school["class_teacher"]
+            section_b.save()
+        assert get_visibility(school["class_teacher"]).homeroom_section_ids == {
+            school["section_a"].id,
+            section_b.id,
+        }
+
+    def test_section_list_is_scoped_to_visible_sections(self, school):
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=school["maths_teacher"])
+        response = SectionViewSet.as_view({"get": "list"})(request)
+        assert [row["id"] for row in response.data["results"]] == [
+            school["section_b"].id
+        ]
@@ -0,0 +1,189 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from .models import Section, Subject, Timetable
+
+SECTION_CONFLICT = "This time slot conflicts with another entry for the section"
+TEACHER_CONFLICT = "The subject teacher is already booked in another section"
+
+User = get_user_model()
+
+
+class IntervalIndex:
+    """
+    Half-open ``[start, end)`` intervals grouped by key and kept sorted by start.
+
+    Only intervals that start before the end of a probe can overlap it, so a
+    bisect on the start times bounds the scan to that prefix of the day.
+    """
+
+    def __init__(self):
+        self._slots = defaultdict(list)
+
+    def add(self, key, start, end):
+        insort(self._slots[key], (start, end))
+
+    def overlaps(self, key, start, end):
+        slots = self._slots.get(key)
+        if not slots:
+            return False
+        position = bisect_left(slots, (end,))
+        return any(slot_end > start for _, slot_end in slots[:position])
+
+
+class TimetablePlanner:
+    """
+    Weekly section and teacher bookings for a set of sections and teachers.
+
+    Existing entries are loaded with one query; every candidate entry is then
+    checked against both indexes in memory and, once accepted, added to them
+    so later candidates in the same upload see it too.
+    """
+
+    def __init__(self, section_ids, teacher_ids, exclude=None):
+        self.sections = IntervalIndex()
+        self.teachers = IntervalIndex()
+        existing = Timetable.objects.filter(
+            Q(section_id__in=section_ids) | Q(subject__teacher_id__in=teacher_ids)
+        )
+        if exclude is not None:
+            existing = existing.exclude(exclude)
+        for entry in existing.order_by().values(
+            "section_id",
+            "subject__teacher_id",
+            "weekday",
+            "start_time",
+            "end_time",
+        ):
+            self.book(
+                entry["section_id"],
+                entry["subject__teacher_id"],
+                entry["weekday"],
+                entry["start_time"],
+                entry["end_time"],
+            )
+
+    def conflicts(self, section_id, teacher_id, weekday, start, end):
+        errors = []
+        if self.sections.overlaps((section_id, weekday), start, end):
+            errors.append(SECTION_CONFLICT)
+        if teacher_id is not None and self.teachers.overlaps(
+            (teacher_id, weekday), start, end
+        ):
+            errors.append(TEACHER_CONFLICT)
+        return errors
+
+    def book(self, section_id, teacher_id, weekday, start, end):
+        self.sections.add((section_id, weekday), start, end)
+        if teacher_id is not None:
+            self.teachers.add((teacher_id, weekday), start, end)
+
+
+def import_timetable(rows, replace=False):
+    """
+    Validate a whole timetable upload in one pass and insert the accepted rows.
+
+    Sections and subjects are resolved with one query each and all existing
+    bookings of the affected sections and teachers with a third. The
+    sections and teachers are locked first, so concurrent imports touching
+    them queue up instead of booking the same slot twice.
+
+    With ``replace`` the current entries of the uploaded sections are
+    discarded and rebuilt from the upload. That only happens if every row
+    is accepted: otherwise nothing is written and the valid rows are
+    reported as ``skipped``, so a section is never left emptied by rows
+    that failed.
+    """
+    from .serializers import TimetableImportRowSerializer
+
+    row_serializer = TimetableImportRowSerializer()
+    results = []
+    parsed = []
+    for index, row in enumerate(rows):
+        try:
+            parsed.append((index, row_serializer.run_validation(row)))
+            results.append(None)
+        except serializers.ValidationError as exc:
+            results.append({"index": index, "status": "error", "errors": exc.detail})
+
+    with transaction.atomic():
+        # Sections before teachers, each in primary-key order, so that
+        # concurrent imports cannot deadlock.
+        section_ids = set(
+            Section.objects.select_for_update()
+            .filter(id__in={data["section_id"] for _, data in parsed})
+            .order_by("pk")
+            .values_list("id", flat=True)
+        )
+        subject_teachers = dict(
+            Subject.objects.filter(id__in={data["subject_id"] for _, data in parsed})
+            .order_by()
+            .values_list("id", "teacher_id")
+        )
+        teacher_ids = set(
+            User.objects.select_for_update()
+            .filter(pk__in=set(subject_teachers.values()) - {None})
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        planner = TimetablePlanner(
+            section_ids,
+            teacher_ids,
+            exclude=Q(section_id__in=section_ids) if replace else None,
+        )
+
+        accepted = []
+        for index, data in parsed:
+            errors = {}
+            if data["section_id"] not in section_ids:
+                errors["section_id"] = ["Invalid section."]
+            if data["subject_id"] not in subject_teachers:
+                errors["subject_id"] = ["Invalid subject."]
+            if not errors:
+                teacher_id = subject_teachers[data["subject_id"]]
+                slot = (
+                    data["section_id"],
+                    teacher_id,
+                    data["weekday"],
+                    data["start_time"],
+                    data["end_time"],
+                )
+                conflicts = planner.conflicts(*slot)
+                if conflicts:
+                    errors["non_field_errors"] = conflicts
+                else:
+                    planner.book(*slot)
+            if errors:
+                results[index] = {"index": index, "status": "error", "errors": errors}
+            else:
+                results[index] = {"index": index, "status": "created"}
+                accepted.append(Timetable(**data))
+
+        failed = len(results) - len(accepted)
+        if replace and failed:
+            for result in results:
+                if result["status"] == "created":
+                    result["status"] = "skipped"
+            accepted = []
+        else:
+            if replace:
+                Timetable.objects.filter(section_id__in=section_ids).delete()
+            try:
+                Timetable.objects.bulk_create(accepted)
+            except IntegrityError:
+                # Single entries saved meanwhile do not take the import locks.
+                raise serializers.ValidationError(
+                    {
+                        "non_field_errors": [
+                            "The timetable changed during the import; "
+                            "upload it again."
+                        ]
+                    }
+                )
+
+    return {"created": len(accepted), "failed": failed, "results": results}
@@ -8,6 +8,7 @@ router.register(r"classes", views.ClassViewSet)
 router.register(r"sections", views.SectionViewSet)
 router.register(r"subjects", views.SubjectViewSet)
 router.register(r"attendance", views.AttendanceViewSet)
+router.register(r"attendance-summaries", views.AttendanceSummaryViewSet)
 router.register(r"assessments", views.AssessmentViewSet)
 router.register(r"assessment-results", views.AssessmentResultViewSet)
 router.register(r"assignments", views.AssignmentViewSet)
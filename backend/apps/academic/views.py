@@ -2,7 +2,8 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
+from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Sum
 from django.contrib.auth import get_user_model
 from .models import (
     AcademicYear,
@@ -10,6 +11,7 @@ from .models import (
     Section,
     Subject,
     Attendance,
+    AttendanceSummary,
     Assessment,
     AssessmentResult,
     Assignment,
@@ -23,18 +25,30 @@ from .serializers import (
     SectionCreateSerializer,
     SubjectSerializer,
     AttendanceSerializer,
+    AttendanceSummarySerializer,
+    SectionAttendanceTotalSerializer,
     AssessmentSerializer,
     AssessmentResultSerializer,
     AssignmentSerializer,
     AssignmentSubmissionSerializer,
     TimetableSerializer,
 )
+from .attendance import record_roll_call
+from .grading import record_marks
+from .report_cards import build_report_cards
+from .tasks import render_section_report_cards
+from .timetable import import_timetable
+from .visibility import get_visibility
 from apps.accounts.permissions import IsAdminUser, IsTeacherUser, IsStudentUser
+from apps.core.exports import ExportMixin
+from apps.core.jobs import queue_task
+from apps.core.pagination import DateKeysetPagination
+from apps.core.uploads import iter_upload_rows
 
 User = get_user_model()
 
 
-class AcademicYearViewSet(viewsets.ModelViewSet):
+class AcademicYearViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = AcademicYear.objects.all()
     serializer_class = AcademicYearSerializer
     permission_classes = [IsAuthenticated]
@@ -42,6 +56,13 @@ class AcademicYearViewSet(viewsets.ModelViewSet):
     search_fields = ["name"]
     ordering_fields = ["start_date", "name"]
     ordering = ["-start_date"]
+    export_fields = [
+        ("ID", "id"),
+        ("Name", "name"),
+        ("Start date", "start_date"),
+        ("End date", "end_date"),
+        ("Active", "is_active"),
+    ]
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
@@ -49,7 +70,7 @@ class AcademicYearViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
 
-class ClassViewSet(viewsets.ModelViewSet):
+class ClassViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Class.objects.all()
     serializer_class = ClassSerializer
     permission_classes = [IsAuthenticated]
@@ -57,6 +78,7 @@ class ClassViewSet(viewsets.ModelViewSet):
     search_fields = ["name"]
     ordering_fields = ["name"]
     ordering = ["name"]
+    export_fields = [("ID", "id"), ("Name", "name"), ("Description", "description")]
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
@@ -64,13 +86,21 @@ class ClassViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
 
-class SectionViewSet(viewsets.ModelViewSet):
+class SectionViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Section.objects.all()
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["name", "class_name__name"]
     ordering_fields = ["name", "class_name__name"]
     ordering = ["class_name__name", "name"]
+    export_fields = [
+        ("ID", "id"),
+        ("Class", "class_name__name"),
+        ("Section", "name"),
+        ("Academic year", "academic_year__name"),
+        ("Class teacher", "teacher__username"),
+        ("Students", "student_count"),
+    ]
 
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -80,21 +110,20 @@ class SectionViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
             return [IsAdminUser()]
+        elif self.action in ["report_cards", "render_report_cards"]:
+            return [(IsAdminUser | IsTeacherUser)()]
         return super().get_permissions()
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Section.objects.for_listing()
         if user.role == "super_admin":
-            return Section.objects.all()
+            return queryset
         elif user.role == "school_admin":
-            return Section.objects.filter(academic_year__school=user.school)
-        elif user.role == "teacher":
-            return Section.objects.filter(
-                Q(teacher=user) | Q(subjects__teacher=user)
-            ).distinct()
-        elif user.role == "student":
-            return Section.objects.filter(students=user)
-        return Section.objects.none()
+            return queryset.filter(academic_year__school=user.school)
+        elif user.role in ["teacher", "student"]:
+            return queryset.filter(id__in=get_visibility(user).section_ids)
+        return queryset.none()
 
     @action(detail=True, methods=["post"])
     def add_students(self, request, pk=None):
@@ -112,8 +141,24 @@ class SectionViewSet(viewsets.ModelViewSet):
         section.students.remove(*students)
         return Response({"status": "Students removed successfully"})
 
+    @action(detail=True, methods=["get"], url_path="report-cards")
+    def report_cards(self, request, pk=None):
+        """Totals, percentages and ranks for every student of the section."""
+        return Response(build_report_cards(self.get_object()))
+
+    @action(detail=True, methods=["post"], url_path="report-cards/render")
+    def render_report_cards(self, request, pk=None):
+        """
+        Queue rendering of the section's printable report cards; poll the
+        returned task at ``/api/core/tasks/<task_id>/`` and download the file
+        from ``/api/core/tasks/<task_id>/file/``.
+        """
+        section = self.get_object()
+        task = queue_task(request, render_section_report_cards, section.id)
+        return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
 
-class SubjectViewSet(viewsets.ModelViewSet):
+
+class SubjectViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Subject.objects.all()
     serializer_class = SubjectSerializer
     permission_classes = [IsAuthenticated]
@@ -121,6 +166,13 @@ class SubjectViewSet(viewsets.ModelViewSet):
     search_fields = ["name", "code", "class_name__name"]
     ordering_fields = ["name", "code", "class_name__name"]
     ordering = ["class_name__name", "name"]
+    export_fields = [
+        ("ID", "id"),
+        ("Code", "code"),
+        ("Name", "name"),
+        ("Class", "class_name__name"),
+        ("Teacher", "teacher__username"),
+    ]
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update", "destroy"]:
@@ -129,28 +181,35 @@ class SubjectViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Subject.objects.for_listing()
         if user.role == "super_admin":
-            return Subject.objects.all()
+            return queryset
         elif user.role == "school_admin":
-            return Subject.objects.filter(class_name__school=user.school)
-        elif user.role == "teacher":
-            return Subject.objects.filter(teacher=user)
-        elif user.role == "student":
-            return Subject.objects.filter(class_name__sections__students=user)
-        return Subject.objects.none()
+            return queryset.filter(class_name__school=user.school)
+        elif user.role in ["teacher", "student"]:
+            return queryset.filter(id__in=get_visibility(user).subject_ids)
+        return queryset.none()
 
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter]
     search_fields = ["student__username", "section__name"]
-    ordering_fields = ["date", "student__username"]
-    ordering = ["-date"]
+    pagination_class = DateKeysetPagination
+    export_fields = [
+        ("ID", "id"),
+        ("Date", "date"),
+        ("Student", "student__username"),
+        ("Class", "section__class_name__name"),
+        ("Section", "section__name"),
+        ("Present", "is_present"),
+        ("Remarks", "remarks"),
+    ]
 
     def get_permissions(self):
-        if self.action in ["create", "update", "partial_update"]:
+        if self.action in ["create", "update", "partial_update", "roll_call"]:
             return [IsTeacherUser()]
         elif self.action == "destroy":
             return [IsAdminUser()]
@@ -158,15 +217,18 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Attendance.objects.for_listing()
         if user.role == "super_admin":
-            return Attendance.objects.all()
+            return queryset
         elif user.role == "school_admin":
-            return Attendance.objects.filter(section__school=user.school)
+            return queryset.filter(section__school=user.school)
         elif user.role == "teacher":
-            return Attendance.objects.filter(section__teacher=user)
+            return queryset.filter(
+                section_id__in=get_visibility(user).homeroom_section_ids
+            )
         elif user.role == "student":
-            return Attendance.objects.filter(student=user)
-        return Attendance.objects.none()
+            return queryset.filter(student=user)
+        return queryset.none()
 
     @action(detail=False, methods=["post"])
     def bulk_create(self, request):
@@ -178,8 +240,78 @@ class AttendanceViewSet(viewsets.ModelViewSet):
     def perform_bulk_create(self, serializer):
         serializer.save()
 
+    @action(detail=False, methods=["post"], url_path="roll-call")
+    def roll_call(self, request):
+        """
+        Upsert a whole roll in one pass and report the outcome of each row.
+        Teachers may only post the rolls of the sections they are class
+        teacher of.
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                {"detail": "Expected a list of attendance rows."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        sections = Section.objects.all()
+        if request.user.role == "teacher":
+            sections = sections.filter(
+                id__in=get_visibility(request.user).homeroom_section_ids
+            )
+        outcome = record_roll_call(request.data, sections=sections)
+        if outcome["failed"]:
+            return Response(outcome, status=status.HTTP_207_MULTI_STATUS)
+        return Response(outcome, status=status.HTTP_201_CREATED)
+
 
-class AssessmentViewSet(viewsets.ModelViewSet):
+class AttendanceSummaryViewSet(ExportMixin, viewsets.ReadOnlyModelViewSet):
+    """Precomputed monthly attendance, refreshed in the background."""
+
+    queryset = AttendanceSummary.objects.all()
+    serializer_class = AttendanceSummarySerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ["student", "section", "month"]
+    ordering_fields = ["month", "days_present", "days_total"]
+    ordering = ["-month"]
+    export_fields = [
+        ("Month", "month"),
+        ("Student", "student__username"),
+        ("Class", "section__class_name__name"),
+        ("Section", "section__name"),
+        ("Days present", "days_present"),
+        ("Days total", "days_total"),
+    ]
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = AttendanceSummary.objects.for_listing()
+        if user.role == "super_admin":
+            return queryset
+        elif user.role == "school_admin":
+            return queryset.filter(section__school=user.school)
+        elif user.role == "teacher":
+            return queryset.filter(
+                section_id__in=get_visibility(user).homeroom_section_ids
+            )
+        elif user.role == "student":
+            return queryset.filter(student=user)
+        elif user.role == "parent":
+            return queryset.filter(student__student_profile__parent=user)
+        return queryset.none()
+
+    @action(detail=False, methods=["get"])
+    def sections(self, request):
+        """Section totals per month, summed from the student rollups."""
+        totals = (
+            self.filter_queryset(self.get_queryset())
+            .values("section_id", "section__name", "section__class_name__name", "month")
+            .annotate(days_present=Sum("days_present"), days_total=Sum("days_total"))
+            .order_by("-month", "section__class_name__name", "section__name")
+        )
+        return Response(SectionAttendanceTotalSerializer(totals, many=True).data)
+
+
+class AssessmentViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Assessment.objects.all()
     serializer_class = AssessmentSerializer
     permission_classes = [IsAuthenticated]
@@ -187,6 +319,15 @@ class AssessmentViewSet(viewsets.ModelViewSet):
     search_fields = ["name", "subject__name", "section__name"]
     ordering_fields = ["date", "name"]
     ordering = ["-date"]
+    export_fields = [
+        ("ID", "id"),
+        ("Name", "name"),
+        ("Subject", "subject__name"),
+        ("Class", "section__class_name__name"),
+        ("Section", "section__name"),
+        ("Date", "date"),
+        ("Total marks", "total_marks"),
+    ]
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -197,20 +338,19 @@ class AssessmentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Assessment.objects.for_listing()
         if user.role == "super_admin":
-            return Assessment.objects.all()
+            return queryset
         elif user.role == "school_admin":
-            return Assessment.objects.filter(section__school=user.school)
+            return queryset.filter(section__school=user.school)
         elif user.role == "teacher":
-            return Assessment.objects.filter(
-                Q(section__teacher=user) | Q(subject__teacher=user)
-            )
+            return queryset.filter(get_visibility(user).teaching_filter())
         elif user.role == "student":
-            return Assessment.objects.filter(section__students=user)
-        return Assessment.objects.none()
+            return queryset.filter(section_id__in=get_visibility(user).section_ids)
+        return queryset.none()
 
 
-class AssessmentResultViewSet(viewsets.ModelViewSet):
+class AssessmentResultViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = AssessmentResult.objects.all()
     serializer_class = AssessmentResultSerializer
     permission_classes = [IsAuthenticated]
@@ -218,9 +358,19 @@ class AssessmentResultViewSet(viewsets.ModelViewSet):
     search_fields = ["student__username", "assessment__name"]
     ordering_fields = ["marks_obtained", "student__username"]
     ordering = ["-assessment__date"]
+    export_fields = [
+        ("ID", "id"),
+        ("Assessment", "assessment__name"),
+        ("Subject", "assessment__subject__name"),
+        ("Date", "assessment__date"),
+        ("Student", "student__username"),
+        ("Marks obtained", "marks_obtained"),
+        ("Total marks", "assessment__total_marks"),
+        ("Remarks", "remarks"),
+    ]
 
     def get_permissions(self):
-        if self.action in ["create", "update", "partial_update"]:
+        if self.action in ["create", "update", "partial_update", "upload"]:
             return [IsTeacherUser()]
         elif self.action == "destroy":
             return [IsAdminUser()]
@@ -228,20 +378,18 @@ class AssessmentResultViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = AssessmentResult.objects.for_listing()
         if user.role == "super_admin":
-            return AssessmentResult.objects.all()
+            return queryset
         elif user.role == "school_admin":
-            return AssessmentResult.objects.filter(
-                assessment__section__school=user.school
-            )
+            return queryset.filter(assessment__section__school=user.school)
         elif user.role == "teacher":
-            return AssessmentResult.objects.filter(
-                Q(assessment__section__teacher=user)
-                | Q(assessment__subject__teacher=user)
+            return queryset.filter(
+                get_visibility(user).teaching_filter(prefix="assessment__")
             )
         elif user.role == "student":
-            return AssessmentResult.objects.filter(student=user)
-        return AssessmentResult.objects.none()
+            return queryset.filter(student=user)
+        return queryset.none()
 
     @action(detail=False, methods=["post"])
     def bulk_create(self, request):
@@ -253,8 +401,25 @@ class AssessmentResultViewSet(viewsets.ModelViewSet):
     def perform_bulk_create(self, serializer):
         serializer.save()
 
+    @action(detail=False, methods=["post"])
+    def upload(self, request):
+        """
+        Upsert marks for any number of assessments from a CSV file or a JSON
+        list and report the outcome of each row. Teachers may only post
+        marks for assessments of the sections and subjects they teach.
+        """
+        assessments = Assessment.objects.all()
+        if request.user.role == "teacher":
+            assessments = assessments.filter(
+                get_visibility(request.user).teaching_filter()
+            )
+        outcome = record_marks(iter_upload_rows(request), assessments=assessments)
+        if outcome["failed"]:
+            return Response(outcome, status=status.HTTP_207_MULTI_STATUS)
+        return Response(outcome, status=status.HTTP_201_CREATED)
+
 
-class AssignmentViewSet(viewsets.ModelViewSet):
+class AssignmentViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Assignment.objects.all()
     serializer_class = AssignmentSerializer
     permission_classes = [IsAuthenticated]
@@ -262,6 +427,15 @@ class AssignmentViewSet(viewsets.ModelViewSet):
     search_fields = ["title", "subject__name", "section__name"]
     ordering_fields = ["due_date", "title"]
     ordering = ["-due_date"]
+    export_fields = [
+        ("ID", "id"),
+        ("Title", "title"),
+        ("Subject", "subject__name"),
+        ("Class", "section__class_name__name"),
+        ("Section", "section__name"),
+        ("Due date", "due_date"),
+        ("Submissions", "submission_count"),
+    ]
 
     def get_permissions(self):
         if self.action in ["create", "update", "partial_update"]:
@@ -272,20 +446,19 @@ class AssignmentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Assignment.objects.for_listing()
         if user.role == "super_admin":
-            return Assignment.objects.all()
+            return queryset
         elif user.role == "school_admin":
-            return Assignment.objects.filter(section__school=user.school)
+            return queryset.filter(section__school=user.school)
         elif user.role == "teacher":
-            return Assignment.objects.filter(
-                Q(section__teacher=user) | Q(subject__teacher=user)
-            )
+            return queryset.filter(get_visibility(user).teaching_filter())
         elif user.role == "student":
-            return Assignment.objects.filter(section__students=user)
-        return Assignment.objects.none()
+            return queryset.filter(section_id__in=get_visibility(user).section_ids)
+        return queryset.none()
 
 
-class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
+class AssignmentSubmissionViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = AssignmentSubmission.objects.all()
     serializer_class = AssignmentSubmissionSerializer
     permission_classes = [IsAuthenticated]
@@ -293,6 +466,14 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
     search_fields = ["student__username", "assignment__title"]
     ordering_fields = ["submitted_at", "score"]
     ordering = ["-submitted_at"]
+    export_fields = [
+        ("ID", "id"),
+        ("Assignment", "assignment__title"),
+        ("Student", "student__username"),
+        ("Submitted at", "submitted_at"),
+        ("Score", "score"),
+        ("Remarks", "remarks"),
+    ]
 
     def get_permissions(self):
         if self.action == "create":
@@ -305,23 +486,21 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = AssignmentSubmission.objects.for_listing()
         if user.role == "super_admin":
-            return AssignmentSubmission.objects.all()
+            return queryset
         elif user.role == "school_admin":
-            return AssignmentSubmission.objects.filter(
-                assignment__section__school=user.school
-            )
+            return queryset.filter(assignment__section__school=user.school)
         elif user.role == "teacher":
-            return AssignmentSubmission.objects.filter(
-                Q(assignment__section__teacher=user)
-                | Q(assignment__subject__teacher=user)
+            return queryset.filter(
+                get_visibility(user).teaching_filter(prefix="assignment__")
             )
         elif user.role == "student":
-            return AssignmentSubmission.objects.filter(student=user)
-        return AssignmentSubmission.objects.none()
+            return queryset.filter(student=user)
+        return queryset.none()
 
 
-class TimetableViewSet(viewsets.ModelViewSet):
+class TimetableViewSet(ExportMixin, viewsets.ModelViewSet):
     queryset = Timetable.objects.all()
     serializer_class = TimetableSerializer
     permission_classes = [IsAuthenticated]
@@ -329,22 +508,50 @@ class TimetableViewSet(viewsets.ModelViewSet):
     search_fields = ["section__name", "subject__name"]
     ordering_fields = ["weekday", "start_time"]
     ordering = ["weekday", "start_time"]
+    export_fields = [
+        ("ID", "id"),
+        ("Class", "section__class_name__name"),
+        ("Section", "section__name"),
+        ("Weekday", "weekday"),
+        ("Start time", "start_time"),
+        ("End time", "end_time"),
+        ("Subject", "subject__name"),
+        ("Teacher", "subject__teacher__username"),
+    ]
 
     def get_permissions(self):
-        if self.action in ["create", "update", "partial_update", "destroy"]:
+        if self.action in [
+            "create",
+            "update",
+            "partial_update",
+            "destroy",
+            "bulk_import",
+        ]:
             return [IsAdminUser()]
         return super().get_permissions()
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Timetable.objects.for_listing()
         if user.role == "super_admin":
-            return Timetable.objects.all()
+            return queryset
         elif user.role == "school_admin":
-            return Timetable.objects.filter(section__school=user.school)
+            return queryset.filter(section__school=user.school)
         elif user.role == "teacher":
-            return Timetable.objects.filter(
-                Q(section__teacher=user) | Q(subject__teacher=user)
-            )
+            return queryset.filter(get_visibility(user).teaching_filter())
         elif user.role == "student":
-            return Timetable.objects.filter(section__students=user)
-        return Timetable.objects.none()
+            return queryset.filter(section_id__in=get_visibility(user).section_ids)
+        return queryset.none()
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def bulk_import(self, request):
+        """
+        Import timetable entries for any number of sections from a CSV file
+        or a JSON list. Pass ``?replace=true`` to rebuild the timetables of
+        the uploaded sections instead of adding to them.
+        """
+        replace = request.query_params.get("replace", "").lower() in ["1", "true"]
+        outcome = import_timetable(iter_upload_rows(request), replace=replace)
+        if outcome["failed"]:
+            return Response(outcome, status=status.HTTP_207_MULTI_STATUS)
+        return Response(outcome, status=status.HTTP_201_CREATED)
@@ -0,0 +1,76 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from apps.accounts.models import User
+from apps.core.caching import VersionedCache
+
+VISIBILITY_TIMEOUT = 60 * 60
+
+_versions = VersionedCache("academic:visibility")
+
+
+class Visibility(
+    namedtuple("Visibility", ["section_ids", "subject_ids", "homeroom_section_ids"])
+):
+    """
+    The sections and subjects a teacher or student may see.
+
+    ``section_ids`` drives the section list itself, while
+    ``homeroom_section_ids`` holds the sections a teacher is class teacher of,
+    which together with ``subject_ids`` scopes assessments, assignments and
+    timetable entries.
+    """
+
+    def teaching_filter(self, prefix=""):
+        return Q(**{f"{prefix}section_id__in": self.homeroom_section_ids}) | Q(
+            **{f"{prefix}subject_id__in": self.subject_ids}
+        )
+
+
+def invalidate_visibility():
+    """Drop every cached visibility set of the active tenant."""
+    _versions.invalidate()
+
+
+def _compute_visibility(user):
+    from .models import Section, Subject
+
+    sections = Section.objects.order_by()
+    subjects = Subject.objects.order_by()
+    if user.role == User.TEACHER:
+        homeroom = list(sections.filter(teacher=user).values_list("id", flat=True))
+        section_ids = list(
+            sections.filter(Q(teacher=user) | Q(class_name__subjects__teacher=user))
+            .values_list("id", flat=True)
+            .distinct()
+        )
+        subject_ids = list(subjects.filter(teacher=user).values_list("id", flat=True))
+    elif user.role == User.STUDENT:
+        homeroom = []
+        section_ids = list(sections.filter(students=user).values_list("id", flat=True))
+        subject_ids = list(
+            subjects.filter(class_name__sections__students=user)
+            .values_list("id", flat=True)
+            .distinct()
+        )
+    else:
+        homeroom = section_ids = subject_ids = []
+    return section_ids, subject_ids, homeroom
+
+
+def get_visibility(user):
+    """
+    Return the cached :class:`Visibility` of ``user`` in the active tenant.
+
+    Entries are keyed by tenant schema, a per-tenant version and the user id;
+    the academic signals bump the version whenever section or subject
+    membership changes.
+    """
+    key = _versions.key(user.pk)
+    cached = cache.get(key)
+    if cached is None:
+        cached = _compute_visibility(user)
+        cache.set(key, cached, VISIBILITY_TIMEOUT)
+    return Visibility(*(frozenset(ids) for ids in cached))
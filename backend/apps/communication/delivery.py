@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.utils import timezone
+
+
+def claim_due(model, size, lease):
+    """
+    Claim up to ``size`` due rows of an outbound log (``EmailLog``,
+    ``SMSLog``), oldest first, and return them.
+
+    The rows are locked with ``SKIP LOCKED``, so several workers can drain
+    the same queue, and marked ``sending`` in one short transaction; they
+    are sent after it commits, without holding any lock. A claim lapses
+    after ``lease``: a row still ``sending`` then, because its worker died,
+    is due again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            model.objects.select_for_update(skip_locked=True)
+            .filter(status__in=["pending", "sending"], next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "pk")[:size]
+        )
+        model.objects.filter(pk__in=[log.pk for log in batch]).update(
+            status="sending", next_attempt_at=now + lease
+        )
+    return batch
+
+
+def record_attempts(model, batch, errors, max_attempts, retry_delay, totals):
+    """
+    Record one delivery attempt for each row of ``batch`` with a single
+    ``bulk_update``: rows without an entry in ``errors`` (``{pk: error}``)
+    are ``sent``; the others are ``pending`` again after ``retry_delay``,
+    doubled for every earlier attempt, or marked ``failed`` after
+    ``max_attempts``. Counts are added to ``totals`` (``{"sent",
+    "retried", "failed"}``).
+    """
+    now = timezone.now()
+    for log in batch:
+        log.attempts += 1
+        log.error_message = errors.get(log.pk, "")
+        if log.pk not in errors:
+            log.status, log.sent_at = "sent", now
+            totals["sent"] += 1
+        elif log.attempts >= max_attempts:
+            log.status = "failed"
+            totals["failed"] += 1
+        else:
+            log.status = "pending"
+            log.next_attempt_at = now + retry_delay * 2 ** (log.attempts - 1)
+            totals["retried"] += 1
+    model.objects.bulk_update(
+        batch, ["status", "sent_at", "attempts", "next_attempt_at", "error_message"]
+    )
@@ -0,0 +1,122 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from apps.academic.models import Section, Subject
+from apps.accounts.models import StudentProfile, User
+
+from .models import Announcement, Notification
+from .pubsub import push_notifications
+
+FANOUT_CHUNK_SIZE = 1000
+# Admins see every announcement aimed at their role, whatever its classes.
+UNSCOPED_ROLES = [User.SUPER_ADMIN, User.SCHOOL_ADMIN]
+
+
+def announcement_audience(announcement):
+    """
+    The ids of the active users an announcement is for.
+
+    Without target classes or sections that is everyone with one of its
+    ``target_roles``. Otherwise students enrolled in a targeted section (or
+    any section of a targeted class), their parents, and the class and
+    subject teachers of those sections, plus admins with a targeted role.
+    Each role is resolved by one query, whatever the size of the school.
+    """
+    roles = set(announcement.target_roles or [])
+    class_ids = list(announcement.target_classes.values_list("pk", flat=True))
+    section_ids = list(announcement.target_sections.values_list("pk", flat=True))
+    users = User.objects.filter(is_active=True).order_by()
+    if not class_ids and not section_ids:
+        return set(users.filter(role__in=roles).values_list("pk", flat=True))
+
+    sections = Section.objects.filter(
+        Q(class_name_id__in=class_ids) | Q(pk__in=section_ids)
+    ).order_by()
+    students = User.objects.filter(enrolled_sections__in=sections).order_by()
+    audience = set(
+        users.filter(role__in=roles & set(UNSCOPED_ROLES)).values_list("pk", flat=True)
+    )
+    if User.STUDENT in roles:
+        audience.update(
+            users.filter(role=User.STUDENT, pk__in=students).values_list(
+                "pk", flat=True
+            )
+        )
+    if User.PARENT in roles:
+        audience.update(
+            users.filter(
+                role=User.PARENT,
+                pk__in=StudentProfile.objects.filter(user__in=students).values(
+                    "parent_id"
+                ),
+            ).values_list("pk", flat=True)
+        )
+    if User.TEACHER in roles:
+        audience.update(
+            users.filter(role=User.TEACHER)
+            .filter(
+                Q(pk__in=sections.values("teacher_id"))
+                | Q(
+                    pk__in=Subject.objects.filter(
+                        class_name_id__in=sections.values("class_name_id")
+                    ).values("teacher_id")
+                )
+            )
+            .values_list("pk", flat=True)
+        )
+    return audience
+
+
+def fan_out_announcement(announcement_id, chunk_size=FANOUT_CHUNK_SIZE):
+    """
+    Bring the ``Notification`` rows of an active announcement in line with
+    its audience: one per recipient, none for anyone else.
+
+    The audience is resolved once by ``announcement_audience``; users who
+    already have a notification for it are skipped, so running the fan-out
+    again after the announcement is edited only reaches the new recipients,
+    and the notifications of users it no longer targets are deleted.
+    Notifications are inserted with ``bulk_create`` ``chunk_size`` at a
+    time. Returns the number created.
+    """
+    with transaction.atomic():
+        # Concurrent fan-outs of one announcement queue up on its row lock.
+        announcement = (
+            Announcement.objects.select_for_update()
+            .filter(pk=announcement_id, is_active=True)
+            .first()
+        )
+        if announcement is None:
+            return 0
+        return _notify(announcement, chunk_size)
+
+
+def _notify(announcement, chunk_size):
+    content_type = ContentType.objects.get_for_model(Announcement)
+    existing = Notification.objects.filter(
+        content_type=content_type, object_id=announcement.pk
+    ).order_by()
+    audience = announcement_audience(announcement)
+    notified = set(existing.values_list("recipient_id", flat=True))
+    dropped = sorted(notified - audience)
+    for start in range(0, len(dropped), chunk_size):
+        existing.filter(recipient_id__in=dropped[start : start + chunk_size]).delete()
+    recipients = sorted(audience - notified)
+    for start in range(0, len(recipients), chunk_size):
+        created = Notification.objects.bulk_create(
+            [
+                Notification(
+                    title=announcement.title,
+                    message=announcement.content,
+                    notification_type="announcement",
+                    recipient_id=recipient_id,
+                    content_type=content_type,
+                    object_id=announcement.pk,
+                )
+                for recipient_id in recipients[start : start + chunk_size]
+            ]
+        )
+        # bulk_create skips post_save, so the new rows are pushed here.
+        push_notifications(created)
+    return len(recipients)
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .delivery import claim_due, record_attempts
+from .models import EmailLog
+
+EMAIL_BATCH_SIZE = 100
+MAX_EMAIL_ATTEMPTS = 5
+# Doubled after every failed attempt: 1, 2, 4, 8 minutes.
+EMAIL_RETRY_DELAY = timedelta(minutes=1)
+# How long a worker may take to send a claimed batch before another may.
+EMAIL_CLAIM_LEASE = timedelta(minutes=15)
+
+
+def enqueue_email(to_email, subject, content, html_content="", redact=False):
+    """
+    Queue an email as a ``pending`` ``EmailLog`` in the active tenant and
+    have a worker send it once the transaction commits. With ``redact``,
+    e.g. for credentials, its body is never shown by the API and is blanked
+    once the email is sent or given up on.
+    """
+    from .tasks import send_school_queued_emails
+
+    log = EmailLog.objects.create(
+        to_email=to_email,
+        subject=subject,
+        content=content,
+        html_content=html_content,
+        redact_after_send=redact,
+        next_attempt_at=timezone.now(),
+    )
+    schema_name = connection.schema_name
+    transaction.on_commit(lambda: send_school_queued_emails.delay(schema_name))
+    return log
+
+
+def _message(log, mail):
+    message = EmailMultiAlternatives(
+        log.subject,
+        log.content,
+        settings.DEFAULT_FROM_EMAIL,
+        [log.to_email],
+        connection=mail,
+    )
+    if log.html_content:
+        message.attach_alternative(log.html_content, "text/html")
+    return message
+
+
+def _deliver(mail, batch):
+    """Send ``batch`` over the open ``mail`` connection; return ``{pk: error}``."""
+    try:
+        mail.open()
+    except Exception as exc:
+        return {log.pk: f"Could not connect to the mail server: {exc}" for log in batch}
+    errors = {}
+    for log in batch:
+        try:
+            if not mail.send_messages([_message(log, mail)]):
+                errors[log.pk] = "The mail server did not accept the message."
+        except Exception as exc:
+            errors[log.pk] = str(exc) or exc.__class__.__name__
+            # The connection may be unusable now; reconnect for the next one.
+            mail.close()
+            try:
+                mail.open()
+            except Exception:
+                pass
+    return errors
+
+
+def send_queued_emails(batch_size=EMAIL_BATCH_SIZE):
+    """
+    Send the due ``pending`` emails of the active tenant.
+
+    Emails are claimed ``batch_size`` at a time by ``claim_due``, so several
+    workers can drain the queue together, and sent after the claim commits,
+    all over one reused mail connection. Each message is handed to the server on its
+    own so a rejected address only fails that email. Failures are retried
+    with exponential backoff and marked ``failed`` after
+    ``MAX_EMAIL_ATTEMPTS``; the outcome of a batch is written with one
+    ``bulk_update``. Returns ``{"sent", "retried", "failed"}``.
+    """
+    totals = {"sent": 0, "retried": 0, "failed": 0}
+    mail = get_connection()
+    try:
+        while True:
+            batch = claim_due(EmailLog, batch_size, EMAIL_CLAIM_LEASE)
+            if not batch:
+                break
+            errors = _deliver(mail, batch)
+            record_attempts(
+                EmailLog, batch, errors, MAX_EMAIL_ATTEMPTS, EMAIL_RETRY_DELAY, totals
+            )
+            redacted = [
+                log.pk
+                for log in batch
+                if log.redact_after_send and log.status != "pending"
+            ]
+            if redacted:
+                EmailLog.objects.filter(pk__in=redacted).update(
+                    content="", html_content=""
+                )
+    finally:
+        mail.close()
+    return totals
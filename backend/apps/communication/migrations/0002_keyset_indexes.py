@@ -0,0 +1,44 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communication", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emaillog",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="emaillog_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["sender", "-created_at", "-id"], name="message_sender_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["recipient", "-created_at", "-id"], name="message_recipient_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="notification_recipient_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="smslog",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="smslog_created_idx"
+            ),
+        ),
+    ]
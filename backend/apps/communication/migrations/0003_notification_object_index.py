@@ -0,0 +1,19 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communication", "0002_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["content_type", "object_id"], name="notification_object_idx"
+            ),
+        ),
+    ]
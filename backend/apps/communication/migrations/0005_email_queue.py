@@ -0,0 +1,40 @@
+# Generated by Django 4.2.17 on 2026-10-18 03:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communication", "0004_unread_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emaillog",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="emaillog",
+            name="html_content",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="emaillog",
+            name="next_attempt_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When a queued email is next tried; empty if it was never queued",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="emaillog",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "sending"])),
+                fields=["next_attempt_at", "id"],
+                name="emaillog_queue_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.17 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communication", "0005_email_queue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="smslog",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="smslog",
+            name="next_attempt_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When a queued SMS is next tried; empty if it was never queued",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="smslog",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("sending", "Sending"),
+                    ("sent", "Sent"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="smslog",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "sending"])),
+                fields=["next_attempt_at", "id"],
+                name="smslog_queue_idx",
+            ),
+        ),
+    ]
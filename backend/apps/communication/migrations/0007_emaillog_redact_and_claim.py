@@ -0,0 +1,35 @@
+# Generated by Django 4.2.17 on 2026-10-18 03:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communication", "0006_sms_queue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emaillog",
+            name="redact_after_send",
+            field=models.BooleanField(
+                default=False,
+                help_text="Keep the body out of the API and blank it once delivery ends",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="emaillog",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("sending", "Sending"),
+                    ("sent", "Sent"),
+                    ("failed", "Failed"),
+                ],
+                default="pending",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -70,6 +70,23 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="notification_recipient_idx",
+            ),
+            # Finds who was already notified about an object, e.g. when an
+            # announcement is fanned out again.
+            models.Index(
+                fields=["content_type", "object_id"], name="notification_object_idx"
+            ),
+            # Unread badges count a small slice of a mostly read table.
+            models.Index(
+                fields=["recipient"],
+                condition=models.Q(is_read=False),
+                name="notification_unread_idx",
+            ),
+        ]
 
 
 class Message(models.Model):
@@ -91,11 +108,26 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["sender", "-created_at", "-id"], name="message_sender_idx"
+            ),
+            models.Index(
+                fields=["recipient", "-created_at", "-id"],
+                name="message_recipient_idx",
+            ),
+            models.Index(
+                fields=["recipient"],
+                condition=models.Q(is_read=False),
+                name="message_unread_idx",
+            ),
+        ]
 
 
 class EmailLog(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
+        ("sending", "Sending"),
         ("sent", "Sent"),
         ("failed", "Failed"),
     ]
@@ -103,8 +135,19 @@ class EmailLog(models.Model):
     to_email = models.EmailField()
     subject = models.CharField(max_length=200)
     content = models.TextField()
+    html_content = models.TextField(blank=True)
+    redact_after_send = models.BooleanField(
+        default=False,
+        help_text="Keep the body out of the API and blank it once delivery ends",
+    )
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     error_message = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a queued email is next tried; empty if it was never queued",
+    )
     sent_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -113,11 +156,22 @@ class EmailLog(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="emaillog_created_idx"),
+            # The queue: only pending emails and claims that may lapse, in
+            # the order they fall due.
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status__in=["pending", "sending"]),
+                name="emaillog_queue_idx",
+            ),
+        ]
 
 
 class SMSLog(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
+        ("sending", "Sending"),
         ("sent", "Sent"),
         ("failed", "Failed"),
     ]
@@ -126,6 +180,12 @@ class SMSLog(models.Model):
     message = models.TextField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     error_message = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When a queued SMS is next tried; empty if it was never queued",
+    )
     sent_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -134,3 +194,12 @@ class SMSLog(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="smslog_created_idx"),
+            # Pending messages and claims that may lapse, as for emails.
+            models.Index(
+                fields=["next_attempt_at", "id"],
+                condition=models.Q(status__in=["pending", "sending"]),
+                name="smslog_queue_idx",
+            ),
+        ]
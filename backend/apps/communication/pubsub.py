@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryBroker:
+    """
+    Publish/subscribe within one process: enough for tests and a single
+    ASGI worker. Publishing is synchronous and safe from any thread; each
+    subscriber gets its own queue on its own event loop.
+    """
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def publish_many(self, messages):
+        """Deliver ``[(channel, payload)]``; payloads are JSON strings."""
+        for channel, payload in messages:
+            with self.lock:
+                queues = list(self.subscribers.get(channel, ()))
+            for loop, queue in queues:
+                loop.call_soon_threadsafe(queue.put_nowait, payload)
+
+    async def listen(self, channel, timeout):
+        """
+        Yield the payloads published on ``channel``, or ``None`` after
+        ``timeout`` seconds without one, until the consumer stops.
+        """
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.lock:
+            self.subscribers[channel].add(entry)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(entry[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self.lock:
+                self.subscribers[channel].discard(entry)
+                if not self.subscribers[channel]:
+                    del self.subscribers[channel]
+
+
+class RedisBroker:
+    """Publish/subscribe through Redis, shared by every web and Celery process."""
+
+    def __init__(self, url):
+        import redis
+
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+
+    def publish_many(self, messages):
+        pipeline = self.client.pipeline(transaction=False)
+        for channel, payload in messages:
+            pipeline.publish(channel, payload)
+        pipeline.execute()
+
+    async def listen(self, channel, timeout):
+        from redis import asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=timeout
+                )
+                yield message["data"].decode() if message else None
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    if settings.PUSH_BROKER == "redis":
+        return RedisBroker(settings.PUSH_REDIS_URL)
+    return InMemoryBroker()
+
+
+def user_channel(schema_name, user_id):
+    return f"push:{schema_name}:{user_id}"
+
+
+def notification_event(notification):
+    return {
+        "type": "notification",
+        "id": notification.pk,
+        "title": notification.title,
+        "message": notification.message,
+        "notification_type": notification.notification_type,
+        "created_at": notification.created_at,
+    }
+
+
+def message_event(message):
+    return {
+        "type": "message",
+        "id": message.pk,
+        "sender": message.sender_id,
+        "subject": message.subject,
+        "created_at": message.created_at,
+    }
+
+
+def push(events, schema_name=None):
+    """
+    Publish ``[(user_id, event)]`` to the users' channels in one round trip
+    to the broker. Pushing is best effort: clients still load what they
+    missed from the API, so a broker outage is logged, not raised.
+    """
+    schema_name = schema_name or connection.schema_name
+    messages = [
+        (user_channel(schema_name, user_id), json.dumps(event, default=str))
+        for user_id, event in events
+    ]
+    if not messages:
+        return
+    try:
+        get_broker().publish_many(messages)
+    except Exception:
+        logger.exception("Could not push %d events to %s", len(messages), schema_name)
+
+
+def push_on_commit(events):
+    """Push ``[(user_id, event)]`` once the current transaction commits."""
+    events = list(events)
+    schema_name = connection.schema_name
+    transaction.on_commit(lambda: push(events, schema_name))
+
+
+def push_notifications(notifications):
+    push_on_commit(
+        (notification.recipient_id, notification_event(notification))
+        for notification in notifications
+    )
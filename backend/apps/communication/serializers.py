@@ -40,9 +40,22 @@ class EmailLogSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('created_at', 'sent_at')
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.redact_after_send:
+            # Credentials and the like are only ever seen by the recipient.
+            data['content'] = data['html_content'] = ''
+        return data
+
 
 class SMSLogSerializer(serializers.ModelSerializer):
     class Meta:
         model = SMSLog
         fields = '__all__'
         read_only_fields = ('created_at', 'sent_at')
+
+
+class MarkReadSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
@@ -0,0 +1,47 @@
+from django.db import connection, transaction
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from .models import Announcement, Message, Notification
+from .pubsub import message_event, push_notifications, push_on_commit
+from .tasks import fan_out_announcement_notifications
+
+
+def queue_fan_out(announcement):
+    """
+    Queue the fan-out once the transaction commits, so the worker sees the
+    announcement together with its target classes and sections.
+    """
+    if not announcement.is_active:
+        return
+    schema_name = connection.schema_name
+    transaction.on_commit(
+        lambda: fan_out_announcement_notifications.delay(schema_name, announcement.pk)
+    )
+
+
+@receiver(post_save, sender=Announcement)
+def fan_out_saved_announcement(sender, instance, **kwargs):
+    queue_fan_out(instance)
+
+
+@receiver(m2m_changed, sender=Announcement.target_classes.through)
+@receiver(m2m_changed, sender=Announcement.target_sections.through)
+def fan_out_retargeted_announcement(sender, instance, action, reverse, **kwargs):
+    # The fan-out skips users already notified and retracts the notifications
+    # of users no longer targeted, so it runs whichever way the audience
+    # changed. Changes to target_roles go through post_save.
+    if action in ("post_add", "post_remove", "post_clear") and not reverse:
+        queue_fan_out(instance)
+
+
+@receiver(post_save, sender=Notification)
+def push_created_notification(sender, instance, created, **kwargs):
+    if created:
+        push_notifications([instance])
+
+
+@receiver(post_save, sender=Message)
+def push_created_message(sender, instance, created, **kwargs):
+    if created:
+        push_on_commit([(instance.recipient_id, message_event(instance))])
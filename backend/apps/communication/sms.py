@@ -0,0 +1,166 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .delivery import claim_due, record_attempts
+from .models import SMSLog
+
+SMS_CLAIM_SIZE = 200
+MAX_SMS_ATTEMPTS = 3
+# Doubled after every failed attempt: 1, then 2 minutes.
+SMS_RETRY_DELAY = timedelta(minutes=1)
+# How long a worker may take to send a claimed batch before another may.
+SMS_CLAIM_LEASE = timedelta(minutes=15)
+
+
+class BaseSMSProvider:
+    """
+    An SMS gateway. ``batch_size`` is the most messages one API call takes,
+    ``rate`` the sustained throughput the provider allows in messages per
+    second and ``burst`` how many may go out at once after a quiet spell.
+    """
+
+    batch_size = 100
+    rate = 10
+    burst = 100
+
+    def send_batch(self, messages):
+        """
+        Send ``[(to_phone, text)]`` in one call and return, in the same
+        order, ``None`` for each accepted message or the provider's error.
+        """
+        raise NotImplementedError
+
+
+class LocalSMSProvider(BaseSMSProvider):
+    """
+    Keeps messages in ``outbox`` instead of sending them. For tests and
+    development only: nothing is delivered and the outbox is never emptied,
+    so it must be chosen explicitly with ``SMS_BACKEND``.
+    """
+
+    outbox = []
+    rate = 1000
+    burst = 1000
+
+    def send_batch(self, messages):
+        LocalSMSProvider.outbox.extend(messages)
+        return [None] * len(messages)
+
+
+class TokenBucket:
+    """
+    Allow ``rate`` tokens a second on average and up to ``capacity`` at
+    once; ``acquire`` sleeps until enough tokens have accumulated.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens):
+        with self.lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                self.sleep((tokens - self.tokens) / self.rate)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def rate_limiter(provider):
+    """The token bucket of ``provider``'s class, shared within this process."""
+    key = f"{type(provider).__module__}.{type(provider).__qualname__}"
+    with _buckets_lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(provider.rate, provider.burst)
+        return _buckets[key]
+
+
+def get_sms_provider():
+    if not settings.SMS_BACKEND:
+        raise ImproperlyConfigured(
+            "SMS_BACKEND is not set; configure an SMS gateway to send SMS"
+        )
+    return import_string(settings.SMS_BACKEND)()
+
+
+def enqueue_sms(messages):
+    """
+    Queue ``[(to_phone, text)]`` as ``pending`` ``SMSLog`` rows in the active
+    tenant with one insert, and have a worker send them after the commit.
+    """
+    from .tasks import send_school_queued_sms
+
+    now = timezone.now()
+    logs = SMSLog.objects.bulk_create(
+        SMSLog(to_phone=to_phone, message=text, next_attempt_at=now)
+        for to_phone, text in messages
+    )
+    if logs:
+        schema_name = connection.schema_name
+        transaction.on_commit(lambda: send_school_queued_sms.delay(schema_name))
+    return logs
+
+
+def _deliver(provider, bucket, batch):
+    """Send ``batch`` in provider-sized calls; return ``{pk: error}``."""
+    errors = {}
+    size = min(provider.batch_size, provider.burst)
+    for start in range(0, len(batch), size):
+        chunk = batch[start : start + size]
+        bucket.acquire(len(chunk))
+        try:
+            results = provider.send_batch(
+                [(log.to_phone, log.message) for log in chunk]
+            )
+        except Exception as exc:
+            results = [str(exc) or exc.__class__.__name__] * len(chunk)
+        errors.update({log.pk: error for log, error in zip(chunk, results) if error})
+    return errors
+
+
+def send_queued_sms(provider=None, claim_size=SMS_CLAIM_SIZE):
+    """
+    Send the due ``pending`` SMS of the active tenant through ``provider``
+    (default: ``settings.SMS_BACKEND``).
+
+    Rows are claimed ``claim_size`` at a time by ``claim_due`` and, once the
+    claim has committed, sent in calls of the
+    provider's ``batch_size``, each waiting on the provider's token bucket
+    so the queue drains at the provider's throughput limit. Outcomes are
+    written with one ``bulk_update`` per claim; failures are retried with
+    backoff and marked ``failed`` after ``MAX_SMS_ATTEMPTS``. Returns
+    ``{"sent", "retried", "failed"}``.
+    """
+    provider = provider or get_sms_provider()
+    bucket = rate_limiter(provider)
+    totals = {"sent": 0, "retried": 0, "failed": 0}
+    while True:
+        batch = claim_due(SMSLog, claim_size, SMS_CLAIM_LEASE)
+        if not batch:
+            break
+        errors = _deliver(provider, bucket, batch)
+        record_attempts(
+            SMSLog, batch, errors, MAX_SMS_ATTEMPTS, SMS_RETRY_DELAY, totals
+        )
+    return totals
@@ -0,0 +1,41 @@
+from celery import shared_task
+from django_tenants.utils import schema_context
+
+from apps.core.tenants import tenant_schema_names
+
+from .fanout import fan_out_announcement
+from .mailer import send_queued_emails
+from .sms import send_queued_sms
+
+
+@shared_task
+def fan_out_announcement_notifications(schema_name, announcement_id):
+    """Notify every recipient of an announcement in a school."""
+    with schema_context(schema_name):
+        return fan_out_announcement(announcement_id)
+
+
+@shared_task
+def send_all_queued_emails():
+    """Periodic entry point: drain each school's email queue, including retries."""
+    for schema_name in tenant_schema_names():
+        send_school_queued_emails.delay(schema_name)
+
+
+@shared_task
+def send_school_queued_emails(schema_name):
+    with schema_context(schema_name):
+        return send_queued_emails()
+
+
+@shared_task
+def send_all_queued_sms():
+    """Periodic entry point: drain each school's SMS queue, including retries."""
+    for schema_name in tenant_schema_names():
+        send_school_queued_sms.delay(schema_name)
+
+
+@shared_task
+def send_school_queued_sms(schema_name):
+    with schema_context(schema_name):
+        return send_queued_sms()
@@ -0,0 +1,221 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import AcademicYear, Class, Section, Subject
+from apps.accounts.models import StudentProfile, User
+from apps.communication.fanout import announcement_audience, fan_out_announcement
+from apps.communication.models import Announcement, Notification
+from apps.communication.tasks import fan_out_announcement_notifications
+from apps.communication.views import AnnouncementViewSet
+
+
+@pytest.fixture
+def school(tenant):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+    )
+    users = {
+        name: User.objects.create_user(username=name, role=role)
+        for name, role in [
+            ("admin", "school_admin"),
+            ("class_teacher", "teacher"),
+            ("maths_teacher", "teacher"),
+            ("other_teacher", "teacher"),
+            ("parent", "parent"),
+            ("other_parent", "parent"),
+            ("student5a", "student"),
+            ("student5b", "student"),
+            ("student6", "student"),
+        ]
+    }
+    grade5 = Class.objects.create(name="Grade 5")
+    grade6 = Class.objects.create(name="Grade 6")
+    sections = {
+        "5a": Section.objects.create(
+            name="A",
+            class_name=grade5,
+            teacher=users["class_teacher"],
+            academic_year=academic_year,
+        ),
+        "5b": Section.objects.create(
+            name="B", class_name=grade5, academic_year=academic_year
+        ),
+        "6a": Section.objects.create(
+            name="A",
+            class_name=grade6,
+            teacher=users["other_teacher"],
+            academic_year=academic_year,
+        ),
+    }
+    Subject.objects.create(
+        name="Maths", code="M5", class_name=grade5, teacher=users["maths_teacher"]
+    )
+    for section, student, parent in [
+        ("5a", "student5a", "parent"),
+        ("5b", "student5b", None),
+        ("6a", "student6", "other_parent"),
+    ]:
+        sections[section].students.add(users[student])
+        StudentProfile.objects.create(
+            user=users[student],
+            admission_number=student,
+            date_of_birth=date(2014, 1, 1),
+            parent=users[parent] if parent else None,
+        )
+    users["grade5"] = grade5
+    users.update(sections)
+    return users
+
+
+def announce(school, roles, classes=(), sections=()):
+    announcement = Announcement.objects.create(
+        title="Sports day",
+        content="Sports day is on Friday.",
+        author=school["admin"],
+        target_roles=roles,
+    )
+    announcement.target_classes.set(classes)
+    announcement.target_sections.set(sections)
+    return announcement
+
+
+def names(school, ids):
+    users = [user for user in school.values() if isinstance(user, User)]
+    return sorted(user.username for user in users if user.pk in ids)
+
+
+@pytest.mark.django_db
+class TestAnnouncementAudience:
+    def test_whole_school_by_role(self, school):
+        announcement = announce(school, ["teacher", "school_admin"])
+        assert names(school, announcement_audience(announcement)) == [
+            "admin",
+            "class_teacher",
+            "maths_teacher",
+            "other_teacher",
+        ]
+
+    def test_class_scoped(self, school):
+        announcement = announce(
+            school, ["student", "parent", "teacher"], classes=[school["grade5"]]
+        )
+        assert names(school, announcement_audience(announcement)) == [
+            "class_teacher",
+            "maths_teacher",
+            "parent",
+            "student5a",
+            "student5b",
+        ]
+
+    def test_section_scoped(self, school):
+        announcement = announce(
+            school, ["student", "parent", "school_admin"], sections=[school["6a"]]
+        )
+        assert names(school, announcement_audience(announcement)) == [
+            "admin",
+            "other_parent",
+            "student6",
+        ]
+
+
+@pytest.mark.django_db
+class TestFanOut:
+    def test_notifies_each_recipient_once(self, school):
+        announcement = announce(school, ["student"], classes=[school["grade5"]])
+        assert fan_out_announcement(announcement.pk) == 2
+        assert fan_out_announcement(announcement.pk) == 0
+        announcement.target_sections.add(school["6a"])
+        assert fan_out_announcement(announcement.pk) == 1
+        assert sorted(
+            Notification.objects.filter(object_id=announcement.pk).values_list(
+                "recipient__username", flat=True
+            )
+        ) == ["student5a", "student5b", "student6"]
+
+    def test_narrowing_the_audience_retracts_notifications(self, school):
+        announcement = announce(
+            school, ["student", "parent"], sections=[school["5a"], school["6a"]]
+        )
+        assert fan_out_announcement(announcement.pk) == 4
+        announcement.target_sections.remove(school["6a"])
+        assert fan_out_announcement(announcement.pk) == 0
+        recipients = Notification.objects.filter(object_id=announcement.pk)
+        assert sorted(recipients.values_list("recipient__username", flat=True)) == [
+            "parent",
+            "student5a",
+        ]
+        announcement.target_roles = ["parent"]
+        announcement.save()
+        assert fan_out_announcement(announcement.pk) == 0
+        assert list(recipients.values_list("recipient__username", flat=True)) == [
+            "parent"
+        ]
+
+    def test_inactive_announcements_are_not_sent(self, school):
+        announcement = announce(school, ["student"])
+        Announcement.objects.filter(pk=announcement.pk).update(is_active=False)
+        assert fan_out_announcement(announcement.pk) == 0
+
+    def test_whole_school_fan_out_costs_constant_queries(self, school):
+        User.objects.bulk_create(
+            User(username=f"bulk{index}", role="student") for index in range(2000)
+        )
+        announcement = announce(school, ["student"])
+        with CaptureQueriesContext(connection) as queries:
+            assert fan_out_announcement(announcement.pk, chunk_size=1000) == 2003
+        statements = [
+            q["sql"] for q in queries if q["sql"].startswith(("SELECT", "INSERT"))
+        ]
+        assert len([sql for sql in statements if sql.startswith("INSERT")]) == 3
+        assert len(statements) <= 9
+
+    def test_queued_after_commit(
+        self, school, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        queued = []
+        monkeypatch.setattr(
+            fan_out_announcement_notifications,
+            "delay",
+            lambda *args: queued.append(args),
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            announcement = announce(school, ["student"], sections=[school["5a"]])
+        assert (connection.schema_name, announcement.pk) in queued
+
+    @pytest.mark.parametrize("change", ["remove", "clear"])
+    def test_queued_when_targets_are_removed(
+        self, school, monkeypatch, django_capture_on_commit_callbacks, change
+    ):
+        announcement = announce(school, ["student"], sections=[school["5a"]])
+        queued = []
+        monkeypatch.setattr(
+            fan_out_announcement_notifications,
+            "delay",
+            lambda *args: queued.append(args),
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            if change == "remove":
+                announcement.target_sections.remove(school["5a"])
+            else:
+                announcement.target_sections.clear()
+        assert queued == [(connection.schema_name, announcement.pk)]
+
+
+@pytest.mark.django_db
+class TestAnnouncementList:
+    def test_recipients_see_their_announcements(self, school):
+        announcement = announce(school, ["student"], classes=[school["grade5"]])
+        fan_out_announcement(announcement.pk)
+        announce(school, ["teacher"])
+
+        def listed(user):
+            request = APIRequestFactory().get("/")
+            force_authenticate(request, user=user)
+            response = AnnouncementViewSet.as_view({"get": "list"})(request)
+            return [item["id"] for item in response.data["results"]]
+
+        assert listed(school["student5a"]) == [announcement.pk]
+        assert listed(school["student6"]) == []
+        assert len(listed(school["admin"])) == 2
@@ -0,0 +1,132 @@
+import pytest
+from datetime import timedelta
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from apps.communication import mailer
+from apps.communication.mailer import enqueue_email, send_queued_emails
+from apps.communication.models import EmailLog
+from apps.communication.serializers import EmailLogSerializer
+from apps.communication.tasks import send_school_queued_emails
+
+
+@pytest.fixture(autouse=True)
+def no_worker(monkeypatch):
+    queued = []
+    monkeypatch.setattr(send_school_queued_emails, "delay", queued.append)
+    return queued
+
+
+@pytest.fixture
+def reject(monkeypatch):
+    """Make the backend raise for the given recipients."""
+    rejected = set()
+    send_messages = mail.backends.locmem.EmailBackend.send_messages
+
+    def send(self, messages):
+        if any(set(message.to) & rejected for message in messages):
+            raise OSError("Recipient refused")
+        return send_messages(self, messages)
+
+    monkeypatch.setattr(mail.backends.locmem.EmailBackend, "send_messages", send)
+    return rejected
+
+
+@pytest.mark.django_db
+class TestEnqueueEmail:
+    def test_queues_a_pending_email_and_a_worker_after_commit(
+        self, tenant, no_worker, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            log = enqueue_email("a@example.com", "Hi", "Hello", "<p>Hello</p>")
+        assert log.status == "pending"
+        assert no_worker == [connection.schema_name]
+        assert mail.outbox == []
+
+
+@pytest.mark.django_db
+class TestSendQueuedEmails:
+    def test_sends_batches_over_one_connection(self, tenant, monkeypatch):
+        opened = []
+        monkeypatch.setattr(
+            mailer, "get_connection", lambda: opened.append(1) or mail.get_connection()
+        )
+        for index in range(5):
+            enqueue_email(f"user{index}@example.com", "Hi", "Hello", "<p>Hello</p>")
+        with CaptureQueriesContext(connection) as queries:
+            assert send_queued_emails(batch_size=2) == {
+                "sent": 5,
+                "retried": 0,
+                "failed": 0,
+            }
+        assert len(opened) == 1
+        assert len(mail.outbox) == 5
+        assert mail.outbox[0].alternatives == [("<p>Hello</p>", "text/html")]
+        # One claim and one outcome per batch.
+        updates = [q for q in queries if q["sql"].startswith("UPDATE")]
+        assert len(updates) == 6
+        assert not EmailLog.objects.exclude(status="sent").exists()
+        assert not EmailLog.objects.filter(sent_at=None).exists()
+
+    def test_failures_back_off_then_give_up(self, tenant, reject):
+        reject.add("bad@example.com")
+        good = enqueue_email("good@example.com", "Hi", "Hello")
+        bad = enqueue_email("bad@example.com", "Hi", "Hello")
+        assert send_queued_emails() == {"sent": 1, "retried": 1, "failed": 0}
+        bad.refresh_from_db()
+        assert (bad.status, bad.attempts, bad.error_message) == (
+            "pending",
+            1,
+            "Recipient refused",
+        )
+        assert bad.next_attempt_at > timezone.now()
+        # Not due yet.
+        assert send_queued_emails() == {"sent": 0, "retried": 0, "failed": 0}
+
+        for attempt in range(2, mailer.MAX_EMAIL_ATTEMPTS + 1):
+            EmailLog.objects.filter(pk=bad.pk).update(
+                next_attempt_at=timezone.now() - timedelta(seconds=1)
+            )
+            outcome = send_queued_emails()
+        assert outcome == {"sent": 0, "retried": 0, "failed": 1}
+        bad.refresh_from_db()
+        assert (bad.status, bad.attempts) == ("failed", mailer.MAX_EMAIL_ATTEMPTS)
+        good.refresh_from_db()
+        assert (good.status, good.attempts) == ("sent", 1)
+
+    def test_sends_outside_the_claim_transaction(self, tenant, monkeypatch):
+        enqueue_email("a@example.com", "Hi", "Hello")
+        seen = []
+        deliver = mailer._deliver
+        # The test itself runs in a transaction.
+        depth = len(connection.atomic_blocks)
+
+        def spy(mail, batch):
+            seen.append(
+                (len(connection.atomic_blocks) - depth, EmailLog.objects.get().status)
+            )
+            return deliver(mail, batch)
+
+        monkeypatch.setattr(mailer, "_deliver", spy)
+        send_queued_emails()
+        assert seen == [(0, "sending")]
+
+    def test_lapsed_claims_are_sent_again(self, tenant):
+        log = enqueue_email("a@example.com", "Hi", "Hello")
+        EmailLog.objects.filter(pk=log.pk).update(
+            status="sending", next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert send_queued_emails()["sent"] == 1
+
+    def test_redacted_body_is_hidden_and_blanked_after_sending(self, tenant):
+        log = enqueue_email("a@example.com", "Hi", "Password: s3cret", redact=True)
+        assert EmailLogSerializer(log).data["content"] == ""
+        send_queued_emails()
+        log.refresh_from_db()
+        assert mail.outbox[0].body == "Password: s3cret"
+        assert (log.status, log.content) == ("sent", "")
+
+    def test_emails_that_were_never_queued_are_left_alone(self, tenant):
+        EmailLog.objects.create(to_email="old@example.com", subject="Old", content="")
+        assert send_queued_emails() == {"sent": 0, "retried": 0, "failed": 0}
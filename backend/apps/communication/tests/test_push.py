@@ -0,0 +1,113 @@
+import asyncio
+import json
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.accounts.models import User
+from apps.communication.models import Message, Notification
+from apps.communication.pubsub import InMemoryBroker, get_broker, push, user_channel
+from apps.communication.views import notification_stream
+
+
+async def receive(broker, channel, publish, count=1, timeout=1):
+    """Subscribe to ``channel``, call ``publish()`` and collect ``count`` payloads."""
+    listener = broker.listen(channel, timeout)
+    first = asyncio.ensure_future(listener.__anext__())
+    await asyncio.sleep(0.01)
+    publish()
+    received = [await first]
+    while len(received) < count:
+        received.append(await listener.__anext__())
+    await listener.aclose()
+    return received
+
+
+@pytest.mark.django_db
+class TestInMemoryBroker:
+    def test_delivers_to_subscribers_of_the_channel(self):
+        broker = InMemoryBroker()
+
+        def publish():
+            broker.publish_many([("other", "x"), ("push:a:1", "1"), ("push:a:1", "2")])
+
+        assert asyncio.run(receive(broker, "push:a:1", publish, count=2)) == ["1", "2"]
+        assert broker.subscribers == {}
+
+    def test_idle_subscribers_get_heartbeats(self):
+        broker = InMemoryBroker()
+        assert asyncio.run(receive(broker, "c", lambda: None, timeout=0.01)) == [None]
+
+
+@pytest.mark.django_db
+class TestPushOnSave:
+    def test_new_notifications_and_messages_are_pushed(
+        self, tenant, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        pushed = []
+        monkeypatch.setattr(
+            get_broker(), "publish_many", lambda messages: pushed.extend(messages)
+        )
+        sender = User.objects.create_user(username="teacher", role="teacher")
+        user = User.objects.create_user(username="student", role="student")
+        with django_capture_on_commit_callbacks(execute=True):
+            notification = Notification.objects.create(
+                title="Hi", message="Hello", notification_type="other", recipient=user
+            )
+            Message.objects.create(
+                sender=sender, recipient=user, subject="Homework", content="Page 4"
+            )
+            notification.is_read = True
+            notification.save()
+        channel = user_channel(connection.schema_name, user.pk)
+        assert [(c, json.loads(p)["type"]) for c, p in pushed] == [
+            (channel, "notification"),
+            (channel, "message"),
+        ]
+
+    def test_broker_errors_are_not_raised(self, tenant, monkeypatch):
+        def fail(messages):
+            raise ConnectionError
+
+        monkeypatch.setattr(get_broker(), "publish_many", fail)
+        push([(1, {"type": "notification"})])
+
+
+@pytest.mark.django_db
+class TestNotificationStream:
+    def request(self, tenant, token="", factory=AsyncRequestFactory):
+        request = factory().get("/", {"token": token} if token else {})
+        request.tenant = tenant
+        return request
+
+    def test_refused_under_wsgi(self, tenant):
+        request = self.request(tenant, factory=RequestFactory)
+        response = async_to_sync(notification_stream)(request)
+        assert response.status_code == 501
+
+    def test_requires_a_valid_token(self, tenant):
+        response = async_to_sync(notification_stream)(self.request(tenant, "bad"))
+        assert response.status_code == 401
+
+    def test_streams_the_users_events(self, tenant):
+        user = User.objects.create_user(username="student", role="student")
+        request = self.request(tenant, str(AccessToken.for_user(user)))
+
+        async def stream():
+            response = await notification_stream(request)
+            chunks = response.streaming_content
+            received = [(await chunks.__anext__()).decode()]
+            pending = asyncio.ensure_future(chunks.__anext__())
+            await asyncio.sleep(0.01)
+            push([(user.pk, {"type": "notification", "id": 7})], tenant.schema_name)
+            received.append((await pending).decode())
+            await chunks.aclose()
+            return response, received
+
+        response, received = async_to_sync(stream)()
+        assert response["Content-Type"] == "text/event-stream"
+        assert received == [
+            "retry: 5000\n\n",
+            'data: {"type": "notification", "id": 7}\n\n',
+        ]
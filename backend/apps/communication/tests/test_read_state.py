@@ -0,0 +1,119 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.accounts.models import User
+from apps.communication.models import Message, Notification
+from apps.communication.views import MessageViewSet, NotificationViewSet
+
+
+@pytest.fixture
+def users(tenant):
+    return {
+        name: User.objects.create_user(username=name, role=role)
+        for name, role in [("student", "student"), ("teacher", "teacher")]
+    }
+
+
+def notify(user, count):
+    return Notification.objects.bulk_create(
+        Notification(
+            title=f"N{index}",
+            message="",
+            notification_type="other",
+            recipient=user,
+        )
+        for index in range(count)
+    )
+
+
+def call(viewset, action, user, method="post", data=None, **kwargs):
+    factory = APIRequestFactory()
+    request = getattr(factory, method)("/", data, format="json")
+    force_authenticate(request, user=user)
+    return viewset.as_view({method: action})(request, **kwargs)
+
+
+@pytest.mark.django_db
+class TestNotificationReadState:
+    def test_unread_count_is_one_query(self, users, count_queries):
+        notify(users["student"], 5)
+        notify(users["teacher"], 2)
+        with count_queries() as queries:
+            response = call(
+                NotificationViewSet, "unread_count", users["student"], "get"
+            )
+        assert response.data == {"unread": 5}
+        assert len(queries) == 1
+
+    def test_mark_read_only_touches_own_notifications(self, users, count_queries):
+        mine = notify(users["student"], 3)
+        theirs = notify(users["teacher"], 1)
+        with count_queries() as queries:
+            response = call(
+                NotificationViewSet,
+                "mark_read",
+                users["student"],
+                data={"ids": [mine[0].pk, mine[1].pk, theirs[0].pk]},
+            )
+        assert response.data == {"updated": 2}
+        assert len(queries) == 1
+        assert not Notification.objects.get(pk=theirs[0].pk).is_read
+        response = call(NotificationViewSet, "mark_read", users["student"], data={})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_mark_all_read(self, users, count_queries):
+        notify(users["student"], 4)
+        with count_queries() as queries:
+            response = call(NotificationViewSet, "mark_all_read", users["student"])
+        assert response.data == {"updated": 4}
+        assert len(queries) == 1
+        assert not Notification.objects.filter(is_read=False).exists()
+
+    def test_mark_as_read(self, users):
+        (notification,) = notify(users["student"], 1)
+        response = call(
+            NotificationViewSet, "mark_as_read", users["teacher"], pk=notification.pk
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = call(
+            NotificationViewSet, "mark_as_read", users["student"], pk=notification.pk
+        )
+        assert response.status_code == status.HTTP_200_OK
+        notification.refresh_from_db()
+        assert notification.is_read
+
+    @pytest.mark.parametrize("viewset", [NotificationViewSet, MessageViewSet])
+    def test_mark_as_read_with_a_malformed_pk(self, users, viewset):
+        response = call(viewset, "mark_as_read", users["student"], pk="abc")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestMessageReadState:
+    def test_counts_and_marks_received_messages(self, users):
+        for subject in ["a", "b"]:
+            Message.objects.create(
+                sender=users["teacher"],
+                recipient=users["student"],
+                subject=subject,
+                content="",
+            )
+        response = call(MessageViewSet, "unread_count", users["student"], "get")
+        assert response.data == {"unread": 2}
+        response = call(MessageViewSet, "unread_count", users["teacher"], "get")
+        assert response.data == {"unread": 0}
+        response = call(MessageViewSet, "mark_all_read", users["student"])
+        assert response.data == {"updated": 2}
+
+    def test_sender_cannot_mark_as_read(self, users):
+        message = Message.objects.create(
+            sender=users["teacher"], recipient=users["student"], subject="a", content=""
+        )
+        response = call(MessageViewSet, "mark_as_read", users["teacher"], pk=message.pk)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        updated_at = message.updated_at
+        response = call(MessageViewSet, "mark_as_read", users["student"], pk=message.pk)
+        assert response.status_code == status.HTTP_200_OK
+        message.refresh_from_db()
+        assert message.is_read
+        assert message.updated_at > updated_at
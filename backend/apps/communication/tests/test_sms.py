@@ -0,0 +1,168 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.communication import sms
+from apps.communication.models import SMSLog
+from apps.communication.sms import (
+    BaseSMSProvider,
+    LocalSMSProvider,
+    TokenBucket,
+    enqueue_sms,
+    send_queued_sms,
+)
+from apps.communication.tasks import send_school_queued_sms
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RecordingProvider(BaseSMSProvider):
+    batch_size = 50
+    rate = 20
+    burst = 100
+
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    def send_batch(self, messages):
+        self.calls.append(messages)
+        return [
+            "Invalid number" if to_phone in self.failing else None
+            for to_phone, _ in messages
+        ]
+
+
+@pytest.fixture(autouse=True)
+def setup(monkeypatch):
+    monkeypatch.setattr(send_school_queued_sms, "delay", lambda schema_name: None)
+    monkeypatch.setattr(LocalSMSProvider, "outbox", [])
+    clock = FakeClock()
+    monkeypatch.setattr(
+        sms,
+        "rate_limiter",
+        lambda provider: TokenBucket(
+            provider.rate, provider.burst, clock=clock, sleep=clock.sleep
+        ),
+    )
+    return clock
+
+
+def parents(count):
+    return [
+        (f"+91900000{index:04d}", "Your child was absent today.")
+        for index in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestTokenBucket:
+    def test_bursts_then_waits_for_the_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(5, 10, clock=clock, sleep=clock.sleep)
+        bucket.acquire(10)
+        assert clock.now == 0
+        bucket.acquire(5)
+        assert clock.now == pytest.approx(1.0)
+        clock.now += 10
+        bucket.acquire(10)
+        assert clock.now == pytest.approx(11.0)
+
+
+@pytest.mark.django_db
+class TestSendQueuedSMS:
+    def test_enqueue_is_one_insert(self, tenant):
+        with CaptureQueriesContext(connection) as queries:
+            logs = enqueue_sms(parents(500))
+        assert len(logs) == 500
+        assert len([q for q in queries if q["sql"].startswith("INSERT")]) == 1
+
+    def test_drains_within_the_provider_limit(self, tenant, setup):
+        enqueue_sms(parents(500))
+        provider = RecordingProvider()
+        with CaptureQueriesContext(connection) as queries:
+            assert send_queued_sms(provider, claim_size=200) == {
+                "sent": 500,
+                "retried": 0,
+                "failed": 0,
+            }
+        assert [len(call) for call in provider.calls] == [50] * 10
+        # The first 100 go out in a burst, the other 400 at 20 a second.
+        assert setup.now == pytest.approx(20.0)
+        # One claim and one outcome per 200 messages.
+        assert len([q for q in queries if q["sql"].startswith("UPDATE")]) == 6
+        assert not SMSLog.objects.exclude(status="sent").exists()
+
+    def test_failed_messages_are_retried_then_given_up(self, tenant):
+        enqueue_sms(parents(3))
+        provider = RecordingProvider(failing=["+919000000001"])
+        assert send_queued_sms(provider) == {"sent": 2, "retried": 1, "failed": 0}
+        failed = SMSLog.objects.get(to_phone="+919000000001")
+        assert (failed.status, failed.attempts, failed.error_message) == (
+            "pending",
+            1,
+            "Invalid number",
+        )
+        for _ in range(sms.MAX_SMS_ATTEMPTS - 1):
+            SMSLog.objects.filter(pk=failed.pk).update(
+                next_attempt_at=failed.created_at
+            )
+            outcome = send_queued_sms(provider)
+        assert outcome == {"sent": 0, "retried": 0, "failed": 1}
+
+    def test_provider_errors_fail_the_whole_call(self, tenant):
+        class DownProvider(RecordingProvider):
+            def send_batch(self, messages):
+                raise ConnectionError("Gateway unavailable")
+
+        enqueue_sms(parents(2))
+        assert send_queued_sms(DownProvider()) == {"sent": 0, "retried": 2, "failed": 0}
+        assert set(SMSLog.objects.values_list("error_message", flat=True)) == {
+            "Gateway unavailable"
+        }
+
+    def test_sends_outside_the_claim_transaction(self, tenant, monkeypatch):
+        enqueue_sms(parents(1))
+        seen = []
+        deliver = sms._deliver
+        # The test itself runs in a transaction.
+        depth = len(connection.atomic_blocks)
+
+        def spy(provider, bucket, batch):
+            seen.append(
+                (len(connection.atomic_blocks) - depth, SMSLog.objects.get().status)
+            )
+            return deliver(provider, bucket, batch)
+
+        monkeypatch.setattr(sms, "_deliver", spy)
+        send_queued_sms(RecordingProvider())
+        assert seen == [(0, "sending")]
+
+    def test_lapsed_claims_are_sent_again(self, tenant):
+        (log,) = enqueue_sms(parents(1))
+        SMSLog.objects.filter(pk=log.pk).update(
+            status="sending", next_attempt_at=log.created_at
+        )
+        assert send_queued_sms(RecordingProvider())["sent"] == 1
+
+    def test_configured_provider(self, tenant, settings):
+        settings.SMS_BACKEND = "apps.communication.sms.LocalSMSProvider"
+        enqueue_sms(parents(2))
+        assert send_queued_sms()["sent"] == 2
+        assert LocalSMSProvider.outbox == parents(2)
+
+    def test_no_provider_configured(self, tenant, settings):
+        settings.SMS_BACKEND = ""
+        enqueue_sms(parents(2))
+        with pytest.raises(ImproperlyConfigured):
+            send_queued_sms()
+        assert not SMSLog.objects.exclude(status="pending").exists()
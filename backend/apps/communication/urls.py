@@ -10,5 +10,6 @@ router.register(r"email-logs", views.EmailLogViewSet, basename="email-log")
 router.register(r"sms-logs", views.SMSLogViewSet, basename="sms-log")
 
 urlpatterns = [
+    path("stream/", views.notification_stream, name="notification-stream"),
     path("", include(router.urls)),
 ]
@@ -1,6 +1,16 @@
+from asgiref.sync import sync_to_async
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.db import models
+from django.http import JsonResponse, StreamingHttpResponse
+from django_tenants.utils import schema_context
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from django.utils import timezone
 from .models import Announcement, Notification, Message, EmailLog, SMSLog
@@ -10,7 +20,11 @@ from .serializers import (
     MessageSerializer,
     EmailLogSerializer,
     SMSLogSerializer,
+    MarkReadSerializer,
 )
+from .pubsub import get_broker, user_channel
+from apps.accounts.models import User
+from apps.core.pagination import KeysetPagination
 from apps.core.permissions import IsSchoolAdmin, IsOwnerOrAdmin
 
 
@@ -20,59 +34,110 @@ class AnnouncementViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        if user.is_superuser:
+        if user.is_superuser or user.role in [User.SUPER_ADMIN, User.SCHOOL_ADMIN]:
             return Announcement.objects.all()
-        elif user.role == 'SCHOOL_ADMIN':
-            return Announcement.objects.filter(author__school=user.school)
-        else:
-            return Announcement.objects.filter(
-                target_roles__contains=[user.role],
-                is_active=True
-            ).filter(
-                models.Q(target_classes__in=[user.student.class_enrolled]) |
-                models.Q(target_sections__in=[user.student.section]) |
-                models.Q(target_classes__isnull=True, target_sections__isnull=True)
-            ).distinct()
+        # The audience was resolved when the announcement was published
+        # (see fanout.py); a user's announcements are the ones they were
+        # notified about.
+        return Announcement.objects.filter(
+            is_active=True,
+            pk__in=Notification.objects.filter(
+                recipient=user,
+                content_type=ContentType.objects.get_for_model(Announcement),
+            ).values('object_id'),
+        )
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class ReadStateActionsMixin:
+    """
+    Read receipts for the items the user received (``read_model`` rows with
+    them as ``recipient``): each action is one UPDATE, or one COUNT answered
+    from the model's partial index on unread rows.
+    """
+    read_model = None
+    # Whether ``read_model`` has an auto_now ``updated_at``, which update()
+    # does not set by itself.
+    read_touches_updated_at = False
+
+    def unread(self):
+        return self.read_model.objects.filter(
+            recipient=self.request.user, is_read=False
+        ).order_by()
+
+    def received(self, pk):
+        """The row ``pk`` if the user received it, as a queryset."""
+        try:
+            pk = self.read_model._meta.pk.to_python(pk)
+        except ValidationError:
+            raise NotFound()
+        return self.read_model.objects.filter(pk=pk, recipient=self.request.user)
+
+    def _mark_read(self, queryset):
+        changes = {'is_read': True}
+        if self.read_touches_updated_at:
+            changes['updated_at'] = timezone.now()
+        return queryset.update(**changes)
+
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = self._mark_read(
+            self.unread().filter(pk__in=serializer.validated_data['ids'])
+        )
+        return Response({'updated': updated})
+
+    @action(detail=False, methods=['post'])
+    def mark_all_read(self, request):
+        return Response({'updated': self._mark_read(self.unread())})
+
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        return Response({'unread': self.unread().count()})
+
+
+class NotificationViewSet(ReadStateActionsMixin, viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    read_model = Notification
 
     def get_queryset(self):
-        return Notification.objects.filter(recipient=self.request.user)
+        return Notification.objects.filter(
+            recipient=self.request.user
+        ).select_related('recipient')
 
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
-        notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        if not self._mark_read(self.received(pk)):
+            raise NotFound()
         return Response({'status': 'notification marked as read'})
 
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(ReadStateActionsMixin, viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    read_model = Message
+    read_touches_updated_at = True
 
     def get_queryset(self):
         user = self.request.user
         return Message.objects.filter(
             models.Q(sender=user) | models.Q(recipient=user)
-        )
+        ).select_related('sender', 'recipient')
 
     def perform_create(self, serializer):
         serializer.save(sender=self.request.user)
 
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
-        message = self.get_object()
-        if message.recipient == request.user:
-            message.is_read = True
-            message.save()
+        if self._mark_read(self.received(pk)):
             return Response({'status': 'message marked as read'})
+        self.get_object()  # 404 unless the user sent it
         return Response(
             {'error': 'You are not the recipient of this message'},
             status=status.HTTP_403_FORBIDDEN
@@ -82,6 +147,7 @@ class MessageViewSet(viewsets.ModelViewSet):
 class EmailLogViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = EmailLogSerializer
     permission_classes = [permissions.IsAuthenticated & IsSchoolAdmin]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return EmailLog.objects.filter(created_at__gte=timezone.now() - timezone.timedelta(days=30))
@@ -90,6 +156,63 @@ class EmailLogViewSet(viewsets.ReadOnlyModelViewSet):
 class SMSLogViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = SMSLogSerializer
     permission_classes = [permissions.IsAuthenticated & IsSchoolAdmin]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return SMSLog.objects.filter(created_at__gte=timezone.now() - timezone.timedelta(days=30))
+
+
+STREAM_HEARTBEAT_SECONDS = 25
+STREAM_RETRY_MILLISECONDS = 5000
+
+
+def _stream_user(request, schema_name):
+    # EventSource cannot send headers, so the access token may come in the
+    # query string instead of the Authorization header.
+    token = request.GET.get('token') or request.headers.get(
+        'Authorization', ''
+    ).removeprefix('Bearer ')
+    try:
+        user_id = AccessToken(token)[jwt_settings.USER_ID_CLAIM]
+    except (TokenError, KeyError):
+        return None
+    with schema_context(schema_name):
+        return User.objects.filter(pk=user_id, is_active=True).first()
+
+
+async def notification_stream(request):
+    """
+    Server-sent events carrying the user's new notifications and messages
+    as they are created, so dashboards need not poll the list endpoints.
+
+    Each event's data is a JSON object with a ``type`` of ``notification``
+    or ``message``; a comment is sent every ``STREAM_HEARTBEAT_SECONDS`` to
+    keep proxies from closing an idle connection. Clients should reload the
+    lists after (re)connecting, as nothing is replayed.
+
+    Only served under ASGI: a WSGI server would buffer the endless stream
+    and hold a worker without ever sending a byte.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': 'The notification stream needs the ASGI server.'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+    schema_name = request.tenant.schema_name
+    user = await sync_to_async(_stream_user)(request, schema_name)
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided or are invalid.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    async def events():
+        yield f'retry: {STREAM_RETRY_MILLISECONDS}\n\n'
+        channel = user_channel(schema_name, user.pk)
+        async for payload in get_broker().listen(channel, STREAM_HEARTBEAT_SECONDS):
+            yield ': keep-alive\n\n' if payload is None else f'data: {payload}\n\n'
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,67 @@
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+
+class VersionedCache:
+    """
+    Per-tenant version stamp for a family of entries in the shared cache.
+
+    Entries are keyed by ``namespace``, the tenant schema and the current
+    version, so ``invalidate`` drops all of a tenant's entries at once by
+    storing a new version; the stale entries simply expire. Versions are
+    ``time.time_ns()`` stamps rather than increments, so an evicted version
+    key can never resurrect entries written under an older version.
+
+    With ``local_ttl`` the version is also remembered in this process for
+    that many seconds, saving a cache round trip per lookup at the price of
+    other processes seeing an invalidation up to ``local_ttl`` late.
+    """
+
+    def __init__(self, namespace, local_ttl=0):
+        self.namespace = namespace
+        self.local_ttl = local_ttl
+        self._local = {}
+
+    def _version_key(self, schema_name):
+        return f"{self.namespace}:{schema_name}:version"
+
+    def version(self):
+        schema_name = connection.schema_name
+        local = self._local.get(schema_name)
+        now = time.monotonic()
+        if local is not None and now - local[1] < self.local_ttl:
+            return local[0]
+        key = self._version_key(schema_name)
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), None)
+            version = cache.get(key)
+        if self.local_ttl:
+            self._local[schema_name] = (version, now)
+        return version
+
+    def key(self, *parts):
+        """The cache key of ``parts`` under the active tenant's version."""
+        return ":".join(
+            [self.namespace, connection.schema_name, str(self.version())]
+            + [str(part) for part in parts]
+        )
+
+    def invalidate(self):
+        """
+        Drop the active tenant's entries once the current transaction
+        commits; bumping earlier would let a concurrent reader cache the
+        rows that are about to change under the new version.
+        """
+        schema_name = connection.schema_name
+        transaction.on_commit(lambda: self._bump(schema_name))
+
+    def _bump(self, schema_name):
+        cache.set(self._version_key(schema_name), time.time_ns(), None)
+        self._local.pop(schema_name, None)
+
+    def clear_local(self):
+        """Forget the versions remembered by this process."""
+        self._local.clear()
@@ -0,0 +1,14 @@
+from django.db import connection
+
+from .models import TaskRecord
+
+
+def queue_task(request, task, *args):
+    """
+    Queue ``task`` for the active school, as ``task(schema_name, *args)``,
+    and record ``request.user`` as its owner so only they can poll it at
+    ``/api/core/tasks/<task_id>/``. Returns the ``AsyncResult``.
+    """
+    result = task.delay(connection.schema_name, *args)
+    TaskRecord.objects.create(task_id=result.id, name=task.name, user=request.user)
+    return result
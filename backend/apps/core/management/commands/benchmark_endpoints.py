@@ -0,0 +1,397 @@
+import json
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_tenants.utils import schema_context
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.academic.models import AcademicYear, Attendance, Class, Section, Subject
+from apps.academic.views import AttendanceViewSet
+from apps.communication.models import Message, Notification
+from apps.communication.views import MessageViewSet, NotificationViewSet
+from apps.core.models import School
+from apps.finance.models import FeeCategory, FeeStructure, StudentFee
+from apps.library.models import Book, BookIssue
+
+User = get_user_model()
+
+PREFIX = "bench_idx"
+CLASSES = 10
+SECTIONS_PER_CLASS = 2
+SUBJECTS_PER_CLASS = 5
+NOTIFICATIONS_PER_STUDENT = 40
+MESSAGES_PER_STUDENT = 10
+BOOKS = 200
+ISSUES_PER_STUDENT = 3
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a tenant with a school year of data (students, daily attendance, "
+        "notifications, messages, monthly fees, library issues) and record the "
+        "timing, query count and EXPLAIN ANALYZE plan of the hot list queries "
+        "to a JSON file. Run it before and after applying index migrations "
+        "(e.g. `migrate academic 0005` / `migrate`) with different --label "
+        "values and compare the two files with --compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schema", required=True, help="Tenant schema to use")
+        parser.add_argument("--students", type=int, default=500)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--runs", type=int, default=5, help="Timed runs per case")
+        parser.add_argument("--label", default="run")
+        parser.add_argument(
+            "--output", help="JSON file for the results (default: <label>.json)"
+        )
+        parser.add_argument(
+            "--compare", help="Earlier results file to print a side-by-side table"
+        )
+        parser.add_argument(
+            "--reseed",
+            action="store_true",
+            help="Drop previously seeded benchmark data and seed again",
+        )
+        parser.add_argument(
+            "--cleanup",
+            action="store_true",
+            help="Remove the benchmark data and exit",
+        )
+
+    def handle(self, *args, **options):
+        with schema_context(options["schema"]):
+            if options["cleanup"]:
+                self.cleanup()
+                return
+            if options["reseed"]:
+                self.cleanup()
+            if not User.objects.filter(username=f"{PREFIX}_admin").exists():
+                started = time.perf_counter()
+                with transaction.atomic():
+                    self.seed(options["students"], options["days"])
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+                self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s")
+            results = {
+                "schema": options["schema"],
+                "label": options["label"],
+                "recorded_at": timezone.now().isoformat(),
+                "cases": [
+                    self.measure(name, run, options["runs"])
+                    for name, run in self.cases()
+                ],
+            }
+
+        output = options["output"] or f"{options['label']}.json"
+        with open(output, "w") as handle:
+            json.dump(results, handle, indent=2)
+        self.stdout.write(f"Wrote {output}")
+
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"]) as handle:
+                baseline = {case["name"]: case for case in json.load(handle)["cases"]}
+        for case in results["cases"]:
+            line = (
+                f"{case['name']:<34} {case['median_ms']:>9.2f}ms "
+                f"queries={case['queries']:<3}"
+            )
+            if case["name"] in baseline:
+                line += f" (was {baseline[case['name']]['median_ms']:.2f}ms)"
+            self.stdout.write(line)
+
+    # Seeding ---------------------------------------------------------------
+
+    def seed(self, student_count, days):
+        password = make_password(None)
+        today = date.today()
+        first_day = today - timedelta(days=days)
+
+        User.objects.create(
+            username=f"{PREFIX}_admin", role=User.SUPER_ADMIN, password=password
+        )
+        academic_year = AcademicYear.objects.create(
+            name=f"{PREFIX}-{first_day.year}",
+            start_date=first_day,
+            end_date=today,
+        )
+        classes = Class.objects.bulk_create(
+            Class(name=f"{PREFIX} Grade {index + 1}") for index in range(CLASSES)
+        )
+        teachers = User.objects.bulk_create(
+            User(
+                username=f"{PREFIX}_teacher{index}",
+                role=User.TEACHER,
+                password=password,
+            )
+            for index in range(CLASSES * SECTIONS_PER_CLASS)
+        )
+        sections = Section.objects.bulk_create(
+            Section(
+                name=chr(ord("A") + index % SECTIONS_PER_CLASS),
+                class_name=classes[index // SECTIONS_PER_CLASS],
+                teacher=teacher,
+                academic_year=academic_year,
+            )
+            for index, teacher in enumerate(teachers)
+        )
+        Subject.objects.bulk_create(
+            Subject(
+                name=f"Subject {index % SUBJECTS_PER_CLASS}",
+                code=f"{PREFIX}-{index}",
+                class_name=classes[index // SUBJECTS_PER_CLASS],
+                teacher=teachers[index % len(teachers)],
+            )
+            for index in range(CLASSES * SUBJECTS_PER_CLASS)
+        )
+        students = User.objects.bulk_create(
+            User(
+                username=f"{PREFIX}_student{index}",
+                role=User.STUDENT,
+                password=password,
+            )
+            for index in range(student_count)
+        )
+        enrolment = {
+            student.id: sections[index % len(sections)]
+            for index, student in enumerate(students)
+        }
+        Section.students.through.objects.bulk_create(
+            Section.students.through(section_id=section.id, user_id=student_id)
+            for student_id, section in enrolment.items()
+        )
+
+        school_days = [
+            first_day + timedelta(days=offset)
+            for offset in range(days)
+            if (first_day + timedelta(days=offset)).weekday() < 5
+        ]
+        Attendance.objects.bulk_create(
+            (
+                Attendance(
+                    student_id=student_id,
+                    section=section,
+                    date=day,
+                    is_present=(student_id + day.toordinal()) % 12 != 0,
+                )
+                for day in school_days
+                for student_id, section in enrolment.items()
+            ),
+            batch_size=5000,
+        )
+
+        Notification.objects.bulk_create(
+            (
+                Notification(
+                    title=f"Notice {index}",
+                    message="",
+                    notification_type="other",
+                    recipient=student,
+                    is_read=index % 4 != 0,
+                )
+                for student in students
+                for index in range(NOTIFICATIONS_PER_STUDENT)
+            ),
+            batch_size=5000,
+        )
+        Message.objects.bulk_create(
+            (
+                Message(
+                    sender=enrolment[student.id].teacher if index % 2 else student,
+                    recipient=student if index % 2 else enrolment[student.id].teacher,
+                    subject=f"Message {index}",
+                    content="",
+                )
+                for student in students
+                for index in range(MESSAGES_PER_STUDENT)
+            ),
+            batch_size=5000,
+        )
+        # Spread the timestamps over the year so created_at orderings and
+        # ranges see realistic data rather than one instant.
+        with connection.cursor() as cursor:
+            for model in (Notification, Message):
+                cursor.execute(
+                    f"UPDATE {model._meta.db_table} "
+                    f"SET created_at = created_at - (id %% %s) * interval '1 day'",
+                    [days],
+                )
+
+        category = FeeCategory.objects.create(name=f"{PREFIX} tuition")
+        structures = {
+            class_name.id: FeeStructure.objects.create(
+                category=category,
+                class_name=class_name,
+                amount=Decimal("1500.00"),
+                frequency="monthly",
+                academic_year=f"{first_day.year}-{first_day.year + 1}",
+            )
+            for class_name in classes
+        }
+        StudentFee.objects.bulk_create(
+            (
+                StudentFee(
+                    student_id=student_id,
+                    fee_structure=structures[section.class_name_id],
+                    due_date=first_day + timedelta(days=30 * month),
+                    amount=Decimal("1500.00"),
+                    paid_amount=Decimal("1500.00") if month < 9 else Decimal("0"),
+                    status="paid" if month < 9 else "pending",
+                )
+                for student_id, section in enrolment.items()
+                for month in range(12)
+            ),
+            batch_size=5000,
+        )
+
+        # Books reference a school row inside the tenant schema; insert a
+        # placeholder without School.save(), which would provision a schema.
+        school = School.objects.bulk_create(
+            [
+                School(
+                    schema_name=PREFIX,
+                    name=PREFIX,
+                    address="",
+                    contact_email="bench@example.com",
+                    contact_phone="",
+                    board_affiliation="CBSE",
+                    student_strength=0,
+                    staff_count=0,
+                    principal_name=PREFIX,
+                    principal_email="bench@example.com",
+                    principal_phone="",
+                )
+            ]
+        )[0]
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Book {index}",
+                author="Author",
+                isbn=f"{index:013d}",
+                publisher="Publisher",
+                publication_year=2000,
+                copies=5,
+                available_copies=5,
+                school=school,
+            )
+            for index in range(BOOKS)
+        )
+        BookIssue.objects.bulk_create(
+            (
+                BookIssue(
+                    book=books[(student.id + index) % len(books)],
+                    student=student,
+                    issue_date=today - timedelta(days=30 * (index + 1)),
+                    due_date=today - timedelta(days=30 * (index + 1) - 14),
+                    status="issued" if index == 0 else "returned",
+                )
+                for student in students
+                for index in range(ISSUES_PER_STUDENT)
+            ),
+            batch_size=5000,
+        )
+
+    def cleanup(self):
+        Class.objects.filter(name__startswith=PREFIX).delete()
+        AcademicYear.objects.filter(name__startswith=PREFIX).delete()
+        FeeCategory.objects.filter(name__startswith=PREFIX).delete()
+        School.objects.filter(schema_name=PREFIX).delete()
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+    # Measuring -------------------------------------------------------------
+
+    def cases(self):
+        admin = User.objects.get(username=f"{PREFIX}_admin")
+        teacher = User.objects.get(username=f"{PREFIX}_teacher0")
+        student = User.objects.get(username=f"{PREFIX}_student0")
+        today = date.today()
+        return [
+            ("attendance list (admin)", self.endpoint(AttendanceViewSet, admin)),
+            ("attendance list (teacher)", self.endpoint(AttendanceViewSet, teacher)),
+            ("attendance list (student)", self.endpoint(AttendanceViewSet, student)),
+            ("notifications (student)", self.endpoint(NotificationViewSet, student)),
+            ("messages (student)", self.endpoint(MessageViewSet, student)),
+            ("messages (teacher)", self.endpoint(MessageViewSet, teacher)),
+            # Finance and library have no working list endpoints yet; time the
+            # queries those views and the overdue jobs filter on.
+            (
+                "student fees open by due date",
+                self.query(
+                    StudentFee.objects.filter(
+                        student=student, status__in=["pending", "partial"]
+                    ).order_by("due_date")
+                ),
+            ),
+            (
+                "student fees falling overdue",
+                self.query(
+                    StudentFee.objects.filter(
+                        status__in=["pending", "partial"], due_date__lt=today
+                    )
+                ),
+            ),
+            (
+                "book issues overdue",
+                self.query(
+                    BookIssue.objects.filter(status="issued", due_date__lt=today)
+                ),
+            ),
+        ]
+
+    def endpoint(self, viewset, user):
+        view = viewset.as_view({"get": "list"})
+
+        def run():
+            request = APIRequestFactory().get("/", SERVER_NAME="localhost")
+            force_authenticate(request, user=user)
+            response = view(request)
+            response.render()
+            return response.status_code
+
+        return run
+
+    def query(self, queryset):
+        def run():
+            return len(list(queryset.all()))
+
+        return run
+
+    def measure(self, name, run, runs):
+        run()  # warm caches (visibility, connection, plan)
+        timings = []
+        for _ in range(runs):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+        statements = [
+            query
+            for query in queries.captured_queries
+            if not query["sql"].upper().startswith("SET ")
+        ]
+        plans = []
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement['sql']}")
+                plans.append(
+                    {
+                        "sql": statement["sql"],
+                        "time_ms": round(float(statement["time"]) * 1000, 2),
+                        "plan": [line for (line,) in cursor.fetchall()],
+                    }
+                )
+        return {
+            "name": name,
+            "median_ms": round(statistics.median(timings), 2),
+            "min_ms": round(min(timings), 2),
+            "queries": len(statements),
+            "statements": plans,
+        }
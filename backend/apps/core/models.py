@@ -99,26 +99,6 @@ class School(TenantMixin):
                     admin_user.set_password(password)
                     admin_user.save()
                     
-                    # Send credentials email
-                    from django.core.mail import send_mail
-                    from django.template.loader import render_to_string
-                    
-                    context = {
-                        'school_name': self.name,
-                        'username': admin_user.username,
-                        'password': password,
-                        'login_url': settings.FRONTEND_URL + '/login'
-                    }
-                    
-                    send_mail(
-                        subject=f'Welcome to School Management System - {self.name}',
-                        message=render_to_string('emails/school_approved.txt', context),
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[self.principal_email],
-                        html_message=render_to_string('emails/school_approved.html', context)
-                    )
-                    logger.info(f"Sent welcome email to school admin: {self.principal_email}")
-                    
                 except User.DoesNotExist as e:
                     logger.error(f"Failed to create admin user for school {self.name}: {str(e)}")
                     raise SchoolApprovalError(f"Failed to create admin user: {str(e)}")
@@ -127,9 +107,12 @@ class School(TenantMixin):
                     raise SchoolApprovalError(f"School approval process failed: {str(e)}")
 
                 try:
-                    # Send credentials email
-                    from django.core.mail import send_mail
+                    # Queue the credentials email in the school's own email
+                    # log; a Celery worker sends it after the save commits and
+                    # then blanks the password out of the log.
                     from django.template.loader import render_to_string
+                    from django_tenants.utils import schema_context
+                    from apps.communication.mailer import enqueue_email
                     
                     context = {
                         'school_name': self.name,
@@ -138,17 +121,18 @@ class School(TenantMixin):
                         'login_url': settings.FRONTEND_URL + '/login'
                     }
                     
-                    send_mail(
-                        subject=f'Welcome to School Management System - {self.name}',
-                        message=render_to_string('emails/school_approved.txt', context),
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        recipient_list=[self.principal_email],
-                        html_message=render_to_string('emails/school_approved.html', context)
-                    )
-                    logger.info(f"Sent welcome email to school admin: {self.principal_email}")
+                    with schema_context(self.schema_name):
+                        enqueue_email(
+                            self.principal_email,
+                            f'Welcome to School Management System - {self.name}',
+                            render_to_string('emails/school_approved.txt', context),
+                            html_content=render_to_string('emails/school_approved.html', context),
+                            redact=True,
+                        )
+                    logger.info(f"Queued welcome email to school admin: {self.principal_email}")
                 except Exception as e:
-                    logger.error(f"Failed to send welcome email to {self.principal_email}: {str(e)}")
-                    raise EmailDeliveryError(f"Failed to send welcome email: {str(e)}")
+                    logger.error(f"Failed to queue welcome email to {self.principal_email}: {str(e)}")
+                    raise EmailDeliveryError(f"Failed to queue welcome email: {str(e)}")
         except Exception as e: 
             logger.error(f"Error saving school {self.name}: {str(e)}")
             raise
@@ -156,3 +140,38 @@ class School(TenantMixin):
 
 class Domain(DomainMixin):
     pass
+
+
+class Watermark(models.Model):
+    """
+    Progress marker for an incremental background job.
+
+    ``value`` is the ``updated_at`` of the newest source row the job named
+    ``name`` has processed; ``None`` means the job has never run. Lives in
+    every tenant schema, so each school keeps its own marks.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+
+
+class TaskRecord(models.Model):
+    """
+    Who queued a background job through the API.
+
+    Lives in the tenant schema of the school the job runs for, so a task id
+    is only known to that school; only ``user`` may poll the task and
+    download its file.
+    """
+    task_id = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="tasks"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.task_id})"
@@ -0,0 +1,155 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first pagination that seeks on ``(field, id)`` instead of OFFSET.
+
+    A page is ``WHERE field <= v AND (field < v OR id < i) ORDER BY field
+    DESC, id DESC LIMIT n + 1`` where ``(v, i)`` is the last row of the
+    previous page, so with an index on ``(field, id)`` page 500 costs the same
+    as page 1 and no ``COUNT(*)`` is issued. Cursors are opaque tokens in the
+    ``next``/``previous`` links; the row after the page only decides whether
+    a ``next`` link is emitted.
+    """
+
+    field = "created_at"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model_field = queryset.model._meta.get_field(self.field)
+        cursor = self.decode_cursor(request)
+        self.has_cursor = cursor is not None
+        self.reverse = bool(cursor and cursor["reverse"])
+
+        if cursor is None:
+            queryset = queryset.order_by(f"-{self.field}", "-id")
+        elif self.reverse:
+            # Walking back towards newer rows: seek upwards, then flip.
+            value, pk = cursor["value"], cursor["id"]
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__gte": value})
+                & (Q(**{f"{self.field}__gt": value}) | Q(id__gt=pk))
+            ).order_by(self.field, "id")
+        else:
+            value, pk = cursor["value"], cursor["id"]
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__lte": value})
+                & (Q(**{f"{self.field}__lt": value}) | Q(id__lt=pk))
+            ).order_by(f"-{self.field}", "-id")
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(token.encode()))
+            # Parsed by the model field, so a forged value is rejected here
+            # rather than by the database.
+            value = self.model_field.to_python(cursor["v"])
+            if value is None:
+                raise ValueError("Empty cursor value")
+            return {
+                "value": value,
+                "id": int(cursor["i"]),
+                "reverse": bool(cursor.get("r")),
+            }
+        except (TypeError, ValueError, KeyError, AttributeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row, reverse=False):
+        value = getattr(row, self.field)
+        payload = {"v": value.isoformat(), "i": row.pk}
+        if reverse:
+            payload["r"] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        has_next = self.has_more if not self.reverse else self.has_cursor
+        if not has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        has_previous = self.has_more if self.reverse else self.has_cursor
+        if not has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class DateKeysetPagination(KeysetPagination):
+    field = "date"
@@ -0,0 +1,39 @@
+from django.db import connection
+from django_tenants.utils import get_public_schema_name, schema_context
+from rest_framework.exceptions import NotFound
+
+from .models import School
+
+
+def tenant_schema_names():
+    """
+    Schema names of every approved school.
+
+    Periodic jobs are scheduled once and fan out to one task per tenant with
+    this list, since the tenant rows only live in the public schema.
+    """
+    with schema_context(get_public_schema_name()):
+        return list(
+            School.objects.filter(is_approved=True)
+            .exclude(schema_name=get_public_schema_name())
+            .order_by("schema_name")
+            .values_list("schema_name", flat=True)
+        )
+
+
+class TenantScopedViewMixin:
+    """
+    For views over models that live in the school schemas.
+
+    django-tenants already points the connection at the requesting school's
+    schema, so querysets need no school filter or per-row ownership check.
+    The only thing left to refuse is a request that arrived on the public
+    schema, where these tables hold no school's data. The active school is
+    available as ``self.tenant``.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if connection.schema_name == get_public_schema_name():
+            raise NotFound("This resource is only available on a school's domain.")
+        self.tenant = connection.tenant
@@ -0,0 +1,27 @@
+import pytest
+from django.core.cache import cache
+from apps.core.caching import VersionedCache
+
+
+@pytest.mark.django_db
+class TestVersionedCache:
+    def test_invalidate_bumps_the_version_on_commit(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        versions = VersionedCache("test:versioned")
+        key = versions.key("entry")
+        cache.set(key, "old")
+        with django_capture_on_commit_callbacks(execute=True):
+            versions.invalidate()
+            assert versions.key("entry") == key
+        assert versions.key("entry") != key
+        assert key.startswith(f"test:versioned:{tenant.schema_name}:")
+
+    def test_local_version_is_dropped_by_this_process(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        versions = VersionedCache("test:local", local_ttl=60)
+        key = versions.key("entry")
+        with django_capture_on_commit_callbacks(execute=True):
+            versions.invalidate()
+        assert versions.key("entry") != key
@@ -0,0 +1,117 @@
+import base64
+import json
+import pytest
+from datetime import date, timedelta
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import AcademicYear, Attendance, Class, Section
+from apps.academic.views import AttendanceViewSet
+from apps.accounts.models import User
+from apps.communication.models import Notification
+from apps.communication.views import NotificationViewSet
+
+
+@pytest.fixture
+def admin(tenant):
+    return User.objects.create_user(username="admin", role="super_admin")
+
+
+@pytest.fixture
+def attendance(admin):
+    section = Section.objects.create(
+        name="A",
+        class_name=Class.objects.create(name="Grade 5"),
+        academic_year=AcademicYear.objects.create(
+            name="2024-2025", start_date=date(2024, 4, 1), end_date=date(2025, 3, 31)
+        ),
+    )
+    students = [
+        User.objects.create_user(username=f"student{i}", role="student")
+        for i in range(4)
+    ]
+    # Four rows share every date, so pages must break ties on id.
+    Attendance.objects.bulk_create(
+        Attendance(
+            student=student,
+            section=section,
+            date=date(2024, 7, 1) + timedelta(days=day),
+        )
+        for day in range(6)
+        for student in students
+    )
+    return list(
+        Attendance.objects.order_by("-date", "-id").values_list("id", flat=True)
+    )
+
+
+def get(viewset, user, url="/", **params):
+    request = APIRequestFactory().get(url, params)
+    force_authenticate(request, user=user)
+    return viewset.as_view({"get": "list"})(request)
+
+
+def ids(response):
+    return [row["id"] for row in response.data["results"]]
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def test_next_links_walk_every_row_once(self, admin, attendance):
+        response = get(AttendanceViewSet, admin, page_size=5)
+        assert "count" not in response.data
+        assert response.data["previous"] is None
+        seen = ids(response)
+        while response.data["next"]:
+            response = get(AttendanceViewSet, admin, url=response.data["next"])
+            seen += ids(response)
+        assert seen == attendance
+
+    def test_previous_link_returns_the_earlier_page(self, admin, attendance):
+        first = get(AttendanceViewSet, admin, page_size=5)
+        second = get(AttendanceViewSet, admin, url=first.data["next"])
+        third = get(AttendanceViewSet, admin, url=second.data["next"])
+        assert ids(third) == attendance[10:15]
+        back = get(AttendanceViewSet, admin, url=third.data["previous"])
+        assert ids(back) == attendance[5:10]
+        back = get(AttendanceViewSet, admin, url=back.data["previous"])
+        assert ids(back) == attendance[:5]
+        assert back.data["previous"] is None
+
+    def test_invalid_cursor(self, admin, attendance):
+        response = get(AttendanceViewSet, admin, cursor="not-a-cursor")
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"v": "not-a-date", "i": 1},
+            {"v": None, "i": 1},
+            {"v": ["2024-07-01"], "i": 1},
+            {"v": "2024-07-01", "i": "x"},
+            ["2024-07-01", 1],
+        ],
+    )
+    def test_forged_cursor(self, admin, attendance, payload):
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        response = get(AttendanceViewSet, admin, cursor=token)
+        assert response.status_code == 404
+
+    def test_notifications_page_on_created_at(self, admin):
+        Notification.objects.bulk_create(
+            Notification(
+                title=f"Notice {i}",
+                message="",
+                notification_type="other",
+                recipient=admin,
+            )
+            for i in range(15)
+        )
+        newest_first = list(
+            Notification.objects.order_by("-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        first = get(NotificationViewSet, admin)
+        assert ids(first) == newest_first[:10]
+        rest = get(NotificationViewSet, admin, url=first.data["next"])
+        assert ids(rest) == newest_first[10:]
+        assert rest.data["next"] is None
@@ -0,0 +1,75 @@
+import pytest
+from celery import shared_task
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.accounts.models import User
+from apps.core.jobs import queue_task
+from apps.core.models import TaskRecord
+from apps.core.views import TaskFileView, TaskStatusView
+
+
+@shared_task
+def store_file(schema_name, text):
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import storages
+
+    return {"path": storages["private"].save("report.txt", ContentFile(text))}
+
+
+class Result:
+    def __init__(self, task_id, value):
+        self.id = task_id
+        self.state = "SUCCESS"
+        self.result = value
+
+    def successful(self):
+        return True
+
+
+@pytest.fixture
+def users(tenant):
+    return [
+        User.objects.create_user(username=f"user{i}", role="teacher") for i in range(2)
+    ]
+
+
+@pytest.fixture
+def queued(users, private_storage, monkeypatch):
+    """A finished ``store_file`` job queued by the first user."""
+    results = {}
+
+    def delay(*args):
+        results["job"] = Result("job", store_file(*args))
+        return results["job"]
+
+    monkeypatch.setattr(store_file, "delay", delay)
+    monkeypatch.setattr("apps.core.views.AsyncResult", lambda task_id: results[task_id])
+    request = APIRequestFactory().post("/")
+    request.user = users[0]
+    return queue_task(request, store_file, "marks")
+
+
+def get(view, user, task_id):
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user=user)
+    return view.as_view()(request, task_id=task_id)
+
+
+@pytest.mark.django_db
+class TestTaskOwnership:
+    def test_records_the_user_who_queued_the_task(self, queued, users):
+        record = TaskRecord.objects.get(task_id=queued.id)
+        assert record.user == users[0]
+        assert record.name == store_file.name
+
+    def test_only_the_owner_sees_the_status(self, queued, users):
+        response = get(TaskStatusView, users[0], queued.id)
+        assert response.status_code == 200
+        assert response.data["state"] == "SUCCESS"
+        assert get(TaskStatusView, users[1], queued.id).status_code == 404
+        assert get(TaskStatusView, users[0], "unknown").status_code == 404
+
+    def test_only_the_owner_downloads_the_file(self, queued, users):
+        response = get(TaskFileView, users[0], queued.id)
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == b"marks"
+        assert get(TaskFileView, users[1], queued.id).status_code == 404
@@ -0,0 +1,108 @@
+import csv
+import io
+
+from django.db import transaction
+from rest_framework import serializers
+
+
+def iter_upload_rows(request, file_field="file"):
+    """
+    Return an iterator over the rows of a bulk upload.
+
+    Accepts either a CSV file in ``request.FILES[file_field]`` (read
+    incrementally, one dict per line keyed by the header row) or a JSON list
+    body. Anything else is rejected with a ``ValidationError``.
+    """
+    upload = request.FILES.get(file_field)
+    if upload is not None:
+        return csv.DictReader(io.TextIOWrapper(upload.file, encoding="utf-8-sig"))
+    if isinstance(request.data, list):
+        return iter(request.data)
+    raise serializers.ValidationError(
+        {"detail": f"Upload a CSV file as '{file_field}' or post a JSON list."}
+    )
+
+
+def _row_error(index, errors):
+    return {"index": index, "status": "error", "errors": errors}
+
+
+def upsert_rows(
+    rows,
+    *,
+    model,
+    row_serializer,
+    key,
+    check,
+    existing,
+    unique_fields,
+    update_fields,
+    batch_size,
+):
+    """
+    Upsert the rows of a bulk upload into ``model`` and report the outcome of
+    every row.
+
+    Each row is validated by the one ``row_serializer`` instance (binding a
+    fresh serializer per row costs more than the database work for a large
+    upload) and identified by ``key(data)``. The same key cannot be upserted
+    twice in one statement, so the last occurrence in the upload wins and
+    the earlier ones are reported ``superseded``. ``check(accepted)`` is
+    given ``{key: data}`` of the valid rows and returns ``{key: errors}`` for
+    those naming objects that are unknown or out of bounds, resolving each
+    kind of reference with one query. ``existing(keys)`` returns the keys
+    already stored, which are reported ``updated``.
+
+    The accepted rows are written with one ``INSERT ... ON CONFLICT
+    (unique_fields) DO UPDATE`` per ``batch_size`` rows, in one transaction;
+    invalid rows are reported back without aborting the rest. Returns
+    ``{"created", "updated", "failed", "results"}``.
+    """
+    results = []
+    accepted = {}
+    for index, row in enumerate(rows):
+        results.append(None)
+        try:
+            data = row_serializer.run_validation(row)
+        except serializers.ValidationError as exc:
+            results[index] = _row_error(index, exc.detail)
+            continue
+        row_key = key(data)
+        if row_key in accepted:
+            superseded = accepted[row_key][0]
+            results[superseded] = {"index": superseded, "status": "superseded"}
+        accepted[row_key] = (index, data)
+
+    errors = check({row_key: data for row_key, (_, data) in accepted.items()})
+    to_write = []
+    for row_key, (index, data) in accepted.items():
+        if row_key in errors:
+            results[index] = _row_error(index, errors[row_key])
+        else:
+            to_write.append((row_key, index, data))
+
+    created = updated = 0
+    if to_write:
+        stored = existing([row_key for row_key, _, _ in to_write])
+        with transaction.atomic():
+            model.objects.bulk_create(
+                [model(**data) for _, _, data in to_write],
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=update_fields,
+            )
+        for row_key, index, _ in to_write:
+            if row_key in stored:
+                updated += 1
+                results[index] = {"index": index, "status": "updated"}
+            else:
+                created += 1
+                results[index] = {"index": index, "status": "created"}
+
+    return {
+        "created": created,
+        "updated": updated,
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "results": results,
+    }
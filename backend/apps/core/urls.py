@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("tasks/<str:task_id>/", views.TaskStatusView.as_view(), name="task-status"),
+    path("tasks/<str:task_id>/file/", views.TaskFileView.as_view(), name="task-file"),
+]
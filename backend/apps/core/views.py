@@ -1,3 +1,58 @@
-from django.shortcuts import render
+from celery.result import AsyncResult
+from django.core.files.storage import storages
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .models import TaskRecord
+
+
+def owned_task(request, task_id):
+    """The result of a task ``request.user`` queued in this school, or 404."""
+    get_object_or_404(TaskRecord, task_id=task_id, user=request.user)
+    return AsyncResult(task_id)
+
+
+class TaskStatusView(APIView):
+    """
+    State of a background job queued by one of the API endpoints.
+
+    Jobs that report progress expose it under ``progress`` while running;
+    finished jobs return their ``result`` or ``error``. Only the user who
+    queued a job can see it.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id):
+        result = owned_task(request, task_id)
+        data = {"id": task_id, "state": result.state}
+        if result.successful():
+            data["result"] = result.result
+        elif result.failed():
+            data["error"] = str(result.result)
+        elif isinstance(result.info, dict):
+            data["progress"] = result.info
+        return Response(data)
+
+
+class TaskFileView(APIView):
+    """
+    Download the file a finished job stored in private storage, such as
+    rendered report cards; only the user who queued the job can.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id):
+        result = owned_task(request, task_id)
+        path = None
+        if result.successful() and isinstance(result.result, dict):
+            path = result.result.get("path")
+        storage = storages["private"]
+        if not path or not storage.exists(path):
+            raise NotFound("This task has no file.")
+        return FileResponse(storage.open(path), as_attachment=True)
@@ -0,0 +1,127 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from .analytics import invalidate_analytics
+from .models import Payment, StudentFee
+from .payments import apply_fee_payments
+
+OPEN_STATUSES = ["pending", "partial", "overdue"]
+ALREADY_POSTED = {"transaction_id": ["This transaction has already been posted."]}
+
+
+def allocate(fees, amount, priority=None):
+    """
+    Split ``amount`` greedily over ``fees`` and return ``[(fee_id, share)]``.
+
+    ``fees`` are ``(fee_id, balance, due_date, category_type)`` tuples. Without
+    a ``priority`` the oldest fee is settled first; otherwise fees are taken
+    in the order of their category type in ``priority`` (e.g. tuition before
+    transport), oldest first within a type, and types that are not listed
+    come last. Whatever cannot be allocated is left out of the result.
+    """
+    rank = {category: position for position, category in enumerate(priority or [])}
+    ordered = sorted(
+        fees,
+        key=lambda fee: (rank.get(fee[3], len(rank)), fee[2], fee[0]),
+    )
+    shares = []
+    for fee_id, balance, _, _ in ordered:
+        if amount <= 0:
+            break
+        share = min(balance, amount)
+        if share > 0:
+            shares.append((fee_id, share))
+            amount -= share
+    return shares
+
+
+def allocate_payment(
+    student_id,
+    amount,
+    payment_method,
+    payment_date,
+    transaction_id="",
+    remarks="",
+    priority=None,
+):
+    """
+    Post a lump-sum payment of a student across their open fees.
+
+    The student's open fees are locked and read in one query, the amount is
+    split by ``allocate`` and one ``Payment`` per fee it reaches is written
+    with ``bulk_create`` before the fees are updated through
+    ``apply_fee_payments``, in a single transaction. Every split records the
+    transaction id as its ``lump_sum_reference``; only the first carries it
+    as ``transaction_id``, which the unique constraint reserves for the lump
+    sum. An amount above the outstanding balance, or a transaction id that
+    was already posted, is rejected with a ``ValidationError``.
+    """
+    with transaction.atomic():
+        fees = list(
+            StudentFee.objects.select_for_update(of=("self",))
+            .filter(student_id=student_id, status__in=OPEN_STATUSES)
+            .order_by("pk")
+            .values_list(
+                "pk",
+                "amount",
+                "paid_amount",
+                "due_date",
+                "fee_structure__category__category_type",
+            )
+        )
+        if (
+            transaction_id
+            and Payment.objects.filter(transaction_id=transaction_id).exists()
+        ):
+            raise serializers.ValidationError(ALREADY_POSTED)
+        outstanding = sum((fee[1] - fee[2] for fee in fees), Decimal("0"))
+        if amount > outstanding:
+            raise serializers.ValidationError(
+                {
+                    "amount": [
+                        f"Exceeds the student's outstanding balance of {outstanding}."
+                    ]
+                }
+            )
+        shares = allocate(
+            [
+                (pk, total - paid, due, category)
+                for pk, total, paid, due, category in fees
+            ],
+            amount,
+            priority,
+        )
+        try:
+            payments = Payment.objects.bulk_create(
+                [
+                    Payment(
+                        student_fee_id=fee_id,
+                        amount=share,
+                        payment_method=payment_method,
+                        transaction_id=transaction_id if position == 0 else "",
+                        lump_sum_reference=transaction_id,
+                        payment_date=payment_date,
+                        remarks=remarks,
+                    )
+                    for position, (fee_id, share) in enumerate(shares)
+                ]
+            )
+        except IntegrityError:
+            # Posted by a concurrent request after the check above.
+            raise serializers.ValidationError(ALREADY_POSTED)
+        apply_fee_payments(dict(shares))
+    invalidate_analytics()
+    return {
+        "student": student_id,
+        "amount": amount,
+        "allocations": [
+            {
+                "student_fee_id": payment.student_fee_id,
+                "payment_id": payment.pk,
+                "amount": payment.amount,
+            }
+            for payment in payments
+        ],
+    }
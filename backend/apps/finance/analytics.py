@@ -0,0 +1,144 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from apps.core.caching import VersionedCache
+
+from .models import Payment, StudentFee
+
+ANALYTICS_TIMEOUT = 15 * 60
+# (label, first day overdue, last day overdue); ``None`` leaves a side open.
+AGING_BUCKETS = [
+    ("current", None, 0),
+    ("1-30", 1, 30),
+    ("31-60", 31, 60),
+    ("61-90", 61, 90),
+    ("90+", 91, None),
+]
+OPEN_STATUSES = ["pending", "partial", "overdue"]
+
+_versions = VersionedCache("finance:analytics")
+
+
+def invalidate_analytics():
+    """Drop every cached finance dashboard of the active tenant."""
+    _versions.invalidate()
+
+
+def _collections(date_from, date_to):
+    """
+    Payments in the range grouped by day, method, category type and class in
+    a single query; the coarser rollups are summed from these rows.
+    """
+    rows = (
+        Payment.objects.filter(payment_date__range=(date_from, date_to))
+        .order_by()
+        .values(
+            "payment_date",
+            "payment_method",
+            "student_fee__fee_structure__category__category_type",
+            "student_fee__fee_structure__class_name_id",
+            "student_fee__fee_structure__class_name__name",
+        )
+        .annotate(amount=Sum("amount"), count=Count("id"))
+    )
+    rollups = {
+        name: defaultdict(lambda: [Decimal("0.00"), 0])
+        for name in ("day", "month", "method", "category_type", "class")
+    }
+    for row in rows:
+        keys = {
+            "day": row["payment_date"],
+            "month": row["payment_date"].strftime("%Y-%m"),
+            "method": row["payment_method"],
+            "category_type": row["student_fee__fee_structure__category__category_type"],
+            "class": (
+                row["student_fee__fee_structure__class_name_id"],
+                row["student_fee__fee_structure__class_name__name"],
+            ),
+        }
+        for name, key in keys.items():
+            totals = rollups[name][key]
+            totals[0] += row["amount"]
+            totals[1] += row["count"]
+
+    def listed(name, label):
+        return [
+            {label: key, "amount": amount, "count": count}
+            for key, (amount, count) in sorted(rollups[name].items())
+        ]
+
+    return {
+        "total_collected": sum(
+            (amount for amount, _ in rollups["day"].values()), Decimal("0.00")
+        ),
+        "payment_count": sum(count for _, count in rollups["day"].values()),
+        "by_day": listed("day", "date"),
+        "by_month": listed("month", "month"),
+        "by_payment_method": listed("method", "payment_method"),
+        "by_category_type": listed("category_type", "category_type"),
+        "by_class": [
+            {"class_id": class_id, "class_name": name, "amount": amount, "count": count}
+            for (class_id, name), (amount, count) in sorted(
+                rollups["class"].items(), key=lambda item: item[0][1]
+            )
+        ],
+    }
+
+
+def _aging(today):
+    """Outstanding balances bucketed by days overdue, in one query."""
+    balance = ExpressionWrapper(
+        F("amount") - F("paid_amount"),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    aggregates = {}
+    for index, (_, first, last) in enumerate(AGING_BUCKETS):
+        condition = Q()
+        if first is not None:
+            condition &= Q(due_date__lte=today - timedelta(days=first))
+        if last is not None:
+            condition &= Q(due_date__gte=today - timedelta(days=last))
+        aggregates[f"bucket{index}_amount"] = Sum(balance, filter=condition)
+        aggregates[f"bucket{index}_count"] = Count("id", filter=condition)
+    totals = StudentFee.objects.filter(status__in=OPEN_STATUSES).aggregate(**aggregates)
+    buckets = [
+        {
+            "bucket": label,
+            "amount": totals[f"bucket{index}_amount"] or Decimal("0.00"),
+            "count": totals[f"bucket{index}_count"],
+        }
+        for index, (label, _, _) in enumerate(AGING_BUCKETS)
+    ]
+    return {
+        "total": sum((bucket["amount"] for bucket in buckets), Decimal("0.00")),
+        "buckets": buckets,
+    }
+
+
+def finance_dashboard(date_from, date_to, today=None):
+    """
+    Collections between ``date_from`` and ``date_to`` (inclusive) and the
+    aging of outstanding balances as of ``today``, computed with two grouped
+    queries.
+
+    Results are cached per tenant under a version that the finance signals
+    and bulk posting bump whenever payments or fees change, so repeated loads
+    are served from the cache until the data moves.
+    """
+    today = today or timezone.localdate()
+    key = _versions.key(date_from.isoformat(), date_to.isoformat(), today.isoformat())
+    cached = cache.get(key)
+    if cached is None:
+        cached = {
+            "date_from": date_from,
+            "date_to": date_to,
+            **_collections(date_from, date_to),
+            "outstanding": _aging(today),
+        }
+        cache.set(key, cached, ANALYTICS_TIMEOUT)
+    return cached
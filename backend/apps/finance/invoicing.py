@@ -0,0 +1,176 @@
+import calendar
+from collections import defaultdict
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import IntegrityError, transaction
+
+from apps.academic.models import AcademicYear, Section
+from apps.core.exceptions import FeeModuleError
+
+from .analytics import invalidate_analytics
+from .lookups import normalise_academic_year
+from .models import StudentFee
+
+INVOICE_CHUNK_SIZE = 1000
+INSTALLMENT_MONTHS = {
+    "monthly": 1,
+    "quarterly": 3,
+    "semi_annual": 6,
+    "annual": 12,
+    "one_time": 12,
+}
+CENT = Decimal("0.01")
+
+
+def add_months(day, months):
+    """``day`` moved ``months`` ahead, clamped to the end of shorter months."""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def due_dates(frequency, start_date):
+    """Installment due dates of a fee of ``frequency`` over a 12 month year."""
+    step = INSTALLMENT_MONTHS[frequency]
+    return [add_months(start_date, offset) for offset in range(0, 12, step)]
+
+
+def discounted_amount(amount, discount):
+    if discount is None:
+        return amount
+    if discount.discount_type == "percentage":
+        reduction = (amount * discount.value / 100).quantize(CENT, ROUND_HALF_UP)
+    else:
+        reduction = discount.value
+    return max(amount - reduction, Decimal("0.00"))
+
+
+def academic_years():
+    """
+    ``{normalised name: (id, start_date)}`` of every academic year, so fee
+    structures match however their free-form ``academic_year`` is written.
+    """
+    return {
+        normalise_academic_year(name): (pk, start_date)
+        for pk, name, start_date in AcademicYear.objects.order_by(
+            "start_date"
+        ).values_list("pk", "name", "start_date")
+    }
+
+
+def _installments(fee_structures):
+    """``(student_id, fee_structure_id, due_date)`` of the existing rows."""
+    return set(
+        StudentFee.objects.filter(fee_structure__in=fee_structures)
+        .order_by()
+        .values_list("student_id", "fee_structure_id", "due_date")
+    )
+
+
+def _insert(chunk, fee_structures, existing):
+    """
+    Insert the installments of ``chunk`` that are not in ``existing`` and
+    return how many were inserted.
+    """
+    while True:
+        chunk = [
+            fee
+            for fee in chunk
+            if (fee.student_id, fee.fee_structure_id, fee.due_date) not in existing
+        ]
+        try:
+            with transaction.atomic():
+                StudentFee.objects.bulk_create(chunk)
+            return len(chunk)
+        except IntegrityError:
+            # A concurrent run added some of these installments after
+            # ``existing`` was read and the unique constraint caught it;
+            # insert the others.
+            fresh = _installments(fee_structures)
+            if fresh <= existing:
+                raise
+            existing |= fresh
+
+
+def generate_student_fees(
+    fee_structures, discounts=None, chunk_size=INVOICE_CHUNK_SIZE, progress=None
+):
+    """
+    Create the ``StudentFee`` installments of ``fee_structures`` for every
+    student enrolled in a section of the structure's class and academic year.
+
+    Each structure's frequency is expanded into due dates from the start of
+    its academic year. ``discounts`` maps student ids to a ``Discount``
+    applied to all their installments; the net amount is worked out once per
+    structure and discount rather than per row. Installments that already
+    exist are skipped, so a re-run only fills gaps, and rows are written with
+    ``bulk_create`` in chunks. ``progress(done, total)`` is called after each
+    chunk.
+    """
+    fee_structures = list(fee_structures)
+    discounts = discounts or {}
+    years = academic_years()
+    year_names = {
+        normalise_academic_year(structure.academic_year) for structure in fee_structures
+    }
+    missing = year_names - set(years)
+    if missing:
+        raise FeeModuleError(
+            f"No academic year named {', '.join(sorted(missing))} to invoice."
+        )
+
+    enrolled = defaultdict(set)
+    for student_id, class_id, year_id in (
+        Section.students.through.objects.filter(
+            section__class_name_id__in={s.class_name_id for s in fee_structures},
+            section__academic_year_id__in={years[name][0] for name in year_names},
+        )
+        .order_by()
+        .values_list("user_id", "section__class_name_id", "section__academic_year_id")
+    ):
+        enrolled[class_id, year_id].add(student_id)
+
+    existing = _installments(fee_structures)
+
+    plan = []
+    for structure in fee_structures:
+        year_id, start_date = years[normalise_academic_year(structure.academic_year)]
+        students = sorted(enrolled[structure.class_name_id, year_id])
+        dates = due_dates(structure.frequency, start_date)
+        plan.append((structure, students, dates))
+    total = sum(len(students) * len(dates) for _, students, dates in plan)
+
+    def installments():
+        net_amounts = {}
+        for structure, students, dates in plan:
+            for student_id in students:
+                discount = discounts.get(student_id)
+                key = (structure.pk, discount.pk if discount else None)
+                if key not in net_amounts:
+                    net_amounts[key] = discounted_amount(structure.amount, discount)
+                amount = net_amounts[key]
+                for due_date in dates:
+                    yield StudentFee(
+                        student_id=student_id,
+                        fee_structure=structure,
+                        discount=discount,
+                        due_date=due_date,
+                        amount=amount,
+                        status="paid" if not amount else "pending",
+                    )
+
+    created = done = 0
+    chunk = []
+    for fee in installments():
+        done += 1
+        if (fee.student_id, fee.fee_structure_id, fee.due_date) not in existing:
+            chunk.append(fee)
+        if len(chunk) >= chunk_size or done == total:
+            created += _insert(chunk, fee_structures, existing)
+            chunk = []
+            if progress:
+                progress(done, total)
+    if created:
+        invalidate_analytics()
+    return {"created": created, "skipped": total - created, "total": total}
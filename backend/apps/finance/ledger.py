@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from django.db import connection
+
+from .models import Discount, FeeCategory, FeeStructure, Payment, StudentFee
+
+LEDGER_FETCH_SIZE = 2000
+LEDGER_COLUMNS = [
+    "student_id",
+    "date",
+    "kind",
+    "description",
+    "reference",
+    "student_fee_id",
+    "payment_id",
+    "debit",
+    "credit",
+    "balance",
+]
+
+# A discounted fee is charged at the structure's price and the discount is
+# shown as its own credit line; other fees are charged at their own amount.
+_CHARGE = (
+    "CASE WHEN fee.discount_id IS NOT NULL AND structure.amount > fee.amount "
+    "THEN structure.amount ELSE fee.amount END"
+)
+
+_LEDGER_SQL = f"""
+WITH entries AS (
+    SELECT fee.student_id, fee.due_date AS date, 0 AS kind_order,
+           'charge' AS kind, category.name AS description, '' AS reference,
+           fee.id AS student_fee_id, NULL::bigint AS payment_id,
+           {_CHARGE} AS debit, 0 AS credit
+    FROM {StudentFee._meta.db_table} fee
+    JOIN {FeeStructure._meta.db_table} structure ON structure.id = fee.fee_structure_id
+    JOIN {FeeCategory._meta.db_table} category ON category.id = structure.category_id
+    WHERE %(all)s OR fee.student_id = ANY(%(students)s)
+  UNION ALL
+    SELECT fee.student_id, fee.due_date, 1, 'discount', discount.name, '',
+           fee.id, NULL, 0, {_CHARGE} - fee.amount
+    FROM {StudentFee._meta.db_table} fee
+    JOIN {FeeStructure._meta.db_table} structure ON structure.id = fee.fee_structure_id
+    JOIN {Discount._meta.db_table} discount ON discount.id = fee.discount_id
+    WHERE structure.amount > fee.amount
+      AND (%(all)s OR fee.student_id = ANY(%(students)s))
+  UNION ALL
+    SELECT fee.student_id, payment.payment_date, 2, 'payment', category.name,
+           COALESCE(NULLIF(payment.transaction_id, ''), payment.lump_sum_reference),
+           fee.id, payment.id, 0, payment.amount
+    FROM {Payment._meta.db_table} payment
+    JOIN {StudentFee._meta.db_table} fee ON fee.id = payment.student_fee_id
+    JOIN {FeeStructure._meta.db_table} structure ON structure.id = fee.fee_structure_id
+    JOIN {FeeCategory._meta.db_table} category ON category.id = structure.category_id
+    WHERE %(all)s OR fee.student_id = ANY(%(students)s)
+)
+SELECT student_id, date, kind, description, reference, student_fee_id,
+       payment_id, debit, credit,
+       SUM(debit - credit) OVER (
+           PARTITION BY student_id
+           ORDER BY date, kind_order, student_fee_id, payment_id
+           ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+       ) AS balance
+FROM entries
+ORDER BY student_id, date, kind_order, student_fee_id, payment_id
+"""
+
+
+def iter_ledger(student_ids=None, fetch_size=LEDGER_FETCH_SIZE):
+    """
+    Yield ledger rows (tuples in ``LEDGER_COLUMNS`` order) for the given
+    students, or for every student when ``student_ids`` is ``None``.
+
+    Charges, discounts and payments are combined and given a running
+    balance per student by a single window-function query, ordered by date
+    with charges before discounts before payments on the same day. Rows are
+    read through a server-side cursor, so whole-school statements stream in
+    constant memory.
+    """
+    params = {
+        "all": student_ids is None,
+        "students": list(student_ids or []),
+    }
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(_LEDGER_SQL, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+
+
+def student_ledger(student_id):
+    """The ledger of one student with their closing balance."""
+    entries = [
+        dict(zip(LEDGER_COLUMNS[1:], row[1:])) for row in iter_ledger([student_id])
+    ]
+    return {
+        "student": student_id,
+        "balance": entries[-1]["balance"] if entries else Decimal("0.00"),
+        "entries": entries,
+    }
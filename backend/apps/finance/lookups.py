@@ -0,0 +1,157 @@
+import re
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import connection
+
+from apps.core.caching import VersionedCache
+
+from .models import Discount, FeeStructure
+
+LOOKUP_TIMEOUT = 60 * 60
+LOCAL_CACHE_SIZE = 128
+# Other processes learn about a bumped version through the shared cache; the
+# local copy of the version is trusted for this long before re-reading it.
+LOCAL_VERSION_TTL = 5
+
+STRUCTURE_FIELDS = [
+    "id",
+    "category_id",
+    "class_name_id",
+    "amount",
+    "frequency",
+    "academic_year",
+    "created_at",
+    "updated_at",
+]
+DISCOUNT_FIELDS = [
+    "id",
+    "name",
+    "description",
+    "discount_type",
+    "value",
+    "created_at",
+    "updated_at",
+]
+
+_ACADEMIC_YEAR = re.compile(r"^\s*(\d{4})\s*[-/]\s*(\d{2}|\d{4})\s*$")
+
+
+class LocalLRU:
+    """A small thread-safe least-recently-used map for this process."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+_local = LocalLRU(LOCAL_CACHE_SIZE)
+_versions = VersionedCache("finance:lookups", local_ttl=LOCAL_VERSION_TTL)
+
+
+def normalise_academic_year(value):
+    """``"2024-25"``, ``"2024/2025"`` and ``" 2024 - 2025 "`` -> ``"2024-2025"``."""
+    match = _ACADEMIC_YEAR.match(value or "")
+    if not match:
+        return (value or "").strip()
+    start, end = match.groups()
+    if len(end) == 2:
+        end = start[:2] + end
+    return f"{start}-{end}"
+
+
+def invalidate_fee_lookups():
+    """Drop the cached fee structures and discounts of the active tenant."""
+    _versions.invalidate()
+
+
+def clear_local_fee_lookups():
+    """Forget everything cached in this process (the shared tier is kept)."""
+    _local.clear()
+    _versions.clear_local()
+
+
+def _table(kind, load):
+    key = _versions.key(kind)
+    table = _local.get(key)
+    if table is None:
+        table = cache.get(key)
+        if table is None:
+            table = load()
+            cache.set(key, table, LOOKUP_TIMEOUT)
+        _local.set(key, table)
+    return table
+
+
+def _load_structures():
+    rows = {
+        row[0]: row
+        for row in FeeStructure.objects.order_by().values_list(*STRUCTURE_FIELDS)
+    }
+    keys = {
+        (row[1], row[2], normalise_academic_year(row[5])): pk
+        for pk, row in rows.items()
+    }
+    return {"rows": rows, "keys": keys}
+
+
+def _load_discounts():
+    return {
+        row[0]: row for row in Discount.objects.order_by().values_list(*DISCOUNT_FIELDS)
+    }
+
+
+def _structure(row):
+    return FeeStructure.from_db(connection.alias, STRUCTURE_FIELDS, row)
+
+
+def fee_structures(ids=None):
+    """
+    ``{pk: FeeStructure}`` for ``ids`` (or every structure) of the active
+    tenant, served from a two-tier cache: an in-process LRU in front of the
+    shared Django cache, both keyed by a per-tenant version that the finance
+    signals bump on every save or delete. Unknown ids are left out; each
+    call returns fresh instances.
+    """
+    rows = _table("structures", _load_structures)["rows"]
+    wanted = rows if ids is None else (pk for pk in ids if pk in rows)
+    return {pk: _structure(rows[pk]) for pk in wanted}
+
+
+def find_fee_structure(category_id, class_name_id, academic_year):
+    """The structure of a category, class and academic year, or ``None``."""
+    table = _table("structures", _load_structures)
+    pk = table["keys"].get(
+        (category_id, class_name_id, normalise_academic_year(academic_year))
+    )
+    return _structure(table["rows"][pk]) if pk is not None else None
+
+
+def discounts(ids=None):
+    """``{pk: Discount}`` for ``ids`` (or every discount), cached like structures."""
+    rows = _table("discounts", _load_discounts)
+    wanted = rows if ids is None else (pk for pk in ids if pk in rows)
+    return {
+        pk: Discount.from_db(connection.alias, DISCOUNT_FIELDS, rows[pk])
+        for pk in wanted
+    }
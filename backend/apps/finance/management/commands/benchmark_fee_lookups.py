@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_tenants.utils import schema_context
+
+from apps.finance import lookups
+from apps.finance.models import Discount, FeeStructure
+
+
+class Command(BaseCommand):
+    help = (
+        "Time repeated fee structure and discount lookups in a tenant, straight "
+        "from the database and through the two-tier lookup cache, and report "
+        "how many queries each variant issued."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--schema", required=True, help="Tenant schema to use")
+        parser.add_argument("--lookups", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = options["lookups"]
+        with schema_context(options["schema"]):
+            structures = list(
+                FeeStructure.objects.values_list(
+                    "category_id", "class_name_id", "academic_year"
+                )
+            )
+            discount_ids = list(Discount.objects.values_list("pk", flat=True))
+            if not structures:
+                raise CommandError("The tenant has no fee structures to look up.")
+
+            def pick(items, index):
+                return items[index % len(items)]
+
+            lookups.invalidate_fee_lookups()
+            lookups.clear_local_fee_lookups()
+            cases = [
+                (
+                    "structure (database)",
+                    lambda i: FeeStructure.objects.get(
+                        category_id=pick(structures, i)[0],
+                        class_name_id=pick(structures, i)[1],
+                        academic_year=pick(structures, i)[2],
+                    ),
+                ),
+                (
+                    "structure (cached)",
+                    lambda i: lookups.find_fee_structure(*pick(structures, i)),
+                ),
+            ]
+            if discount_ids:
+                cases += [
+                    (
+                        "discount (database)",
+                        lambda i: Discount.objects.get(pk=pick(discount_ids, i)),
+                    ),
+                    (
+                        "discount (cached)",
+                        lambda i: lookups.discounts([pick(discount_ids, i)]),
+                    ),
+                ]
+            for name, lookup in cases:
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for index in range(count):
+                        lookup(index)
+                    elapsed = time.perf_counter() - started
+                statements = [
+                    query
+                    for query in queries.captured_queries
+                    if not query["sql"].upper().startswith("SET ")
+                ]
+                self.stdout.write(
+                    f"{name:<22} {count} lookups in {elapsed * 1000:9.2f}ms "
+                    f"({elapsed * 1e6 / count:8.2f}us each), "
+                    f"queries={len(statements)}"
+                )
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0002_feecategory_type_optional"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="studentfee",
+            index=models.Index(
+                fields=["student", "status", "due_date"],
+                name="studentfee_student_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="studentfee",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "partial"])),
+                fields=["due_date"],
+                name="studentfee_open_due_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:29
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_installments(apps, schema_editor):
+    """
+    Earlier invoicing runs could create the same installment twice. Keep the
+    first row of each ``(student, fee_structure, due_date)``, move the
+    payments of the others onto it, add up what was paid and re-derive its
+    status, then delete the duplicates so the constraint can be added.
+    """
+    StudentFee = apps.get_model("finance", "StudentFee")
+    Payment = apps.get_model("finance", "Payment")
+    duplicated = (
+        StudentFee.objects.values("student_id", "fee_structure_id", "due_date")
+        .annotate(count=Count("id"), first=Min("id"))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    for row in duplicated.iterator():
+        group = StudentFee.objects.filter(
+            student_id=row["student_id"],
+            fee_structure_id=row["fee_structure_id"],
+            due_date=row["due_date"],
+        )
+        others = group.exclude(pk=row["first"])
+        Payment.objects.filter(student_fee__in=others).update(
+            student_fee_id=row["first"]
+        )
+        fee = StudentFee.objects.get(pk=row["first"])
+        fee.paid_amount = group.aggregate(total=Sum("paid_amount"))["total"]
+        if fee.paid_amount >= fee.amount:
+            fee.status = "paid"
+        elif fee.status != "overdue":
+            fee.status = "partial" if fee.paid_amount > 0 else "pending"
+        fee.save(update_fields=["paid_amount", "status", "updated_at"])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0003_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_installments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="studentfee",
+            constraint=models.UniqueConstraint(
+                fields=("student", "fee_structure", "due_date"),
+                name="studentfee_unique_installment",
+            ),
+        ),
+    ]
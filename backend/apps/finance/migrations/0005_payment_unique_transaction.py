@@ -0,0 +1,58 @@
+# Generated by Django 4.2.17 on 2026-10-18 03:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_transaction_ids(apps, schema_editor):
+    """
+    Payments sharing a transaction id were posted twice, and each posting
+    was added to its fee's ``paid_amount``. Which copy is genuine has to be
+    decided by someone who can check the bank statement, so refuse to add
+    the constraint until the duplicates have been resolved.
+    """
+    Payment = apps.get_model("finance", "Payment")
+    duplicated = list(
+        Payment.objects.exclude(transaction_id="")
+        .values("transaction_id")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by("transaction_id")
+        .values_list("transaction_id", flat=True)
+    )
+    if duplicated:
+        raise RuntimeError(
+            f"Schema {schema_editor.connection.schema_name}: payments share the "
+            f"transaction ids {', '.join(duplicated)}. Reverse the duplicate "
+            "postings (and their fees' paid_amount) before migrating."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finance", "0004_studentfee_unique_installment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payment",
+            name="lump_sum_reference",
+            field=models.CharField(
+                blank=True,
+                help_text="Transaction id of the lump sum an allocated payment was split from; only the first split also carries it as transaction_id",
+                max_length=100,
+            ),
+        ),
+        migrations.RunPython(
+            check_duplicate_transaction_ids, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("transaction_id", ""), _negated=True),
+                fields=("transaction_id",),
+                name="payment_unique_transaction",
+            ),
+        ),
+    ]
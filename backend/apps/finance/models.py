@@ -1,4 +1,6 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from apps.accounts.models import User
 from apps.academic.models import Class, Section
@@ -113,6 +115,28 @@ class StudentFee(models.Model):
     def balance(self):
         return self.amount - self.paid_amount
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["student", "status", "due_date"],
+                name="studentfee_student_status_idx",
+            ),
+            # Only unpaid fees can fall overdue; paid rows are most of the table.
+            models.Index(
+                fields=["due_date"],
+                condition=models.Q(status__in=["pending", "partial"]),
+                name="studentfee_open_due_idx",
+            ),
+        ]
+        constraints = [
+            # One installment per student, structure and due date; lets the
+            # invoicing run be repeated without duplicating fees.
+            models.UniqueConstraint(
+                fields=["student", "fee_structure", "due_date"],
+                name="studentfee_unique_installment",
+            ),
+        ]
+
 
 class Payment(models.Model):
     PAYMENT_METHOD_CHOICES = [
@@ -131,24 +155,55 @@ class Payment(models.Model):
     )
     payment_method = models.CharField(max_length=20, choices=PAYMENT_METHOD_CHOICES)
     transaction_id = models.CharField(max_length=100, blank=True)
+    lump_sum_reference = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text=(
+            "Transaction id of the lump sum an allocated payment was split "
+            "from; only the first split also carries it as transaction_id"
+        ),
+    )
     payment_date = models.DateField()
     remarks = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            # A bank or gateway reference is posted once, whichever path
+            # (batch, settlement, allocation, single entry) posts it; its
+            # index also serves the duplicate checks. Cash payments have none.
+            models.UniqueConstraint(
+                fields=["transaction_id"],
+                condition=~models.Q(transaction_id=""),
+                name="payment_unique_transaction",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.student_fee.student.get_full_name()} - {self.amount}"
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update StudentFee paid amount and status
-        student_fee = self.student_fee
-        total_paid = (
-            student_fee.payments.aggregate(models.Sum("amount"))["amount__sum"] or 0
-        )
-        student_fee.paid_amount = total_paid
-        if total_paid >= student_fee.amount:
-            student_fee.status = "paid"
-        elif total_paid > 0:
-            student_fee.status = "partial"
-        student_fee.save()
+        # Post only the change in amount to the fee; the UPDATE adds it to the
+        # stored total in the database, so concurrent payments cannot
+        # overwrite each other and no SUM over past payments is needed.
+        from .payments import apply_fee_payments
+
+        with transaction.atomic():
+            increments = defaultdict(Decimal)
+            if self.pk is not None:
+                previous = (
+                    Payment.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("student_fee_id", "amount")
+                    .first()
+                )
+                if previous:
+                    increments[previous[0]] -= previous[1]
+            super().save(*args, **kwargs)
+            increments[self.student_fee_id] += Decimal(self.amount)
+            apply_fee_payments(increments)
+        if Payment.student_fee.is_cached(self):
+            self.student_fee.refresh_from_db(
+                fields=["paid_amount", "status", "updated_at"]
+            )
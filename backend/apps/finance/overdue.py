@@ -0,0 +1,72 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from apps.communication.models import Notification
+from apps.communication.pubsub import push_notifications
+
+from .models import StudentFee
+
+NOTIFICATION_BATCH_SIZE = 1000
+
+
+def mark_overdue_fees(today=None):
+    """
+    Flip pending and partially paid fees whose due date has passed to
+    ``overdue`` and notify the student and their parent.
+
+    Every open fee due before ``today`` is considered, not only those that
+    fell due since the last run, so fees created back-dated and fees
+    reopened by a reversed payment are caught too. Flipped fees leave the
+    partial ``studentfee_open_due_idx`` index, which therefore only holds
+    the fees a sweep still has to look at. The fees are locked and flipped
+    with a single ``UPDATE`` (a concurrent sweep waits on the row locks and
+    then skips them) and the notifications are written with
+    ``bulk_create``. Returns the number of fees marked overdue.
+    """
+    today = today or timezone.localdate()
+    with transaction.atomic():
+        due = StudentFee.objects.filter(
+            status__in=["pending", "partial"], due_date__lt=today
+        )
+        fees = list(
+            due.select_for_update(of=("self",))
+            .order_by("pk")
+            .values_list(
+                "pk",
+                "student_id",
+                "student__student_profile__parent_id",
+                "fee_structure__category__name",
+                "amount",
+                "paid_amount",
+                "due_date",
+            )
+        )
+        if fees:
+            StudentFee.objects.filter(pk__in=[fee[0] for fee in fees]).update(
+                status="overdue", updated_at=timezone.now()
+            )
+            push_notifications(
+                Notification.objects.bulk_create(
+                    _notifications(fees), batch_size=NOTIFICATION_BATCH_SIZE
+                )
+            )
+    return len(fees)
+
+
+def _notifications(fees):
+    content_type = ContentType.objects.get_for_model(StudentFee)
+    for pk, student_id, parent_id, category, amount, paid, due_date in fees:
+        message = (
+            f"{category} of {amount - paid} was due on {due_date:%d %b %Y} "
+            f"and is now overdue."
+        )
+        for recipient_id in filter(None, (student_id, parent_id)):
+            yield Notification(
+                title="Fee overdue",
+                message=message,
+                notification_type="fee",
+                recipient_id=recipient_id,
+                content_type=content_type,
+                object_id=pk,
+            )
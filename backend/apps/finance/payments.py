@@ -0,0 +1,161 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.lookups import GreaterThan, LessThanOrEqual
+from django.utils import timezone
+from rest_framework import serializers
+
+from .analytics import invalidate_analytics
+from .models import Payment, StudentFee
+
+FEE_UPDATE_CHUNK_SIZE = 500
+
+
+def _money(value):
+    return Value(value, output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def apply_fee_payments(increments):
+    """
+    Add ``{student_fee_id: amount}`` to the fees' ``paid_amount`` and re-derive
+    their status, in one ``UPDATE`` per chunk of fees.
+
+    The new total is computed by the database from the current row
+    (``paid_amount + amount``), so concurrent postings serialise on the row
+    lock the ``UPDATE`` takes instead of overwriting each other, and no
+    ``SUM`` over the fee's payments is needed. Negative amounts reverse a
+    payment. A fee that is paid in full becomes ``paid``; an ``overdue`` fee
+    stays overdue until then; otherwise it is ``partial`` or ``pending``.
+    """
+    increments = {pk: amount for pk, amount in increments.items() if amount}
+    fee_ids = sorted(increments)
+    for start in range(0, len(fee_ids), FEE_UPDATE_CHUNK_SIZE):
+        chunk = fee_ids[start : start + FEE_UPDATE_CHUNK_SIZE]
+        increment = Case(
+            *(When(pk=pk, then=_money(increments[pk])) for pk in chunk),
+            default=_money(Decimal("0")),
+        )
+        paid = F("paid_amount") + increment
+        StudentFee.objects.filter(pk__in=chunk).update(
+            paid_amount=paid,
+            status=Case(
+                When(LessThanOrEqual(F("amount"), paid), then=Value("paid")),
+                When(status="overdue", then=Value("overdue")),
+                When(GreaterThan(paid, _money(Decimal("0"))), then=Value("partial")),
+                default=Value("pending"),
+            ),
+            updated_at=timezone.now(),
+        )
+
+
+class PaymentRowSerializer(serializers.Serializer):
+    """Shape-only validation for one row of a payment batch."""
+
+    student_fee_id = serializers.IntegerField(min_value=1)
+    amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0.01")
+    )
+    payment_method = serializers.ChoiceField(choices=Payment.PAYMENT_METHOD_CHOICES)
+    transaction_id = serializers.CharField(
+        max_length=100, allow_blank=True, required=False, default=""
+    )
+    payment_date = serializers.DateField()
+    remarks = serializers.CharField(allow_blank=True, required=False, default="")
+
+
+def post_payments(rows):
+    """
+    Post a batch of payments (e.g. a bank file) in one transaction.
+
+    Rows are validated in memory; unknown fees and transaction ids that were
+    already posted, or repeat within the batch, are reported per row. The
+    affected fees are locked in primary-key order, so concurrent batches
+    cannot deadlock, the payments are inserted with one ``bulk_create`` and
+    the fees are updated through ``apply_fee_payments``. Transaction ids are
+    unique in the database: if a concurrent batch posts one of them first,
+    the insert is retried without the rows it took.
+    """
+    row_serializer = PaymentRowSerializer()
+    results = []
+    parsed = []
+    for index, row in enumerate(rows):
+        results.append(None)
+        try:
+            parsed.append((index, row_serializer.run_validation(row)))
+        except serializers.ValidationError as exc:
+            results[index] = {"index": index, "status": "error", "errors": exc.detail}
+
+    transaction_ids = {data["transaction_id"] for _, data in parsed} - {""}
+    with transaction.atomic():
+        known_fees = set(
+            StudentFee.objects.select_for_update()
+            .filter(pk__in={data["student_fee_id"] for _, data in parsed})
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        posted = _posted(transaction_ids)
+        while True:
+            payments, increments = _accept(parsed, known_fees, posted, results)
+            try:
+                # bulk_create skips Payment.save(), so the fees are updated
+                # once below.
+                with transaction.atomic():
+                    Payment.objects.bulk_create(payments)
+                break
+            except IntegrityError:
+                # A concurrent batch committed some of these transaction ids
+                # after they were read and the unique constraint caught it;
+                # report those rows and insert the others.
+                fresh = _posted(transaction_ids)
+                if fresh <= posted:
+                    raise
+                posted = fresh
+        apply_fee_payments(increments)
+    if payments:
+        invalidate_analytics()
+
+    for payment, result in zip(
+        payments, (result for result in results if result["status"] == "created")
+    ):
+        result["id"] = payment.pk
+    return {
+        "created": len(payments),
+        "failed": len(results) - len(payments),
+        "results": results,
+    }
+
+
+def _posted(transaction_ids):
+    return set(
+        Payment.objects.filter(transaction_id__in=transaction_ids)
+        .order_by()
+        .values_list("transaction_id", flat=True)
+    )
+
+
+def _accept(parsed, known_fees, posted, results):
+    """
+    Check the parsed rows against the locked fees and the transaction ids
+    already ``posted``, fill in ``results`` and return the payments to
+    insert with their ``{student_fee_id: amount}`` increments.
+    """
+    seen = set(posted)
+    payments = []
+    increments = defaultdict(Decimal)
+    for index, data in parsed:
+        errors = {}
+        if data["student_fee_id"] not in known_fees:
+            errors["student_fee_id"] = ["Invalid student fee."]
+        if data["transaction_id"] in seen:
+            errors["transaction_id"] = ["This transaction has already been posted."]
+        if errors:
+            results[index] = {"index": index, "status": "error", "errors": errors}
+            continue
+        if data["transaction_id"]:
+            seen.add(data["transaction_id"])
+        payments.append(Payment(**data))
+        increments[data["student_fee_id"]] += data["amount"]
+        results[index] = {"index": index, "status": "created"}
+    return payments, increments
@@ -0,0 +1,169 @@
+import csv
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from .models import Payment, StudentFee
+from .payments import post_payments
+
+SETTLEMENT_CHUNK_SIZE = 2000
+FEE_REFERENCE_PREFIX = "FEE-"
+MISMATCH_HEADER = ["line", "transaction_id", "amount", "reference", "reason"]
+
+
+class OpenFeeIndex:
+    """
+    In-memory index of the outstanding balances of every open fee.
+
+    A settlement line's reference is either ``FEE-<id>`` for a specific fee
+    or the student's admission number, in which case the payment goes to
+    their oldest open fee with enough balance left. Balances are drawn down
+    as lines are matched, so later lines see what earlier ones left.
+    """
+
+    def __init__(self):
+        self.balances = {}
+        self.by_admission = defaultdict(list)
+        rows = (
+            StudentFee.objects.filter(status__in=["pending", "partial", "overdue"])
+            .order_by("due_date", "pk")
+            .values_list(
+                "pk",
+                "amount",
+                "paid_amount",
+                "student__student_profile__admission_number",
+            )
+        )
+        for pk, amount, paid, admission_number in rows.iterator(chunk_size=5000):
+            self.balances[pk] = amount - paid
+            if admission_number:
+                self.by_admission[admission_number.upper()].append(pk)
+
+    def match(self, reference, amount):
+        """Return ``(fee_id, None)`` or ``(None, reason)``."""
+        reference = reference.strip().upper()
+        if reference.startswith(FEE_REFERENCE_PREFIX):
+            try:
+                candidates = [int(reference[len(FEE_REFERENCE_PREFIX) :])]
+            except ValueError:
+                return None, "Malformed fee reference."
+            if candidates[0] not in self.balances:
+                return None, "No open fee with this reference."
+        else:
+            candidates = self.by_admission.get(reference)
+            if not candidates:
+                return None, "No open fees for this admission number."
+        for fee_id in candidates:
+            if self.balances[fee_id] >= amount:
+                self.balances[fee_id] -= amount
+                return fee_id, None
+        return None, "Amount exceeds the open balance."
+
+
+def _normalise(row):
+    return {
+        (key or "").strip().lower(): (value or "").strip() for key, value in row.items()
+    }
+
+
+def _report_mismatch(writer, line, row, reason):
+    writer.writerow(
+        [
+            line,
+            row.get("transaction_id", ""),
+            row.get("amount", ""),
+            row.get("reference", ""),
+            reason,
+        ]
+    )
+
+
+def reconcile_settlement(rows, report, chunk_size=SETTLEMENT_CHUNK_SIZE, progress=None):
+    """
+    Match settlement lines against open fees and post the matches.
+
+    ``rows`` is any iterator of dicts with ``transaction_id``, ``amount``,
+    ``payment_date``, ``reference`` and optionally ``payment_method``
+    columns, typically a ``csv.DictReader`` over the uploaded file, and is
+    consumed ``chunk_size`` lines at a time. Open fees are indexed once up
+    front; each chunk costs one lookup of already posted transaction ids
+    plus one ``post_payments`` batch, independent of its length. Lines that
+    cannot be posted are written to ``report`` as CSV with the reason.
+    ``progress(lines)`` is called after each chunk.
+    """
+    index = OpenFeeIndex()
+    writer = csv.writer(report)
+    writer.writerow(MISMATCH_HEADER)
+    seen = set()
+    totals = {"lines": 0, "matched": 0, "unmatched": 0, "posted_amount": Decimal("0")}
+    rows = iter(rows)
+    line = 1  # the header
+    while True:
+        chunk = [_normalise(row) for row in islice(rows, chunk_size)]
+        if not chunk:
+            break
+        already_posted = set(
+            Payment.objects.filter(
+                transaction_id__in={row.get("transaction_id", "") for row in chunk}
+                - {""}
+            )
+            .order_by()
+            .values_list("transaction_id", flat=True)
+        )
+        matched, matched_lines = [], []
+        for row in chunk:
+            line += 1
+            transaction_id = row.get("transaction_id", "")
+            reason = None
+            try:
+                amount = Decimal(row.get("amount", ""))
+                if not amount.is_finite() or amount <= 0:
+                    raise InvalidOperation
+            except InvalidOperation:
+                reason = "Invalid amount."
+            if reason is None:
+                if not transaction_id:
+                    reason = "Missing transaction id."
+                elif transaction_id in already_posted:
+                    reason = "Transaction already posted."
+                elif transaction_id in seen:
+                    reason = "Transaction repeated in this file."
+            if reason is None:
+                fee_id, reason = index.match(row.get("reference", ""), amount)
+            if reason is not None:
+                _report_mismatch(writer, line, row, reason)
+                totals["unmatched"] += 1
+                continue
+            seen.add(transaction_id)
+            matched_lines.append((line, row))
+            matched.append(
+                {
+                    "student_fee_id": fee_id,
+                    "amount": amount,
+                    "payment_method": row.get("payment_method", "").lower()
+                    or "bank_transfer",
+                    "transaction_id": transaction_id,
+                    "payment_date": row.get("payment_date", ""),
+                    "remarks": "Settlement reconciliation",
+                }
+            )
+
+        outcome = post_payments(matched)
+        for (line_number, row), posted, result in zip(
+            matched_lines, matched, outcome["results"]
+        ):
+            if result["status"] == "created":
+                totals["matched"] += 1
+                totals["posted_amount"] += posted["amount"]
+                continue
+            index.balances[posted["student_fee_id"]] += posted["amount"]
+            reason = "; ".join(
+                f"{field}: {' '.join(str(error) for error in errors)}"
+                for field, errors in result["errors"].items()
+            )
+            _report_mismatch(writer, line_number, row, reason)
+            totals["unmatched"] += 1
+        totals["lines"] += len(chunk)
+        if progress:
+            progress(totals["lines"])
+    return totals
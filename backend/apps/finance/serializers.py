@@ -1,4 +1,9 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
 from rest_framework import serializers
+from . import lookups
+from .invoicing import academic_years
 from .models import FeeCategory, FeeStructure, Discount, StudentFee, Payment
 
 
@@ -17,6 +22,58 @@ class FeeStructureSerializer(serializers.ModelSerializer):
             'academic_year', 'created_at', 'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+        # validate() checks uniqueness against the cached lookup instead,
+        # which also treats "2024-25" and "2024-2025" as the same year.
+        validators = []
+
+    def validate(self, attrs):
+        instance = self.instance
+        existing = lookups.find_fee_structure(
+            attrs['category'].pk if 'category' in attrs else instance.category_id,
+            attrs['class_name'].pk if 'class_name' in attrs else instance.class_name_id,
+            attrs.get('academic_year', getattr(instance, 'academic_year', '')),
+        )
+        if existing is not None and (instance is None or existing.pk != instance.pk):
+            raise serializers.ValidationError(
+                'The fields category, class_name, academic_year must make a '
+                'unique set.'
+            )
+        return attrs
+
+
+class StudentDiscountSerializer(serializers.Serializer):
+    student = serializers.IntegerField(min_value=1)
+    discount = serializers.IntegerField(min_value=1)
+
+
+class InvoiceRunSerializer(serializers.Serializer):
+    fee_structures = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+    discounts = StudentDiscountSerializer(many=True, required=False, default=list)
+
+    def validate_fee_structures(self, value):
+        found = lookups.fee_structures(value)
+        unknown = sorted(set(value) - set(found))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown fee structures: {unknown}")
+        years = {
+            lookups.normalise_academic_year(structure.academic_year)
+            for structure in found.values()
+        }
+        missing = years - set(academic_years())
+        if missing:
+            raise serializers.ValidationError(
+                f"No academic year named: {', '.join(sorted(missing))}"
+            )
+        return sorted(found)
+
+    def validate_discounts(self, value):
+        ids = {entry['discount'] for entry in value}
+        unknown = ids - set(lookups.discounts(ids))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown discounts: {sorted(unknown)}")
+        return {entry['student']: entry['discount'] for entry in value}
 
 
 class FeeDiscountSerializer(serializers.ModelSerializer):
@@ -38,3 +95,49 @@ class PaymentSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['created_at', 'updated_at']
+
+
+class FinanceAnalyticsQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('date_to', timezone.localdate())
+        attrs.setdefault('date_from', attrs['date_to'] - timedelta(days=364))
+        if attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError(
+                {'date_from': ['Must not be after date_to.']}
+            )
+        return attrs
+
+
+class ReceiptArchiveSerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError(
+                {'date_from': ['Must not be after date_to.']}
+            )
+        return attrs
+
+
+class PaymentAllocationSerializer(serializers.Serializer):
+    student = serializers.IntegerField(min_value=1)
+    amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal('0.01')
+    )
+    payment_method = serializers.ChoiceField(choices=Payment.PAYMENT_METHOD_CHOICES)
+    payment_date = serializers.DateField()
+    transaction_id = serializers.CharField(
+        max_length=100, allow_blank=True, required=False, default=''
+    )
+    remarks = serializers.CharField(allow_blank=True, required=False, default='')
+    # Category types to settle first, e.g. ["tuition", "transport"]; empty
+    # means oldest fee first.
+    priority = serializers.ListField(
+        child=serializers.ChoiceField(choices=FeeCategory.CATEGORY_CHOICES),
+        required=False,
+        default=list,
+    )
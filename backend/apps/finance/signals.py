@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .analytics import invalidate_analytics
+from .lookups import invalidate_fee_lookups
+from .models import Discount, FeeStructure, Payment, StudentFee
+from .payments import apply_fee_payments
+
+
+@receiver(post_delete, sender=Payment)
+def reverse_deleted_payment(sender, instance, **kwargs):
+    """Take a deleted payment back off its fee's paid amount."""
+    apply_fee_payments({instance.student_fee_id: -instance.amount})
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+@receiver(post_save, sender=StudentFee)
+@receiver(post_delete, sender=StudentFee)
+def invalidate_analytics_on_change(sender, **kwargs):
+    """Collections and outstanding balances move with payments and fees."""
+    invalidate_analytics()
+
+
+@receiver(post_save, sender=FeeStructure)
+@receiver(post_delete, sender=FeeStructure)
+@receiver(post_save, sender=Discount)
+@receiver(post_delete, sender=Discount)
+def invalidate_fee_lookups_on_change(sender, **kwargs):
+    invalidate_fee_lookups()
@@ -0,0 +1,132 @@
+import csv
+import io
+import tempfile
+from datetime import date
+from celery import shared_task
+from django.core.files import File
+from django.core.files.storage import storages
+from django.utils import timezone
+from django_tenants.utils import schema_context
+from apps.core.tenants import tenant_schema_names
+from . import lookups
+from .invoicing import generate_student_fees
+from .overdue import mark_overdue_fees
+from .receipts import (
+    fee_receipt,
+    fee_receipt_queryset,
+    payment_receipt,
+    receipt_queryset,
+    store_receipt,
+    write_receipts_zip,
+)
+from .reconciliation import reconcile_settlement
+
+
+@shared_task(bind=True)
+def generate_fee_invoices(self, schema_name, fee_structure_ids, discounts=None):
+    """
+    Generate the installments of the given fee structures in a school.
+
+    ``discounts`` maps student ids to discount ids. Progress is published as
+    ``{"done", "total"}`` while the job runs.
+    """
+
+    def report(done, total):
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta={"done": done, "total": total})
+
+    with schema_context(schema_name):
+        discount_objects = lookups.discounts(set((discounts or {}).values()))
+        return generate_student_fees(
+            lookups.fee_structures(sorted(set(fee_structure_ids))).values(),
+            discounts={
+                int(student_id): discount_objects[discount_id]
+                for student_id, discount_id in (discounts or {}).items()
+                if discount_id in discount_objects
+            },
+            progress=report,
+        )
+
+
+@shared_task
+def mark_all_overdue_fees():
+    """Periodic entry point: queue one overdue sweep per school."""
+    for schema_name in tenant_schema_names():
+        mark_school_overdue_fees.delay(schema_name)
+
+
+@shared_task
+def mark_school_overdue_fees(schema_name):
+    with schema_context(schema_name):
+        return mark_overdue_fees()
+
+
+@shared_task(bind=True)
+def reconcile_settlement_file(self, schema_name, path):
+    """
+    Reconcile a settlement CSV stored at ``path`` in private storage, post
+    the matched payments and store the mismatch report next to it; the
+    report is downloaded from ``/api/core/tasks/<task_id>/file/``.
+    """
+
+    def report_progress(lines):
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta={"lines": lines})
+
+    storage = storages["private"]
+    with storage.open(path, "rb") as upload, tempfile.TemporaryFile(
+        "w+", newline=""
+    ) as report:
+        rows = csv.DictReader(io.TextIOWrapper(upload, encoding="utf-8-sig"))
+        with schema_context(schema_name):
+            totals = reconcile_settlement(rows, report, progress=report_progress)
+        report.seek(0)
+        report_path = storage.save(
+            f"reconciliation/{schema_name}/mismatches-"
+            f"{timezone.now():%Y%m%d%H%M%S}.csv",
+            File(report),
+        )
+    return {
+        **totals,
+        "posted_amount": str(totals["posted_amount"]),
+        "path": report_path,
+    }
+
+
+@shared_task
+def render_payment_receipt(schema_name, payment_id):
+    with schema_context(schema_name):
+        path = store_receipt(payment_receipt(receipt_queryset().get(pk=payment_id)))
+    return {"path": path}
+
+
+@shared_task
+def render_fee_receipt(schema_name, student_fee_id):
+    with schema_context(schema_name):
+        path = store_receipt(fee_receipt(fee_receipt_queryset().get(pk=student_fee_id)))
+    return {"path": path}
+
+
+@shared_task(bind=True)
+def build_receipts_archive(self, schema_name, date_from, date_to):
+    """Zip the receipts of every payment in a date range into private storage."""
+
+    def report_progress(receipts):
+        if self.request.id:
+            self.update_state(state="PROGRESS", meta={"receipts": receipts})
+
+    with tempfile.TemporaryFile() as output:
+        with schema_context(schema_name):
+            count = write_receipts_zip(
+                output,
+                date.fromisoformat(date_from),
+                date.fromisoformat(date_to),
+                progress=report_progress,
+            )
+        output.seek(0)
+        path = storages["private"].save(
+            f"receipts/{schema_name}/archives/receipts-{date_from}-{date_to}-"
+            f"{timezone.now():%Y%m%d%H%M%S}.zip",
+            File(output),
+        )
+    return {"path": path, "receipts": count}
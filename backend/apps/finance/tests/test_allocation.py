@@ -0,0 +1,189 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from rest_framework import serializers, status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import Class
+from apps.accounts.models import User
+from apps.finance.allocation import allocate, allocate_payment
+from apps.finance.models import FeeCategory, FeeStructure, Payment, StudentFee
+from apps.finance.payments import post_payments
+from apps.finance.views import PaymentViewSet
+
+
+@pytest.fixture
+def fees(tenant):
+    grade = Class.objects.create(name="Grade 5")
+    student = User.objects.create_user(username="student", role="student")
+
+    def fee(category_type, due_date, amount, paid="0.00", status="pending"):
+        structure = FeeStructure.objects.create(
+            category=FeeCategory.objects.create(
+                name=category_type.title(), category_type=category_type
+            ),
+            class_name=grade,
+            amount=Decimal(amount),
+            frequency="monthly",
+            academic_year="2024-2025",
+        )
+        return StudentFee.objects.create(
+            student=student,
+            fee_structure=structure,
+            due_date=due_date,
+            amount=Decimal(amount),
+            paid_amount=Decimal(paid),
+            status=status,
+        )
+
+    return {
+        "student": student,
+        "transport": fee("transport", date(2024, 4, 10), "300.00"),
+        "tuition": fee(
+            "tuition", date(2024, 5, 10), "1000.00", paid="200.00", status="partial"
+        ),
+        "paid": fee(
+            "library", date(2024, 3, 10), "100.00", paid="100.00", status="paid"
+        ),
+    }
+
+
+def balances(*fees):
+    result = []
+    for fee in fees:
+        fee.refresh_from_db()
+        result.append((fee.paid_amount, fee.status))
+    return result
+
+
+@pytest.mark.django_db
+class TestAllocate:
+    FEES = [
+        (1, Decimal("300"), date(2024, 4, 10), "transport"),
+        (2, Decimal("800"), date(2024, 5, 10), "tuition"),
+        (3, Decimal("50"), date(2024, 3, 10), "other"),
+    ]
+
+    def test_oldest_first(self):
+        assert allocate(self.FEES, Decimal("400")) == [
+            (3, Decimal("50")),
+            (1, Decimal("300")),
+            (2, Decimal("50")),
+        ]
+
+    def test_by_category_priority(self):
+        assert allocate(self.FEES, Decimal("900"), ["tuition", "transport"]) == [
+            (2, Decimal("800")),
+            (1, Decimal("100")),
+        ]
+
+
+@pytest.mark.django_db
+class TestAllocatePayment:
+    def test_splits_over_open_fees(self, fees, count_queries):
+        with count_queries() as queries:
+            outcome = allocate_payment(
+                fees["student"].pk,
+                Decimal("500.00"),
+                "upi",
+                date(2024, 6, 1),
+                transaction_id="UPI-1",
+                priority=["tuition"],
+            )
+        assert [a["amount"] for a in outcome["allocations"]] == [Decimal("500.00")]
+        assert balances(fees["tuition"], fees["transport"]) == [
+            (Decimal("700.00"), "partial"),
+            (Decimal("0.00"), "pending"),
+        ]
+        assert len([q for q in queries if q["sql"].startswith("INSERT")]) == 1
+        assert len([q for q in queries if q["sql"].startswith("UPDATE")]) == 1
+
+    def test_oldest_first_settles_whole_fees(self, fees):
+        allocate_payment(
+            fees["student"].pk, Decimal("400.00"), "cash", date(2024, 6, 1)
+        )
+        assert balances(fees["transport"], fees["tuition"], fees["paid"]) == [
+            (Decimal("300.00"), "paid"),
+            (Decimal("300.00"), "partial"),
+            (Decimal("100.00"), "paid"),
+        ]
+        assert Payment.objects.count() == 2
+
+    def test_rejects_overpayment_and_reused_transactions(self, fees):
+        with pytest.raises(serializers.ValidationError):
+            allocate_payment(
+                fees["student"].pk, Decimal("1100.01"), "cash", date(2024, 6, 1)
+            )
+        allocate_payment(
+            fees["student"].pk,
+            Decimal("10.00"),
+            "upi",
+            date(2024, 6, 1),
+            transaction_id="UPI-1",
+        )
+        with pytest.raises(serializers.ValidationError):
+            allocate_payment(
+                fees["student"].pk,
+                Decimal("10.00"),
+                "upi",
+                date(2024, 6, 1),
+                transaction_id="UPI-1",
+            )
+        assert Payment.objects.count() == 1
+
+    def test_splits_share_a_lump_sum_reference(self, fees):
+        allocate_payment(
+            fees["student"].pk,
+            Decimal("400.00"),
+            "upi",
+            date(2024, 6, 1),
+            transaction_id="UPI-2",
+        )
+        assert list(
+            Payment.objects.order_by("pk").values_list(
+                "transaction_id", "lump_sum_reference"
+            )
+        ) == [("UPI-2", "UPI-2"), ("", "UPI-2")]
+        outcome = post_payments(
+            [
+                {
+                    "student_fee_id": fees["tuition"].pk,
+                    "amount": "10.00",
+                    "payment_method": "upi",
+                    "transaction_id": "UPI-2",
+                    "payment_date": "2024-06-02",
+                }
+            ]
+        )
+        assert outcome["failed"] == 1
+
+
+@pytest.mark.django_db
+class TestAllocateView:
+    def call(self, user, data):
+        request = APIRequestFactory().post("/", data, format="json")
+        force_authenticate(request, user=user)
+        return PaymentViewSet.as_view({"post": "allocate"})(request)
+
+    def test_admin_allocates(self, fees):
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        response = self.call(
+            admin,
+            {
+                "student": fees["student"].pk,
+                "amount": "1100.00",
+                "payment_method": "cash",
+                "payment_date": "2024-06-01",
+                "priority": ["tuition"],
+            },
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [a["student_fee_id"] for a in response.data["allocations"]] == [
+            fees["tuition"].pk,
+            fees["transport"].pk,
+        ]
+        response = self.call(admin, {"student": fees["student"].pk, "amount": "1"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_students_cannot_allocate(self, fees):
+        response = self.call(fees["student"], {})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
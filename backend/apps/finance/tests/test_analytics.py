@@ -0,0 +1,151 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import Class
+from apps.accounts.models import User
+from apps.finance.analytics import finance_dashboard
+from apps.finance.models import FeeCategory, FeeStructure, Payment, StudentFee
+from apps.finance.payments import post_payments
+from apps.finance.views import PaymentViewSet
+
+TODAY = date(2024, 9, 30)
+
+
+@pytest.fixture
+def fees(tenant):
+    student = User.objects.create_user(username="student", role="student")
+    grade5 = Class.objects.create(name="Grade 5")
+    grade6 = Class.objects.create(name="Grade 6")
+    tuition = FeeCategory.objects.create(name="Tuition", category_type="tuition")
+    transport = FeeCategory.objects.create(name="Bus", category_type="transport")
+
+    def fee(category, class_name, due_days_ago):
+        structure, _ = FeeStructure.objects.get_or_create(
+            category=category,
+            class_name=class_name,
+            academic_year="2024-2025",
+            defaults={"amount": Decimal("1000.00"), "frequency": "monthly"},
+        )
+        return StudentFee.objects.create(
+            student=student,
+            fee_structure=structure,
+            due_date=TODAY - timedelta(days=due_days_ago),
+            amount=Decimal("1000.00"),
+        )
+
+    return {
+        "tuition5": fee(tuition, grade5, -5),
+        "transport5": fee(transport, grade5, 20),
+        "tuition6": fee(tuition, grade6, 45),
+        "old": fee(tuition, grade6, 120),
+    }
+
+
+def pay(fee, amount, day, method="cash"):
+    return Payment.objects.create(
+        student_fee=fee,
+        amount=Decimal(amount),
+        payment_method=method,
+        payment_date=day,
+    )
+
+
+def dashboard():
+    return finance_dashboard(date(2024, 7, 1), date(2024, 9, 30), today=TODAY)
+
+
+@pytest.mark.django_db
+class TestFinanceDashboard:
+    def test_rollups(self, fees):
+        pay(fees["tuition5"], "100.00", date(2024, 8, 1))
+        pay(fees["tuition5"], "200.00", date(2024, 8, 1), method="upi")
+        pay(fees["transport5"], "300.00", date(2024, 9, 2))
+        pay(fees["tuition6"], "400.00", date(2024, 9, 2), method="upi")
+        pay(fees["tuition6"], "50.00", date(2024, 6, 30))  # before the range
+        data = dashboard()
+        assert data["total_collected"] == Decimal("1000.00")
+        assert data["payment_count"] == 4
+        assert data["by_day"] == [
+            {"date": date(2024, 8, 1), "amount": Decimal("300.00"), "count": 2},
+            {"date": date(2024, 9, 2), "amount": Decimal("700.00"), "count": 2},
+        ]
+        assert [row["month"] for row in data["by_month"]] == ["2024-08", "2024-09"]
+        assert {
+            row["payment_method"]: row["amount"] for row in data["by_payment_method"]
+        } == {"cash": Decimal("400.00"), "upi": Decimal("600.00")}
+        assert {
+            row["category_type"]: row["amount"] for row in data["by_category_type"]
+        } == {"tuition": Decimal("700.00"), "transport": Decimal("300.00")}
+        assert [(row["class_name"], row["amount"]) for row in data["by_class"]] == [
+            ("Grade 5", Decimal("600.00")),
+            ("Grade 6", Decimal("400.00")),
+        ]
+
+    def test_aging_buckets(self, fees):
+        pay(fees["tuition6"], "400.00", date(2024, 9, 2))
+        pay(fees["transport5"], "1000.00", date(2024, 9, 2))
+        outstanding = dashboard()["outstanding"]
+        assert outstanding["total"] == Decimal("2600.00")
+        assert {
+            bucket["bucket"]: (bucket["amount"], bucket["count"])
+            for bucket in outstanding["buckets"]
+        } == {
+            "current": (Decimal("1000.00"), 1),
+            "1-30": (Decimal("0.00"), 0),
+            "31-60": (Decimal("600.00"), 1),
+            "61-90": (Decimal("0.00"), 0),
+            "90+": (Decimal("1000.00"), 1),
+        }
+
+    def test_two_queries_then_cached_until_a_payment_is_written(
+        self, fees, count_queries, django_capture_on_commit_callbacks
+    ):
+        pay(fees["tuition5"], "100.00", date(2024, 8, 1))
+        with count_queries() as queries:
+            first = dashboard()
+        assert len(queries) == 2
+        with count_queries() as queries:
+            assert dashboard() == first
+        assert len(queries) == 0
+
+        with django_capture_on_commit_callbacks(execute=True):
+            pay(fees["tuition5"], "100.00", date(2024, 8, 2))
+        assert dashboard()["total_collected"] == Decimal("200.00")
+        with django_capture_on_commit_callbacks(execute=True):
+            post_payments(
+                [
+                    {
+                        "student_fee_id": fees["tuition5"].pk,
+                        "amount": "50.00",
+                        "payment_method": "card",
+                        "payment_date": "2024-08-03",
+                    }
+                ]
+            )
+        assert dashboard()["total_collected"] == Decimal("250.00")
+        with django_capture_on_commit_callbacks(execute=True):
+            Payment.objects.filter(payment_method="card").delete()
+        assert dashboard()["total_collected"] == Decimal("200.00")
+
+    def test_endpoint(self, fees):
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        view = PaymentViewSet.as_view({"get": "analytics"})
+        request = APIRequestFactory().get(
+            "/", {"date_from": "2024-07-01", "date_to": "2024-09-30"}
+        )
+        force_authenticate(request, user=admin)
+        response = view(request)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["outstanding"]["buckets"]) == 5
+
+        request = APIRequestFactory().get(
+            "/", {"date_from": "2024-10-01", "date_to": "2024-09-30"}
+        )
+        force_authenticate(request, user=admin)
+        assert view(request).status_code == status.HTTP_400_BAD_REQUEST
+
+        request = APIRequestFactory().get("/")
+        force_authenticate(request, user=User.objects.get(username="student"))
+        assert view(request).status_code == status.HTTP_403_FORBIDDEN
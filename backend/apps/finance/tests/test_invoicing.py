@@ -0,0 +1,256 @@
+import pytest
+from datetime import date
+from importlib import import_module
+from decimal import Decimal
+from django.apps import apps as django_apps
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import AcademicYear, Class, Section
+from apps.accounts.models import User
+from apps.core.exceptions import FeeModuleError
+from apps.finance import invoicing
+from apps.finance.invoicing import discounted_amount, due_dates, generate_student_fees
+from apps.finance.models import (
+    Discount,
+    FeeCategory,
+    FeeStructure,
+    Payment,
+    StudentFee,
+)
+from apps.finance.tasks import generate_fee_invoices
+from apps.finance.views import FeeStructureViewSet
+
+
+@pytest.fixture
+def school(tenant):
+    academic_year = AcademicYear.objects.create(
+        name="2024-2025", start_date=date(2024, 4, 10), end_date=date(2025, 3, 31)
+    )
+    grade5 = Class.objects.create(name="Grade 5")
+    grade6 = Class.objects.create(name="Grade 6")
+    students = [
+        User.objects.create_user(username=f"student{i}", role="student")
+        for i in range(4)
+    ]
+    Section.objects.create(
+        name="A", class_name=grade5, academic_year=academic_year
+    ).students.add(*students[:2])
+    Section.objects.create(
+        name="B", class_name=grade5, academic_year=academic_year
+    ).students.add(students[2])
+    Section.objects.create(
+        name="A", class_name=grade6, academic_year=academic_year
+    ).students.add(students[3])
+    category = FeeCategory.objects.create(name="Tuition")
+    return {
+        "students": students,
+        "monthly": FeeStructure.objects.create(
+            category=category,
+            class_name=grade5,
+            amount=Decimal("1200.00"),
+            frequency="monthly",
+            academic_year="2024-2025",
+        ),
+        "annual": FeeStructure.objects.create(
+            category=FeeCategory.objects.create(name="Exam"),
+            class_name=grade6,
+            amount=Decimal("500.00"),
+            frequency="annual",
+            academic_year="2024-2025",
+        ),
+    }
+
+
+@pytest.mark.django_db
+class TestSchedule:
+    def test_frequencies_expand_over_the_year(self):
+        start = date(2024, 1, 31)
+        assert len(due_dates("monthly", start)) == 12
+        assert due_dates("monthly", start)[1] == date(2024, 2, 29)
+        assert due_dates("quarterly", start) == [
+            date(2024, 1, 31),
+            date(2024, 4, 30),
+            date(2024, 7, 31),
+            date(2024, 10, 31),
+        ]
+        assert due_dates("semi_annual", start) == [date(2024, 1, 31), date(2024, 7, 31)]
+        assert due_dates("annual", start) == due_dates("one_time", start) == [start]
+
+    def test_discounts(self):
+        amount = Decimal("1200.00")
+        percentage = Discount(discount_type="percentage", value=Decimal("12.5"))
+        fixed = Discount(discount_type="fixed", value=Decimal("2000"))
+        assert discounted_amount(amount, None) == amount
+        assert discounted_amount(amount, percentage) == Decimal("1050.00")
+        assert discounted_amount(amount, fixed) == Decimal("0.00")
+
+
+@pytest.mark.django_db
+class TestGenerateStudentFees:
+    def test_generates_installments_for_enrolled_students(self, school):
+        outcome = generate_student_fees([school["monthly"], school["annual"]])
+        assert outcome == {"created": 37, "skipped": 0, "total": 37}
+        fees = StudentFee.objects.filter(fee_structure=school["monthly"])
+        assert {fee.student_id for fee in fees} == {
+            s.pk for s in school["students"][:3]
+        }
+        assert fees.filter(student=school["students"][0]).count() == 12
+        assert fees.order_by("due_date").first().due_date == date(2024, 4, 10)
+        assert (
+            StudentFee.objects.get(fee_structure=school["annual"]).status == "pending"
+        )
+
+    def test_rerun_is_idempotent_and_fills_gaps(self, school):
+        generate_student_fees([school["monthly"]])
+        StudentFee.objects.filter(due_date=date(2024, 6, 10)).delete()
+        outcome = generate_student_fees([school["monthly"]])
+        assert outcome == {"created": 3, "skipped": 33, "total": 36}
+        assert StudentFee.objects.count() == 36
+
+    def test_discounts_apply_per_student(self, school):
+        scholarship = Discount.objects.create(
+            name="Scholarship", discount_type="percentage", value=Decimal("50")
+        )
+        waiver = Discount.objects.create(
+            name="Waiver", discount_type="fixed", value=Decimal("1200")
+        )
+        first, second = school["students"][:2]
+        generate_student_fees(
+            [school["monthly"]], discounts={first.pk: scholarship, second.pk: waiver}
+        )
+        assert set(
+            StudentFee.objects.filter(student=first).values_list("amount", "discount")
+        ) == {(Decimal("600.00"), scholarship.pk)}
+        assert set(
+            StudentFee.objects.filter(student=second).values_list("amount", "status")
+        ) == {(Decimal("0.00"), "paid")}
+
+    def test_counts_only_rows_it_inserted(self, school, monkeypatch):
+        generate_student_fees([school["monthly"]])
+        StudentFee.objects.filter(due_date=date(2024, 6, 10)).delete()
+        # A concurrent run filled the gap after the existing rows were read.
+        reads = []
+        installments = invoicing._installments
+
+        def stale(fee_structures):
+            reads.append(1)
+            return installments(fee_structures) if len(reads) > 1 else set()
+
+        monkeypatch.setattr(invoicing, "_installments", stale)
+        outcome = generate_student_fees([school["monthly"]], chunk_size=10)
+        assert outcome == {"created": 3, "skipped": 33, "total": 36}
+        assert StudentFee.objects.count() == 36
+
+    def test_writes_in_chunks_and_reports_progress(self, school):
+        calls = []
+        generate_student_fees(
+            [school["monthly"]],
+            chunk_size=10,
+            progress=lambda *args: calls.append(args),
+        )
+        assert calls == [(10, 36), (20, 36), (30, 36), (36, 36)]
+
+    def test_unknown_academic_year(self, school):
+        school["annual"].academic_year = "2030-2031"
+        school["annual"].save()
+        with pytest.raises(FeeModuleError):
+            generate_student_fees([school["annual"]])
+
+    def test_task(self, school, tenant):
+        discount = Discount.objects.create(
+            name="Sibling", discount_type="fixed", value=Decimal("100")
+        )
+        outcome = generate_fee_invoices(
+            tenant.schema_name,
+            [school["annual"].pk],
+            {str(school["students"][3].pk): discount.pk},
+        )
+        assert outcome["created"] == 1
+        assert StudentFee.objects.get().amount == Decimal("400.00")
+
+
+@pytest.mark.django_db
+class TestUniqueInstallmentMigration:
+    def test_merges_duplicates(self, school):
+        migration = import_module(
+            "apps.finance.migrations.0004_studentfee_unique_installment"
+        )
+        (constraint,) = [
+            c
+            for c in StudentFee._meta.constraints
+            if c.name == "studentfee_unique_installment"
+        ]
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(StudentFee, constraint)
+        fees = [
+            StudentFee.objects.create(
+                student=school["students"][0],
+                fee_structure=school["monthly"],
+                due_date=date(2024, 4, 10),
+                amount=Decimal("1200.00"),
+            )
+            for _ in range(2)
+        ]
+        # Payment.save() adds to the fee's paid_amount.
+        for fee, paid in zip(fees, [Decimal("500.00"), Decimal("700.00")]):
+            Payment.objects.create(
+                student_fee=fee,
+                amount=paid,
+                payment_method="cash",
+                payment_date=date(2024, 4, 5),
+            )
+        migration.merge_duplicate_installments(django_apps, None)
+        fee = StudentFee.objects.get()
+        assert (fee.pk, fee.paid_amount, fee.status) == (
+            fees[0].pk,
+            Decimal("1200.00"),
+            "paid",
+        )
+        assert set(Payment.objects.values_list("student_fee", flat=True)) == {fee.pk}
+
+
+@pytest.mark.django_db
+class TestGenerateInvoicesEndpoint:
+    def post(self, user, data):
+        request = APIRequestFactory().post("/", data, format="json")
+        force_authenticate(request, user=user)
+        return FeeStructureViewSet.as_view({"post": "generate_invoices"})(request)
+
+    def test_queues_the_job(self, school, monkeypatch):
+        queued = []
+        monkeypatch.setattr(
+            generate_fee_invoices,
+            "delay",
+            lambda *args: queued.append(args) or type("Result", (), {"id": "abc"}),
+        )
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        deleted = Discount.objects.create(
+            name="Old", discount_type="fixed", value=Decimal("1")
+        ).pk
+        Discount.objects.filter(pk=deleted).delete()
+        response = self.post(
+            admin,
+            {
+                "fee_structures": [school["monthly"].pk],
+                "discounts": [
+                    {"student": school["students"][0].pk, "discount": deleted}
+                ],
+            },
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "discounts" in response.data
+
+        response = self.post(admin, {"fee_structures": [school["monthly"].pk]})
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data == {"task_id": "abc"}
+        assert queued[0][1:] == ([school["monthly"].pk], {})
+
+    def test_rejects_unknown_structures_and_non_admins(self, school):
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        response = self.post(admin, {"fee_structures": [999999]})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = self.post(
+            school["students"][0], {"fee_structures": [school["monthly"].pk]}
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
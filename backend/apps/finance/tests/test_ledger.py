@@ -0,0 +1,138 @@
+import csv
+import io
+import pytest
+from datetime import date
+from decimal import Decimal
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.accounts.models import User
+from apps.finance.ledger import student_ledger
+from apps.finance.models import (
+    Discount,
+    FeeCategory,
+    FeeStructure,
+    Payment,
+    StudentFee,
+)
+from apps.finance.views import LedgerViewSet
+
+
+@pytest.fixture
+def ledger(tuition, make_student):
+    bus = FeeStructure.objects.create(
+        category=FeeCategory.objects.create(name="Bus"),
+        class_name=tuition.class_name,
+        amount=Decimal("300.00"),
+        frequency="monthly",
+        academic_year="2024-2025",
+    )
+    sibling = Discount.objects.create(
+        name="Sibling", discount_type="percentage", value=Decimal("10")
+    )
+    parent = User.objects.create_user(username="parent", role="parent")
+    student = make_student("student", parent=parent)
+    other = User.objects.create_user(username="other", role="student")
+    april = StudentFee.objects.create(
+        student=student,
+        fee_structure=tuition,
+        discount=sibling,
+        due_date=date(2024, 4, 10),
+        amount=Decimal("900.00"),
+    )
+    StudentFee.objects.create(
+        student=student,
+        fee_structure=bus,
+        due_date=date(2024, 4, 10),
+        amount=Decimal("300.00"),
+    )
+    may = StudentFee.objects.create(
+        student=student,
+        fee_structure=tuition,
+        due_date=date(2024, 5, 10),
+        amount=Decimal("1000.00"),
+    )
+    StudentFee.objects.create(
+        student=other,
+        fee_structure=tuition,
+        due_date=date(2024, 4, 10),
+        amount=Decimal("1000.00"),
+    )
+    for fee, amount, day, reference in [
+        (april, "900.00", date(2024, 4, 8), "UTR1"),
+        (may, "400.00", date(2024, 5, 10), ""),
+    ]:
+        Payment.objects.create(
+            student_fee=fee,
+            amount=Decimal(amount),
+            payment_method="upi",
+            payment_date=day,
+            transaction_id=reference,
+        )
+    return {"student": student, "parent": parent, "other": other}
+
+
+def get(user, pk=None, action="retrieve"):
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user=user)
+    view = LedgerViewSet.as_view({"get": action})
+    return view(request, pk=pk) if pk else view(request)
+
+
+@pytest.mark.django_db
+class TestStudentLedger:
+    def test_running_balance_in_one_query(self, ledger, count_queries):
+        with count_queries() as queries:
+            data = student_ledger(ledger["student"].pk)
+        assert len(queries) == 1
+        assert [
+            (entry["date"], entry["kind"], entry["description"], entry["balance"])
+            for entry in data["entries"]
+        ] == [
+            (date(2024, 4, 8), "payment", "Tuition", Decimal("-900.00")),
+            (date(2024, 4, 10), "charge", "Tuition", Decimal("100.00")),
+            (date(2024, 4, 10), "charge", "Bus", Decimal("400.00")),
+            (date(2024, 4, 10), "discount", "Sibling", Decimal("300.00")),
+            (date(2024, 5, 10), "charge", "Tuition", Decimal("1300.00")),
+            (date(2024, 5, 10), "payment", "Tuition", Decimal("900.00")),
+        ]
+        assert data["entries"][0]["reference"] == "UTR1"
+        assert data["entries"][3]["credit"] == Decimal("100.00")
+        assert data["balance"] == Decimal("900.00")
+        # The closing balance agrees with the per-fee balances.
+        assert data["balance"] == sum(
+            fee.balance for fee in StudentFee.objects.filter(student=ledger["student"])
+        )
+
+    def test_empty_ledger(self, ledger):
+        orphan = User.objects.create_user(username="new", role="student")
+        assert student_ledger(orphan.pk) == {
+            "student": orphan.pk,
+            "balance": Decimal("0.00"),
+            "entries": [],
+        }
+
+
+@pytest.mark.django_db
+class TestLedgerViewSet:
+    def test_visible_to_student_parent_and_admin_only(self, ledger):
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        pk = ledger["student"].pk
+        for user in (ledger["student"], ledger["parent"], admin):
+            response = get(user, pk)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.data["balance"] == Decimal("900.00")
+        assert get(ledger["other"], pk).status_code == status.HTTP_403_FORBIDDEN
+        assert get(admin, 999999).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_export_streams_every_student(self, ledger):
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        response = get(admin, action="export")
+        rows = list(
+            csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        assert len(rows) == 7
+        other_rows = [
+            row for row in rows if row["student_id"] == str(ledger["other"].pk)
+        ]
+        assert [row["balance"] for row in other_rows] == ["1000.00"]
+        assert get(ledger["student"], action="export").status_code == 403
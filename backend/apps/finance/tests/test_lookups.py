@@ -0,0 +1,120 @@
+import pytest
+from decimal import Decimal
+from django.core.cache import cache
+from apps.academic.models import Class
+from apps.finance import lookups
+from apps.finance.models import Discount, FeeCategory, FeeStructure
+from apps.finance.serializers import FeeStructureSerializer
+
+
+@pytest.fixture
+def structures(tenant):
+    category = FeeCategory.objects.create(name="Tuition")
+    grade5 = Class.objects.create(name="Grade 5")
+    return {
+        "current": FeeStructure.objects.create(
+            category=category,
+            class_name=grade5,
+            amount=Decimal("1000.00"),
+            frequency="monthly",
+            academic_year="2024-25",
+        ),
+        "next": FeeStructure.objects.create(
+            category=category,
+            class_name=grade5,
+            amount=Decimal("1100.00"),
+            frequency="monthly",
+            academic_year="2025-2026",
+        ),
+        "discount": Discount.objects.create(
+            name="Sibling", discount_type="percentage", value=Decimal("10")
+        ),
+    }
+
+
+@pytest.mark.django_db
+class TestFeeLookups:
+    def test_normalise_academic_year(self):
+        assert lookups.normalise_academic_year("2024-25") == "2024-2025"
+        assert lookups.normalise_academic_year(" 2024 / 2025 ") == "2024-2025"
+        assert lookups.normalise_academic_year("AY 24") == "AY 24"
+
+    def test_lookups_drop_out_of_the_query_log(self, structures, count_queries):
+        current = structures["current"]
+        with count_queries() as queries:
+            found = lookups.find_fee_structure(
+                current.category_id, current.class_name_id, "2024/2025"
+            )
+        assert found.pk == current.pk and found.amount == Decimal("1000.00")
+        assert len(queries) == 1
+        with count_queries() as queries:
+            for _ in range(50):
+                lookups.find_fee_structure(
+                    current.category_id, current.class_name_id, "2025-26"
+                )
+            lookups.fee_structures([current.pk, 999999])
+        assert len(queries) == 0
+        assert set(lookups.discounts()) == {structures["discount"].pk}
+        with count_queries() as queries:
+            lookups.discounts([structures["discount"].pk])
+        assert len(queries) == 0
+
+    def test_local_tier_serves_without_the_shared_cache(
+        self, structures, count_queries
+    ):
+        lookups.fee_structures()
+        cache.clear()
+        with count_queries() as queries:
+            lookups.fee_structures()
+        assert len(queries) == 0
+
+    def test_saves_and_deletes_invalidate_on_commit(
+        self, structures, django_capture_on_commit_callbacks
+    ):
+        current = structures["current"]
+        assert lookups.fee_structures([current.pk])[current.pk].amount == Decimal(
+            "1000.00"
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            current.amount = Decimal("1200.00")
+            current.save()
+            # Not bumped before the commit, so nobody caches uncommitted rows.
+            assert lookups.fee_structures([current.pk])[current.pk].amount == Decimal(
+                "1000.00"
+            )
+        assert lookups.fee_structures([current.pk])[current.pk].amount == Decimal(
+            "1200.00"
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            structures["discount"].delete()
+        assert lookups.discounts() == {}
+
+    def test_instances_are_independent_copies(self, structures):
+        pk = structures["current"].pk
+        lookups.fee_structures([pk])[pk].amount = Decimal("1")
+        assert lookups.fee_structures([pk])[pk].amount == Decimal("1000.00")
+
+    def test_serializer_rejects_the_same_year_spelt_differently(
+        self, structures, count_queries
+    ):
+        current = structures["current"]
+        lookups.fee_structures()
+        data = {
+            "category": current.category_id,
+            "class_name": current.class_name_id,
+            "amount": "900.00",
+            "frequency": "monthly",
+            "academic_year": "2024/2025",
+        }
+        serializer = FeeStructureSerializer(data=data)
+        with count_queries() as queries:
+            assert not serializer.is_valid()
+        assert "unique set" in str(serializer.errors["non_field_errors"])
+        # Only the category and class primary keys are fetched.
+        assert len(queries) == 2
+        update = FeeStructureSerializer(
+            current, data={"amount": "950.00"}, partial=True
+        )
+        assert update.is_valid(), update.errors
+        data["academic_year"] = "2026-27"
+        assert FeeStructureSerializer(data=data).is_valid()
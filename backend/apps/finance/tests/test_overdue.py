@@ -0,0 +1,97 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.accounts.models import User
+from apps.communication.models import Notification
+from apps.finance.models import StudentFee
+from apps.finance.overdue import mark_overdue_fees
+from apps.finance.tasks import mark_school_overdue_fees
+
+TODAY = date(2024, 9, 15)
+
+
+@pytest.fixture
+def fees(tuition, make_student):
+    parent = User.objects.create_user(username="parent", role="parent")
+    student = make_student("student", parent=parent)
+    orphan = User.objects.create_user(username="orphan", role="student")
+
+    def fee(student, days_ago, status="pending", paid="0"):
+        return StudentFee.objects.create(
+            student=student,
+            fee_structure=tuition,
+            due_date=TODAY - timedelta(days=days_ago),
+            amount=Decimal("1000.00"),
+            paid_amount=Decimal(paid),
+            status=status,
+        )
+
+    return {
+        "student": student,
+        "parent": parent,
+        "orphan": orphan,
+        "pending": fee(student, 10),
+        "partial": fee(student, 40, status="partial", paid="250"),
+        "paid": fee(student, 70, status="paid", paid="1000"),
+        "due_today": fee(student, 0),
+        "orphan_fee": fee(orphan, 5),
+    }
+
+
+def status_of(fee):
+    fee.refresh_from_db()
+    return fee.status
+
+
+@pytest.mark.django_db
+class TestMarkOverdueFees:
+    def test_flips_fees_past_due(self, fees):
+        assert mark_overdue_fees(today=TODAY) == 3
+        assert status_of(fees["pending"]) == "overdue"
+        assert status_of(fees["partial"]) == "overdue"
+        assert status_of(fees["paid"]) == "paid"
+        assert status_of(fees["due_today"]) == "pending"
+
+    def test_notifies_student_and_parent_in_bulk(self, fees):
+        with CaptureQueriesContext(connection) as queries:
+            mark_overdue_fees(today=TODAY)
+        inserts = [
+            q for q in queries if q["sql"].startswith('INSERT INTO "communication')
+        ]
+        assert len(inserts) == 1
+        notices = Notification.objects.filter(notification_type="fee")
+        assert notices.filter(recipient=fees["student"]).count() == 2
+        assert notices.filter(recipient=fees["parent"]).count() == 2
+        assert notices.filter(recipient=fees["orphan"]).count() == 1
+        partial = notices.get(recipient=fees["parent"], object_id=fees["partial"].pk)
+        assert "750.00" in partial.message
+        assert partial.content_object == fees["partial"]
+
+    def test_later_runs_only_flip_open_fees(self, fees):
+        mark_overdue_fees(today=TODAY)
+        assert mark_overdue_fees(today=TODAY) == 0
+        assert mark_overdue_fees(today=TODAY + timedelta(days=1)) == 1
+        assert status_of(fees["due_today"]) == "overdue"
+        assert Notification.objects.count() == 7
+
+    def test_back_dated_fee_created_after_a_sweep(self, fees):
+        mark_overdue_fees(today=TODAY)
+        late = StudentFee.objects.create(
+            student=fees["student"],
+            fee_structure=fees["pending"].fee_structure,
+            due_date=TODAY - timedelta(days=90),
+            amount=Decimal("1000.00"),
+        )
+        assert mark_overdue_fees(today=TODAY) == 1
+        assert status_of(late) == "overdue"
+
+    def test_fee_reopened_by_a_reversal(self, fees):
+        mark_overdue_fees(today=TODAY)
+        StudentFee.objects.filter(pk=fees["pending"].pk).update(status="pending")
+        assert mark_overdue_fees(today=TODAY) == 1
+        assert status_of(fees["pending"]) == "overdue"
+
+    def test_task(self, fees, tenant):
+        assert mark_school_overdue_fees(tenant.schema_name) >= 3
@@ -0,0 +1,236 @@
+import threading
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from django.apps import apps as django_apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.academic.models import Class
+from apps.accounts.models import User
+from apps.finance.models import FeeCategory, FeeStructure, Payment, StudentFee
+from apps.finance import payments
+from apps.finance.payments import post_payments
+from apps.finance.views import PaymentViewSet
+
+
+def make_fees(count, amount="1000.00"):
+    structure = FeeStructure.objects.create(
+        category=FeeCategory.objects.create(name="Tuition"),
+        class_name=Class.objects.create(name="Grade 5"),
+        amount=Decimal(amount),
+        frequency="monthly",
+        academic_year="2024-2025",
+    )
+    student = User.objects.create_user(username="student", role="student")
+    return [
+        StudentFee.objects.create(
+            student=student,
+            fee_structure=structure,
+            due_date=date(2024, 4, 10) + timedelta(days=30 * month),
+            amount=Decimal(amount),
+        )
+        for month in range(count)
+    ]
+
+
+def pay(fee, amount, **extra):
+    return Payment.objects.create(
+        student_fee=fee,
+        amount=Decimal(amount),
+        payment_method="cash",
+        payment_date=date(2024, 4, 5),
+        **extra,
+    )
+
+
+def row(fee, amount, **extra):
+    return {
+        "student_fee_id": fee.pk,
+        "amount": amount,
+        "payment_method": "bank_transfer",
+        "payment_date": "2024-04-05",
+        **extra,
+    }
+
+
+@pytest.mark.django_db
+class TestPaymentSave:
+    def test_payments_accumulate_and_set_status(self, tenant):
+        (fee,) = make_fees(1)
+        pay(fee, "400.00")
+        fee.refresh_from_db()
+        assert (fee.paid_amount, fee.status) == (Decimal("400.00"), "partial")
+        payment = pay(fee, "600.00")
+        assert payment.student_fee.status == "paid"
+
+    def test_editing_and_deleting_post_the_difference(self, tenant):
+        (fee,) = make_fees(1)
+        payment = pay(fee, "1000.00")
+        payment.amount = Decimal("250.00")
+        payment.save()
+        fee.refresh_from_db()
+        assert (fee.paid_amount, fee.status) == (Decimal("250.00"), "partial")
+        payment.delete()
+        fee.refresh_from_db()
+        assert (fee.paid_amount, fee.status) == (Decimal("0.00"), "pending")
+
+    def test_overdue_fee_stays_overdue_until_paid(self, tenant):
+        (fee,) = make_fees(1)
+        StudentFee.objects.filter(pk=fee.pk).update(status="overdue")
+        pay(fee, "100.00")
+        fee.refresh_from_db()
+        assert fee.status == "overdue"
+        pay(fee, "900.00")
+        fee.refresh_from_db()
+        assert fee.status == "paid"
+
+    def test_no_aggregate_over_past_payments(self, tenant):
+        (fee,) = make_fees(1)
+        for _ in range(5):
+            pay(fee, "10.00")
+        with CaptureQueriesContext(connection) as queries:
+            Payment.objects.create(
+                student_fee_id=fee.pk,
+                amount=Decimal("10.00"),
+                payment_method="cash",
+                payment_date=date(2024, 4, 5),
+            )
+        assert not any("SUM(" in query["sql"] for query in queries)
+        fee.refresh_from_db()
+        assert fee.paid_amount == Decimal("60.00")
+
+
+@pytest.mark.django_db
+class TestPostPayments:
+    def test_batch_posts_each_row_once(self, tenant):
+        fees = make_fees(3)
+        pay(fees[2], "10.00", transaction_id="TX-OLD")
+        outcome = post_payments(
+            [
+                row(fees[0], "300.00", transaction_id="TX-1"),
+                row(fees[0], "700.00", transaction_id="TX-2"),
+                row(fees[1], "50.00", transaction_id="TX-2"),
+                row(fees[1], "-5"),
+                {**row(fees[1], "5.00"), "student_fee_id": 999999},
+                row(fees[2], "20.00", transaction_id="TX-OLD"),
+            ]
+        )
+        assert (outcome["created"], outcome["failed"]) == (2, 4)
+        assert [result["status"] for result in outcome["results"]] == [
+            "created",
+            "created",
+            "error",
+            "error",
+            "error",
+            "error",
+        ]
+        assert "transaction_id" in outcome["results"][2]["errors"]
+        assert "amount" in outcome["results"][3]["errors"]
+        assert "student_fee_id" in outcome["results"][4]["errors"]
+        assert "transaction_id" in outcome["results"][5]["errors"]
+        assert Payment.objects.filter(pk=outcome["results"][0]["id"]).exists()
+        fees[0].refresh_from_db()
+        fees[1].refresh_from_db()
+        assert (fees[0].paid_amount, fees[0].status) == (Decimal("1000.00"), "paid")
+        assert (fees[1].paid_amount, fees[1].status) == (Decimal("0.00"), "pending")
+
+    def test_transaction_posted_concurrently_is_reported(self, tenant, monkeypatch):
+        fees = make_fees(2)
+        pay(fees[1], "10.00", transaction_id="TX-RACE")
+        reads = iter([set(), {"TX-RACE"}])
+        # The first read misses the payment, as if it committed just after.
+        monkeypatch.setattr(payments, "_posted", lambda ids: next(reads))
+        outcome = post_payments(
+            [
+                row(fees[0], "100.00", transaction_id="TX-NEW"),
+                row(fees[0], "100.00", transaction_id="TX-RACE"),
+            ]
+        )
+        assert [result["status"] for result in outcome["results"]] == [
+            "created",
+            "error",
+        ]
+        assert Payment.objects.filter(transaction_id="TX-RACE").count() == 1
+        fees[0].refresh_from_db()
+        assert fees[0].paid_amount == Decimal("100.00")
+
+    def test_query_count_is_independent_of_batch_size(self, tenant):
+        fees = make_fees(12)
+        with CaptureQueriesContext(connection) as small:
+            post_payments([row(fees[0], "10.00")])
+        with CaptureQueriesContext(connection) as large:
+            post_payments([row(fee, "10.00") for fee in fees for _ in range(3)])
+        assert len(large) == len(small)
+
+    def test_batch_endpoint(self, tenant):
+        fees = make_fees(1)
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        view = PaymentViewSet.as_view({"post": "batch"})
+
+        request = APIRequestFactory().post(
+            "/", [row(fees[0], "100.00"), row(fees[0], "0")], format="json"
+        )
+        force_authenticate(request, user=admin)
+        response = view(request)
+        assert response.status_code == status.HTTP_207_MULTI_STATUS
+        assert response.data["created"] == 1
+
+        request = APIRequestFactory().post("/", [row(fees[0], "1.00")], format="json")
+        force_authenticate(request, user=fees[0].student)
+        assert view(request).status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentPayments:
+    def test_parallel_payments_are_not_lost(self, tenant):
+        (fee,) = make_fees(1, amount="500.00")
+        workers = 10
+        barrier = threading.Barrier(workers)
+        errors = []
+
+        def worker():
+            connection.set_tenant(tenant)
+            try:
+                barrier.wait()
+                pay(fee, "50.00")
+            except Exception as exc:  # surfaced by the assertion below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        fee.refresh_from_db()
+        assert fee.paid_amount == Decimal("500.00")
+        assert fee.status == "paid"
+        assert fee.payments.count() == workers
+
+
+@pytest.mark.django_db
+class TestUniqueTransactionMigration:
+    def test_refuses_duplicate_transaction_ids(self, tenant):
+        migration = import_module(
+            "apps.finance.migrations.0005_payment_unique_transaction"
+        )
+        (constraint,) = [
+            c
+            for c in Payment._meta.constraints
+            if c.name == "payment_unique_transaction"
+        ]
+        with connection.schema_editor() as editor:
+            editor.remove_constraint(Payment, constraint)
+            fee = make_fees(1)[0]
+            for transaction_id in ["UTR1", "UTR1", "UTR2", "UTR3", "UTR3"]:
+                pay(fee, "10.00", transaction_id=transaction_id)
+            with pytest.raises(RuntimeError, match="UTR1, UTR3"):
+                migration.check_duplicate_transaction_ids(django_apps, editor)
+        fee.refresh_from_db()
+        assert fee.paid_amount == Decimal("50.00")
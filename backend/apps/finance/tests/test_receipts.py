@@ -0,0 +1,154 @@
+import io
+import zipfile
+from pathlib import Path
+import pytest
+from datetime import date
+from decimal import Decimal
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.accounts.models import User
+from apps.finance.models import Payment, StudentFee
+from apps.finance.receipts import (
+    payment_receipt,
+    receipt_path,
+    receipt_queryset,
+    render_pdf,
+    write_receipts_zip,
+)
+from apps.finance.tasks import (
+    build_receipts_archive,
+    render_fee_receipt,
+    render_payment_receipt,
+)
+from apps.finance.views import PaymentViewSet
+
+
+@pytest.fixture
+def payments(tuition, make_student, private_storage):
+    student = make_student("student", first_name="Asha", last_name="Rao")
+    fee = StudentFee.objects.create(
+        student=student,
+        fee_structure=tuition,
+        due_date=date(2024, 4, 10),
+        amount=Decimal("1000.00"),
+    )
+    return [
+        Payment.objects.create(
+            student_fee=fee,
+            amount=Decimal("250.00"),
+            payment_method="upi",
+            transaction_id=f"UTR{day}",
+            payment_date=date(2024, 4, day),
+        )
+        for day in (1, 2, 3)
+    ]
+
+
+def get(user, action, **kwargs):
+    request = APIRequestFactory().get("/")
+    force_authenticate(request, user=user)
+    return PaymentViewSet.as_view({"get": action})(request, **kwargs)
+
+
+@pytest.fixture
+def queued(monkeypatch):
+    calls = []
+    for task in (render_payment_receipt, render_fee_receipt, build_receipts_archive):
+        monkeypatch.setattr(
+            task,
+            "delay",
+            lambda *args, task=task: calls.append((task, args))
+            or type("Result", (), {"id": f"job{len(calls)}"}),
+        )
+    return calls
+
+
+@pytest.mark.django_db
+class TestRendering:
+    def test_pdf_pages(self):
+        content = {"title": "Receipt", "lines": [("Amount", "10.00")]}
+        pdf = render_pdf(content)
+        assert pdf.startswith(b"%PDF")
+        # Text in a standard font, not a scanned image.
+        assert b"/Helvetica" in pdf
+        assert b"/Subtype /Image" not in pdf
+        long = {"title": "Statement", "lines": [("Row", str(i)) for i in range(120)]}
+        assert render_pdf(long).count(b"/Type /Page\n") == 3
+
+    def test_path_is_addressed_by_content(self, payments):
+        payment = receipt_queryset().get(pk=payments[0].pk)
+        path = receipt_path(payment_receipt(payment))
+        assert path == receipt_path(payment_receipt(payment))
+        assert path.startswith("receipts/test_school/")
+        payment.amount = Decimal("1.00")
+        assert receipt_path(payment_receipt(payment)) != path
+
+
+@pytest.mark.django_db
+class TestReceiptEndpoints:
+    def test_renders_in_the_background_then_serves_the_file(
+        self, payments, tenant, queued, private_storage
+    ):
+        student = payments[0].student_fee.student
+        response = get(student, "receipt", pk=payments[0].pk)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        task, args = queued[0]
+        assert task is render_payment_receipt
+        stored = task(*args)
+        with private_storage.open(stored["path"]) as pdf:
+            assert pdf.read(4) == b"%PDF"
+
+        response = get(student, "receipt", pk=payments[0].pk)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["Content-Type"] == "application/pdf"
+        assert b"".join(response.streaming_content).startswith(b"%PDF")
+        assert len(queued) == 1
+
+    def test_fee_statement(self, payments, tenant, queued):
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        fee = payments[0].student_fee
+        assert get(admin, "fee_statement", student_fee_id=fee.pk).status_code == 202
+        render_fee_receipt(*queued[0][1])
+        assert get(admin, "fee_statement", student_fee_id=fee.pk).status_code == 200
+        # A new payment changes the statement, so it is rendered again.
+        Payment.objects.create(
+            student_fee=fee,
+            amount=Decimal("10.00"),
+            payment_method="cash",
+            payment_date=date(2024, 4, 9),
+        )
+        assert get(admin, "fee_statement", student_fee_id=fee.pk).status_code == 202
+
+    def test_other_students_are_refused(self, payments, queued):
+        other = User.objects.create_user(username="other", role="student")
+        assert get(other, "receipt", pk=payments[0].pk).status_code == 403
+        assert not queued
+
+
+@pytest.mark.django_db
+class TestReceiptsArchive:
+    def test_zip_reuses_stored_receipts(self, payments, private_storage):
+        output = io.BytesIO()
+        assert write_receipts_zip(output, date(2024, 4, 2), date(2024, 4, 30)) == 2
+        names = zipfile.ZipFile(output).namelist()
+        assert names == [
+            f"2024-04-02-R{payments[1].pk:06d}.pdf",
+            f"2024-04-03-R{payments[2].pk:06d}.pdf",
+        ]
+        media = Path(private_storage.location)
+        stored = sorted(media.rglob("*.pdf"))
+        write_receipts_zip(io.BytesIO(), date(2024, 4, 1), date(2024, 4, 30))
+        assert len(list(media.rglob("*.pdf"))) == len(stored) + 1
+
+    def test_archive_job(self, payments, tenant, queued, private_storage):
+        admin = User.objects.create_user(username="admin", role="school_admin")
+        request = APIRequestFactory().post(
+            "/", {"date_from": "2024-04-01", "date_to": "2024-04-30"}, format="json"
+        )
+        force_authenticate(request, user=admin)
+        response = PaymentViewSet.as_view({"post": "receipts_archive"})(request)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        outcome = build_receipts_archive(*queued[0][1])
+        assert outcome["receipts"] == 3
+        with private_storage.open(outcome["path"]) as archive:
+            assert len(zipfile.ZipFile(archive).namelist()) == 3
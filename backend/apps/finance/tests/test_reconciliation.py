@@ -0,0 +1,162 @@
+import csv
+import io
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.finance.models import Payment, StudentFee
+from apps.finance.reconciliation import reconcile_settlement
+from apps.finance.tasks import reconcile_settlement_file
+
+
+@pytest.fixture
+def fees(tuition, make_student):
+    students = [
+        make_student(f"student{index}", admission_number=f"ADM{index}")
+        for index in range(3)
+    ]
+    return {
+        (student.username, month): StudentFee.objects.create(
+            student=student,
+            fee_structure=tuition,
+            due_date=date(2024, 4, 10) + timedelta(days=30 * month),
+            amount=Decimal("1000.00"),
+        )
+        for student in students
+        for month in range(12)
+    }
+
+
+def line(transaction_id, amount, reference, **extra):
+    return {
+        "Transaction_ID": transaction_id,
+        "amount": amount,
+        "payment_date": "2024-05-02",
+        "reference": reference,
+        "payment_method": "UPI",
+        **extra,
+    }
+
+
+def reconcile(rows, **kwargs):
+    report = io.StringIO()
+    totals = reconcile_settlement(iter(rows), report, **kwargs)
+    return totals, list(csv.DictReader(io.StringIO(report.getvalue())))
+
+
+def paid(fee):
+    fee.refresh_from_db()
+    return fee.paid_amount
+
+
+@pytest.mark.django_db
+class TestReconcileSettlement:
+    def test_matches_and_posts(self, fees):
+        totals, mismatches = reconcile(
+            [
+                line("UTR1", "1000.00", "adm0"),
+                line("UTR2", "600.00", "ADM0"),
+                line("UTR3", "600.00", "ADM0"),
+                line("UTR4", "250.00", f"FEE-{fees['student1', 5].pk}"),
+            ]
+        )
+        assert totals == {
+            "lines": 4,
+            "matched": 4,
+            "unmatched": 0,
+            "posted_amount": Decimal("2450.00"),
+        }
+        assert mismatches == []
+        # Oldest open fee first, moving on once a fee can't take the amount.
+        assert paid(fees["student0", 0]) == Decimal("1000.00")
+        assert paid(fees["student0", 1]) == Decimal("600.00")
+        assert paid(fees["student0", 2]) == Decimal("600.00")
+        assert paid(fees["student1", 5]) == Decimal("250.00")
+        payment = Payment.objects.get(transaction_id="UTR4")
+        assert payment.payment_method == "upi"
+
+    def test_reports_mismatches(self, fees):
+        Payment.objects.create(
+            student_fee=fees["student2", 0],
+            amount=Decimal("10"),
+            payment_method="upi",
+            transaction_id="UTR-OLD",
+            payment_date=date(2024, 5, 1),
+        )
+        totals, mismatches = reconcile(
+            [
+                line("UTR-OLD", "10.00", "ADM2"),
+                line("UTR1", "10.00", "ADM2"),
+                line("UTR1", "10.00", "ADM2"),
+                line("", "10.00", "ADM2"),
+                line("UTR2", "abc", "ADM2"),
+                line("UTR3", "-1", "ADM2"),
+                line("UTR4", "10.00", "ADM404"),
+                line("UTR5", "10.00", "FEE-999999"),
+                line("UTR6", "10.00", "FEE-x"),
+                line("UTR7", "5000.00", "ADM2"),
+                line("UTR8", "10.00", "ADM2", payment_date="yesterday"),
+            ]
+        )
+        assert (totals["matched"], totals["unmatched"]) == (1, 10)
+        assert [(row["line"], row["reason"]) for row in mismatches] == [
+            ("2", "Transaction already posted."),
+            ("4", "Transaction repeated in this file."),
+            ("5", "Missing transaction id."),
+            ("6", "Invalid amount."),
+            ("7", "Invalid amount."),
+            ("8", "No open fees for this admission number."),
+            ("9", "No open fee with this reference."),
+            ("10", "Malformed fee reference."),
+            ("11", "Amount exceeds the open balance."),
+            (
+                "12",
+                "payment_date: Date has wrong format. Use one of these formats "
+                "instead: YYYY-MM-DD.",
+            ),
+        ]
+        assert paid(fees["student2", 0]) == Decimal("20.00")
+
+    def test_query_count_is_independent_of_file_length(self, fees):
+        with CaptureQueriesContext(connection) as small:
+            reconcile([line("S1", "1.00", "ADM0")])
+        with CaptureQueriesContext(connection) as large:
+            reconcile([line(f"L{i}", "1.00", f"ADM{i % 3}") for i in range(300)])
+        assert len(large) == len(small)
+        assert Payment.objects.count() == 301
+
+    def test_consumes_the_file_in_chunks(self, fees):
+        consumed = []
+
+        def rows():
+            for index in range(5):
+                consumed.append(index)
+                yield line(f"C{index}", "1.00", "ADM1")
+
+        calls = []
+        report = io.StringIO()
+        reconcile_settlement(
+            rows(),
+            report,
+            chunk_size=2,
+            progress=lambda lines: calls.append((lines, len(consumed))),
+        )
+        assert calls == [(2, 2), (4, 4), (5, 5)]
+
+    def test_task_stores_the_mismatch_report(self, fees, tenant, private_storage):
+        content = io.StringIO()
+        writer = csv.DictWriter(content, fieldnames=list(line("", "", "")))
+        writer.writeheader()
+        writer.writerow(line("T1", "100.00", "ADM0"))
+        writer.writerow(line("T2", "100.00", "ADM9"))
+        path = private_storage.save(
+            "settlement.csv", ContentFile(content.getvalue().encode())
+        )
+        outcome = reconcile_settlement_file(tenant.schema_name, path)
+        assert (outcome["matched"], outcome["unmatched"]) == (1, 1)
+        assert outcome["posted_amount"] == "100.00"
+        with private_storage.open(outcome["path"]) as report:
+            rows = list(csv.DictReader(io.StringIO(report.read().decode())))
+        assert [row["transaction_id"] for row in rows] == ["T2"]
@@ -0,0 +1,142 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.accounts.models import User
+from apps.finance.models import Payment, StudentFee
+from apps.finance.views import FeeCategoryViewSet, PaymentViewSet
+
+
+@pytest.fixture
+def school(tuition, make_student):
+    parent = User.objects.create_user(username="parent", role="parent")
+    students = [make_student("student0", parent=parent), make_student("student1")]
+    return {
+        "admin": User.objects.create_user(username="admin", role="school_admin"),
+        "parent": parent,
+        "students": students,
+        "fees": [
+            StudentFee.objects.create(
+                student=student,
+                fee_structure=tuition,
+                due_date=date(2024, 4, 10),
+                amount=Decimal("5000.00"),
+            )
+            for student in students
+        ],
+    }
+
+
+def pay(fee, count):
+    for _ in range(count):
+        Payment.objects.create(
+            student_fee=fee,
+            amount=Decimal("1.00"),
+            payment_method="cash",
+            payment_date=date(2024, 4, 5),
+        )
+
+
+def call(viewset, actions, user, method="get", data=None):
+    factory = APIRequestFactory()
+    request = getattr(factory, method)("/", data, format="json")
+    force_authenticate(request, user=user)
+    return viewset.as_view(actions)(request)
+
+
+@pytest.mark.django_db
+class TestPaymentViewSet:
+    def test_list_is_scoped_by_role(self, school):
+        pay(school["fees"][0], 2)
+        pay(school["fees"][1], 3)
+        sizes = {
+            name: call(PaymentViewSet, {"get": "list"}, user).data["count"]
+            for name, user in [
+                ("admin", school["admin"]),
+                ("parent", school["parent"]),
+                ("student0", school["students"][0]),
+                ("student1", school["students"][1]),
+            ]
+        }
+        assert sizes == {"admin": 5, "parent": 2, "student0": 2, "student1": 3}
+
+    def test_list_costs_a_constant_number_of_queries(self, school, count_queries):
+        pay(school["fees"][0], 2)
+        with count_queries() as small:
+            call(PaymentViewSet, {"get": "list"}, school["admin"])
+        pay(school["fees"][1], 25)
+        with count_queries() as large:
+            response = call(PaymentViewSet, {"get": "list"}, school["admin"])
+        assert response.data["count"] == 27
+        assert len(large) == len(small)
+
+    def test_create_costs_a_constant_number_of_queries(self, school, count_queries):
+        def create(fee):
+            return call(
+                PaymentViewSet,
+                {"post": "create"},
+                school["admin"],
+                method="post",
+                data={
+                    "student_fee": fee.pk,
+                    "amount": "100.00",
+                    "payment_method": "cash",
+                    "payment_date": "2024-04-05",
+                },
+            )
+
+        with count_queries() as small:
+            response = create(school["fees"][0])
+        assert response.status_code == status.HTTP_201_CREATED
+        pay(school["fees"][1], 25)
+        with count_queries() as large:
+            response = create(school["fees"][1])
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(large) == len(small)
+        school["fees"][1].refresh_from_db()
+        assert school["fees"][1].paid_amount == Decimal("125.00")
+
+    def test_only_admins_write(self, school):
+        response = call(
+            PaymentViewSet,
+            {"post": "create"},
+            school["students"][0],
+            method="post",
+            data={"student_fee": school["fees"][0].pk},
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        pay(school["fees"][0], 1)
+        payment = Payment.objects.get()
+        for method, action in [
+            ("patch", "partial_update"),
+            ("put", "update"),
+            ("delete", "destroy"),
+        ]:
+            request = getattr(APIRequestFactory(), method)("/", {}, format="json")
+            force_authenticate(request, user=school["students"][0])
+            response = PaymentViewSet.as_view({method: action})(request, pk=payment.pk)
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_public_schema_is_refused(self, school):
+        connection.set_schema_to_public()
+        response = call(PaymentViewSet, {"get": "list"}, school["admin"])
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestFeeCategoryViewSet:
+    def test_admins_manage_the_schools_categories(self, school):
+        response = call(
+            FeeCategoryViewSet,
+            {"post": "create"},
+            school["admin"],
+            method="post",
+            data={"name": "Transport"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        response = call(FeeCategoryViewSet, {"get": "list"}, school["admin"])
+        assert response.data["count"] == 2
+        response = call(FeeCategoryViewSet, {"get": "list"}, school["students"][0])
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -7,6 +7,7 @@ router.register(r"fee-structures", views.FeeStructureViewSet)
 router.register(r"payments", views.PaymentViewSet)
 router.register(r"fee-categories", views.FeeCategoryViewSet)
 router.register(r"fee-discounts", views.FeeDiscountViewSet)
+router.register(r"ledger", views.LedgerViewSet, basename="ledger")
 
 
 urlpatterns = [
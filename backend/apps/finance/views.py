@@ -1,66 +1,223 @@
-from rest_framework import viewsets, permissions, status
+import itertools
+from rest_framework import viewsets, permissions, serializers, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
+from django.core.files.storage import storages
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.db import connection
+from django.utils import timezone
 from django.db.models import Sum
 from .models import FeeCategory, FeeStructure, Discount, StudentFee, Payment
 from .serializers import (
     FeeCategorySerializer,
     FeeStructureSerializer,
     FeeDiscountSerializer,
-    PaymentSerializer
+    PaymentSerializer,
+    InvoiceRunSerializer,
+    FinanceAnalyticsQuerySerializer,
+    ReceiptArchiveSerializer,
+    PaymentAllocationSerializer
 )
-from apps.core.permissions import IsSchoolAdmin
+from .allocation import allocate_payment
+from .analytics import finance_dashboard
+from .ledger import LEDGER_COLUMNS, iter_ledger, student_ledger
+from .payments import post_payments
+from .receipts import (
+    fee_receipt,
+    fee_receipt_queryset,
+    payment_receipt,
+    receipt_path,
+    receipt_queryset,
+)
+from .tasks import (
+    build_receipts_archive,
+    generate_fee_invoices,
+    reconcile_settlement_file,
+    render_fee_receipt,
+    render_payment_receipt,
+)
+from apps.accounts.models import StudentProfile, User
+from apps.accounts.permissions import IsAdminUser
+from apps.core.exports import stream_csv
+from apps.core.jobs import queue_task
+from apps.core.tenants import TenantScopedViewMixin
+from apps.core.uploads import iter_upload_rows
 
 
-class FeeCategoryViewSet(viewsets.ModelViewSet):
-    queryset = FeeCategory.objects.all()
-    serializer_class = FeeCategorySerializer
-    permission_classes = [permissions.IsAuthenticated, IsSchoolAdmin]
+def can_view_student_fees(user, student):
+    """Admins, the student themselves and their parent see a student's fees."""
+    return (
+        user.role in [User.SUPER_ADMIN, User.SCHOOL_ADMIN]
+        or user.pk == student.pk
+        or StudentProfile.objects.filter(user=student, parent=user).exists()
+    )
 
-    def get_queryset(self):
-        return FeeCategory.objects.filter(school=self.request.user.school)
 
-    def perform_create(self, serializer):
-        serializer.save(school=self.request.user.school)
+def serve_receipt(request, content, task, *args):
+    """
+    Send the stored PDF of ``content`` or, the first time, queue ``task`` to
+    render it and answer 202 with the task id. Receipts live in private
+    storage, so they only ever reach users the caller has authorised.
+    """
+    path = receipt_path(content)
+    storage = storages['private']
+    if storage.exists(path):
+        return FileResponse(
+            storage.open(path), filename=path.rsplit('/', 1)[-1], content_type='application/pdf'
+        )
+    job = queue_task(request, task, *args)
+    return Response({'task_id': job.id}, status=status.HTTP_202_ACCEPTED)
+
 
+class FeeCategoryViewSet(TenantScopedViewMixin, viewsets.ModelViewSet):
+    queryset = FeeCategory.objects.all()
+    serializer_class = FeeCategorySerializer
+    permission_classes = [IsAdminUser]
 
-class FeeStructureViewSet(viewsets.ModelViewSet):
+
+class FeeStructureViewSet(TenantScopedViewMixin, viewsets.ModelViewSet):
     queryset = FeeStructure.objects.all()
     serializer_class = FeeStructureSerializer
-    permission_classes = [permissions.IsAuthenticated, IsSchoolAdmin]
-
-    def get_queryset(self):
-        return FeeStructure.objects.filter(school=self.request.user.school)
+    permission_classes = [IsAdminUser]
 
-    def perform_create(self, serializer):
-        serializer.save(school=self.request.user.school)
+    @action(detail=False, methods=['post'], url_path='generate-invoices')
+    def generate_invoices(self, request):
+        """
+        Queue generation of the installments of the given fee structures for
+        every enrolled student; poll ``/api/core/tasks/<task_id>/`` for
+        progress and the created/skipped counts.
+        """
+        serializer = InvoiceRunSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task = queue_task(
+            request,
+            generate_fee_invoices,
+            serializer.validated_data['fee_structures'],
+            serializer.validated_data['discounts'],
+        )
+        return Response({'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
 
 
-class FeeDiscountViewSet(viewsets.ModelViewSet):
+class FeeDiscountViewSet(TenantScopedViewMixin, viewsets.ModelViewSet):
     queryset = Discount.objects.all()
     serializer_class = FeeDiscountSerializer
-    permission_classes = [permissions.IsAuthenticated, IsSchoolAdmin]
+    permission_classes = [IsAdminUser]
 
-    def get_queryset(self):
-        return Discount.objects.filter(school=self.request.user.school)
 
-    def perform_create(self, serializer):
-        serializer.save(school=self.request.user.school)
-
-
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(TenantScopedViewMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_permissions(self):
+        if self.action in [
+            'create', 'update', 'partial_update', 'destroy',
+            'batch', 'allocate', 'reconcile', 'analytics', 'receipts_archive',
+        ]:
+            return [IsAdminUser()]
+        return super().get_permissions()
+
     def get_queryset(self):
-        return Payment.objects.filter(student_fee__student__school=self.request.user.school)
+        # Rows are already limited to this school by the schema; only narrow
+        # them to what the user's role may see.
+        user = self.request.user
+        queryset = Payment.objects.order_by('-payment_date', '-id')
+        if user.role in [User.SUPER_ADMIN, User.SCHOOL_ADMIN]:
+            return queryset
+        if user.role == User.PARENT:
+            return queryset.filter(student_fee__student__student_profile__parent=user)
+        return queryset.filter(student_fee__student=user)
 
-    def perform_create(self, serializer):
-        student_fee = serializer.validated_data['student_fee']
-        if student_fee.student.school != self.request.user.school:
-            raise permissions.PermissionDenied("Cannot create payment for student from different school")
-        serializer.save()
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Post a batch of payments, e.g. a bank reconciliation file, from a CSV
+        file or a JSON list in one transaction and report each row.
+        """
+        outcome = post_payments(iter_upload_rows(request))
+        if outcome['failed']:
+            return Response(outcome, status=status.HTTP_207_MULTI_STATUS)
+        return Response(outcome, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def allocate(self, request):
+        """
+        Split a student's lump-sum payment over their open fees, oldest first
+        or by the category types in ``priority``, and post one payment per fee.
+        """
+        serializer = PaymentAllocationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if not User.objects.filter(pk=data['student'], role=User.STUDENT).exists():
+            raise serializers.ValidationError({'student': ['Invalid student.']})
+        outcome = allocate_payment(
+            data['student'],
+            data['amount'],
+            data['payment_method'],
+            data['payment_date'],
+            transaction_id=data['transaction_id'],
+            remarks=data['remarks'],
+            priority=data['priority'],
+        )
+        return Response(outcome, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'])
+    def reconcile(self, request):
+        """
+        Queue reconciliation of an uploaded bank/UPI settlement CSV; poll
+        ``/api/core/tasks/<task_id>/`` for the totals and download the
+        mismatch report from ``/api/core/tasks/<task_id>/file/``.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise serializers.ValidationError({'file': ['Upload the settlement CSV file.']})
+        path = storages['private'].save(
+            f'reconciliation/{connection.schema_name}/'
+            f'settlement-{timezone.now():%Y%m%d%H%M%S}.csv',
+            upload,
+        )
+        task = queue_task(request, reconcile_settlement_file, path)
+        return Response({'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def receipt(self, request, pk=None):
+        """
+        The payment's PDF receipt, or 202 with a task id while it is
+        rendered in the background.
+        """
+        payment = get_object_or_404(receipt_queryset(), pk=pk)
+        if not can_view_student_fees(request.user, payment.student_fee.student):
+            raise PermissionDenied("You cannot view this receipt")
+        return serve_receipt(
+            request, payment_receipt(payment), render_payment_receipt, payment.pk
+        )
+
+    @action(detail=False, methods=['get'], url_path=r'fee-receipt/(?P<student_fee_id>[0-9]+)')
+    def fee_statement(self, request, student_fee_id=None):
+        """A PDF statement of every payment made against one fee."""
+        fee = get_object_or_404(fee_receipt_queryset(), pk=student_fee_id)
+        if not can_view_student_fees(request.user, fee.student):
+            raise PermissionDenied("You cannot view this receipt")
+        return serve_receipt(request, fee_receipt(fee), render_fee_receipt, fee.pk)
+
+    @action(detail=False, methods=['post'], url_path='receipts-archive')
+    def receipts_archive(self, request):
+        """
+        Queue a zip of the receipts of every payment between ``date_from``
+        and ``date_to``; poll ``/api/core/tasks/<task_id>/`` and download it
+        from ``/api/core/tasks/<task_id>/file/``.
+        """
+        serializer = ReceiptArchiveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        task = queue_task(
+            request,
+            build_receipts_archive,
+            serializer.validated_data['date_from'].isoformat(),
+            serializer.validated_data['date_to'].isoformat(),
+        )
+        return Response({'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=False, methods=['get'])
     def summary(self, request):
@@ -70,3 +227,40 @@ class PaymentViewSet(viewsets.ModelViewSet):
         return Response({
             'total_payments': total_payments
         })
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Collections by day, month, payment method, fee category type and
+        class between ``date_from`` and ``date_to`` (default: the last year),
+        plus outstanding balances by days overdue.
+        """
+        params = FinanceAnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(finance_dashboard(**params.validated_data))
+
+
+class LedgerViewSet(TenantScopedViewMixin, viewsets.ViewSet):
+    """
+    Fee ledgers: ``GET ledger/<student_id>/`` returns one student's charges,
+    discounts and payments with a running balance, visible to admins, the
+    student and their parent; ``GET ledger/export/`` streams the ledger of
+    every student as CSV for admins.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_permissions(self):
+        if self.action == 'export':
+            return [IsAdminUser()]
+        return super().get_permissions()
+
+    def retrieve(self, request, pk=None):
+        student = get_object_or_404(User, pk=pk, role=User.STUDENT)
+        if not can_view_student_fees(request.user, student):
+            raise PermissionDenied("You cannot view this student's ledger")
+        return Response(student_ledger(student.pk))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        rows = iter_ledger()
+        return stream_csv(itertools.chain([LEDGER_COLUMNS], rows), 'fee-ledger')
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("library", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bookissue",
+            index=models.Index(
+                fields=["status", "due_date"], name="bookissue_status_due_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bookissue",
+            index=models.Index(
+                condition=models.Q(("status", "issued")),
+                fields=["due_date"],
+                name="bookissue_issued_due_idx",
+            ),
+        ),
+    ]
@@ -60,6 +60,17 @@ class BookIssue(models.Model):
     def __str__(self):
         return f"{self.book.title} - {self.student.get_full_name()}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='bookissue_status_due_idx'),
+            # Books still out, the only rows an overdue check has to visit.
+            models.Index(
+                fields=['due_date'],
+                condition=models.Q(status='issued'),
+                name='bookissue_issued_due_idx',
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         if self.status == 'returned' and not self.return_date:
             self.return_date = models.timezone.now().date()
@@ -202,6 +202,22 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Generated documents with student or financial data (report cards,
+# settlement files) never get a public URL; they are only served through
+# authenticated views such as /api/core/tasks/<task_id>/file/.
+PRIVATE_MEDIA_ROOT = BASE_DIR / "private_media"
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+    "private": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": PRIVATE_MEDIA_ROOT},
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -249,6 +265,11 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@schoolmanagement.com')
+
+# SMS settings (apps/communication/sms.py). There is no default gateway;
+# apps.communication.sms.LocalSMSProvider only records messages, for tests
+# and development.
+SMS_BACKEND = config('SMS_BACKEND', default='')
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
 
 # Celery settings
@@ -258,3 +279,51 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    "refresh-attendance-summaries": {
+        "task": "apps.academic.tasks.refresh_all_attendance_summaries",
+        "schedule": timedelta(minutes=15),
+    },
+    "mark-overdue-fees": {
+        "task": "apps.finance.tasks.mark_all_overdue_fees",
+        "schedule": timedelta(hours=1),
+    },
+    "send-queued-emails": {
+        "task": "apps.communication.tasks.send_all_queued_emails",
+        "schedule": timedelta(minutes=1),
+    },
+    "send-queued-sms": {
+        "task": "apps.communication.tasks.send_all_queued_sms",
+        "schedule": timedelta(minutes=1),
+    },
+}
+# SMS go through their own queue, consumed by a single worker process
+# (celery -A config worker -Q sms --concurrency 1), so the provider's rate
+# limit is enforced by one token bucket.
+CELERY_TASK_ROUTES = {
+    "apps.communication.tasks.send_school_queued_sms": {"queue": "sms"},
+}
+
+# Real-time push (apps/communication/pubsub.py)
+# Redis carries events between ASGI workers and Celery whenever REDIS_URL is
+# set; the in-memory broker only reaches clients of the same process and is
+# meant for tests and single-process development.
+REDIS_URL = config('REDIS_URL', default='')
+PUSH_REDIS_URL = REDIS_URL
+PUSH_BROKER = config('PUSH_BROKER', default='redis' if REDIS_URL else 'memory')
+
+# Cache settings
+# Versioned lookups and invalidations must be seen by every web and Celery
+# process, so the cache lives in Redis whenever REDIS_URL is set; the
+# per-process LocMemCache is only for tests and single-process development.
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.redis.RedisCache'
+            if REDIS_URL
+            else 'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        "LOCATION": config('CACHE_LOCATION', default=REDIS_URL),
+    }
+}
@@ -30,6 +30,7 @@ api_patterns = [
     path("academic/", include("apps.academic.urls")),
     path("finance/", include("apps.finance.urls")),
     path("communication/", include("apps.communication.urls")),
+    path("core/", include("apps.core.urls")),
 ]
 
 urlpatterns = [
@@ -5,8 +5,16 @@ from django_tenants.middleware import TenantMiddleware
 from django_tenants.test.client import TenantClient
 from django.test.client import RequestFactory
 from django.conf import settings
+from datetime import date
+from decimal import Decimal
+from django.core.cache import cache
 from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.academic.models import Class
+from apps.accounts.models import StudentProfile, User
 from apps.core.models import School, Domain
+from apps.finance import lookups
+from apps.finance.models import FeeCategory, FeeStructure
 from django.utils import timezone
 
 @pytest.fixture(scope='session')
@@ -132,3 +140,77 @@ def cleanup_test_schemas(request):
             School.objects.filter(schema_name__startswith='test_').delete()
     
     request.addfinalizer(cleanup)
+
+
+@pytest.fixture
+def private_storage(settings, tmp_path):
+    """The ``private`` storage, kept in a temporary directory for the test."""
+    from django.core.files.storage import storages
+
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'private': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': tmp_path / 'private'},
+        },
+    }
+    return storages['private']
+
+
+class TenantQueriesContext(CaptureQueriesContext):
+    """
+    ``CaptureQueriesContext`` without the ``SET search_path`` statements
+    django-tenants issues whenever it switches schema, so counts only cover
+    the queries the code under test runs.
+    """
+
+    @property
+    def captured_queries(self):
+        return [
+            query for query in super().captured_queries
+            if not query['sql'].startswith('SET ')
+        ]
+
+
+@pytest.fixture
+def count_queries():
+    """``with count_queries() as queries:`` captures the block's queries."""
+    return lambda: TenantQueriesContext(connection)
+
+
+@pytest.fixture
+def tuition(tenant):
+    """A monthly Grade 5 tuition fee structure of 1000.00 for 2024-2025."""
+    return FeeStructure.objects.create(
+        category=FeeCategory.objects.create(name='Tuition'),
+        class_name=Class.objects.create(name='Grade 5'),
+        amount=Decimal('1000.00'),
+        frequency='monthly',
+        academic_year='2024-2025',
+    )
+
+
+@pytest.fixture
+def make_student(tenant):
+    """``make_student(username, parent=None)`` creates a student with a profile."""
+    def make(username, admission_number=None, parent=None, **fields):
+        student = User.objects.create_user(username=username, role='student', **fields)
+        StudentProfile.objects.create(
+            user=student,
+            admission_number=admission_number or username,
+            date_of_birth=date(2014, 1, 1),
+            parent=parent,
+        )
+        return student
+
+    return make
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start and finish every test with empty shared and in-process caches."""
+    cache.clear()
+    lookups.clear_local_fee_lookups()
+    yield
+    cache.clear()
+    lookups.clear_local_fee_lookups()